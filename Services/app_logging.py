@@ -0,0 +1,258 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import deque
+
+ROOT_LOGGER = "app"
+
+# Attributes every LogRecord has; anything else was passed with extra= and is kept as a structured field
+STANDARD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "suppressed"}
+
+
+def get_logger(name):
+    """
+    Returns the logger of a module, e.g. get_logger(__name__) -> "app.Services.mlt_builder".
+
+    Use %-style arguments (log.info("Loaded %d markers", count)) so messages that
+    are filtered out or rate-limited are never formatted.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def record_fields(record):
+    """Returns the structured fields passed with extra= on a log call."""
+    return {key: value for key, value in record.__dict__.items() if key not in STANDARD_ATTRIBUTES and not key.startswith("_")}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits how often each call site (file and line) may log.
+
+    Every call site has a token bucket holding `burst` messages that refills at
+    `rate` messages per second. Messages over the limit are dropped before they
+    are formatted; the next message let through from that site carries the
+    number dropped in `record.suppressed`.
+    """
+
+    def __init__(self, rate=5.0, burst=20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sites = {}  # (pathname, lineno) -> [tokens, last refill, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.CRITICAL:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            state = self.sites.get(key)
+            if state is None:
+                state = self.sites[key] = [float(self.burst), now, 0]
+            state[0] = min(float(self.burst), state[0] + (now - state[1]) * self.rate)
+            state[1] = now
+            if state[0] < 1.0:
+                state[2] += 1
+                return False
+            state[0] -= 1.0
+            if state[2]:
+                record.suppressed = state[2]
+                state[2] = 0
+        return True
+
+
+# Argument types that cannot change between the log call and formatting on the listener thread
+IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records without formatting them.
+
+    The stock QueueHandler formats every record on the calling thread so it can
+    be pickled. Records here stay in the process, so they are queued as they are
+    and the listener thread formats them. Only records with arguments that could
+    change before then (lists, dicts, custom objects) get their message merged on
+    the calling thread.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        values = args.values() if isinstance(args, dict) else args or ()
+        if all(isinstance(value, IMMUTABLE_TYPES) for value in values):
+            return record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """Console format that mentions messages dropped by the rate limit."""
+
+    def format(self, record):
+        text = super().format(record)
+        if getattr(record, "suppressed", 0):
+            text += f" [{record.suppressed} similar messages suppressed]"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the structured fields of the call."""
+
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "site": f"{record.module}:{record.lineno}",
+        }
+        fields = record_fields(record)
+        if fields:
+            entry["fields"] = fields
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the newest log entries in memory for the in-app log viewer.
+
+    Entries are dictionaries with a running sequence number, so a viewer can ask
+    for what arrived since it last looked.
+    """
+
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.entries = deque(maxlen=capacity)
+        self.sequence = 0
+
+    def emit(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "levelno": record.levelno,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "site": f"{record.module}:{record.lineno}",
+            "fields": record_fields(record),
+            "suppressed": getattr(record, "suppressed", 0),
+        }
+        with self.lock:
+            self.sequence += 1
+            entry["sequence"] = self.sequence
+            self.entries.append(entry)
+
+    def since(self, sequence=0):
+        """Returns the buffered entries newer than a sequence number."""
+        with self.lock:
+            return [entry for entry in self.entries if entry["sequence"] > sequence]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class LoggingSetup:
+    """
+    The application's logging pipeline.
+
+    Log calls only pass the rate limit and enqueue the record unformatted (see
+    DeferredQueueHandler); a listener thread formats it and writes it to the ring buffer, the console and, optionally, a
+    rotating JSON-lines file, so hot loops never wait for console or disk I/O.
+    """
+
+    def __init__(self):
+        self.ring_buffer = RingBufferHandler()
+        self.rate_limit = RateLimitFilter()
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(self.rate_limit)
+        self.listener = None
+        self.level = "INFO"
+        self.console = True
+        self.log_file = None
+        self.max_file_bytes = 10 * 1024 * 1024
+
+    def configure(self, level=None, console=None, log_file=None, rate=None, burst=None, buffer_size=None, max_file_bytes=None):
+        """
+        (Re)configures logging for the application. Safe to call more than once;
+        arguments left as None keep their current setting.
+
+        Args:
+            level (str or int, optional): Lowest level recorded, e.g. "DEBUG". Starts as "INFO".
+            console (bool, optional): Write to stderr. Starts on.
+            log_file (str, optional): Rotating JSON-lines log file; "" turns it off.
+            rate (float, optional): Messages per second allowed per call site once its burst is used.
+            burst (int, optional): Messages a call site may log at once.
+            buffer_size (int, optional): Entries kept for the in-app viewer.
+            max_file_bytes (int, optional): Size at which the log file is rotated.
+        """
+        self.stop()
+        if level is not None:
+            self.level = level.upper() if isinstance(level, str) else level
+        if console is not None:
+            self.console = console
+        if log_file is not None:
+            self.log_file = log_file or None
+        if max_file_bytes is not None:
+            self.max_file_bytes = max_file_bytes
+        if rate is not None:
+            self.rate_limit.rate = rate
+        if burst is not None:
+            self.rate_limit.burst = burst
+        if buffer_size is not None and buffer_size != self.ring_buffer.entries.maxlen:
+            self.ring_buffer.entries = deque(self.ring_buffer.entries, maxlen=buffer_size)
+
+        handlers = [self.ring_buffer]
+        if self.console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(TextFormatter("%(levelname)s %(name)s: %(message)s"))
+            handlers.append(console_handler)
+        file_error = None
+        if self.log_file:
+            try:
+                file_handler = logging.handlers.RotatingFileHandler(self.log_file, maxBytes=self.max_file_bytes, backupCount=3, encoding="utf-8")
+                file_handler.setFormatter(JsonFormatter())
+                handlers.append(file_handler)
+            except OSError as e:
+                file_error = e
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(self.level)
+        logger.propagate = False
+        logger.addHandler(self.queue_handler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        if file_error is not None:
+            logger.warning("Cannot open log file %s: %s", self.log_file, file_error)
+
+    def set_level(self, level):
+        """Changes the lowest level recorded without restarting the pipeline."""
+        self.level = level.upper() if isinstance(level, str) else level
+        logging.getLogger(ROOT_LOGGER).setLevel(self.level)
+
+    def stop(self):
+        """Writes out queued records and stops the listener thread."""
+        logging.getLogger(ROOT_LOGGER).removeHandler(self.queue_handler)
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                if handler is not self.ring_buffer:
+                    handler.close()
+            self.listener = None
+
+
+# Shared pipeline; MainWindow and main.py configure it
+logging_setup = LoggingSetup()
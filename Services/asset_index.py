@@ -0,0 +1,105 @@
+import os
+
+
+class AssetIndex:
+    """
+    Index of the files under an asset folder, keyed by lower-case file name.
+
+    The folder is walked once; afterwards `update()` applies the paths reported
+    by a FileWatcher, so new, moved and deleted assets are picked up without
+    rescanning the whole tree.
+    """
+
+    def __init__(self, folder, scan=True):
+        """
+        Args:
+            folder (str): The asset folder.
+            scan (bool): Walk the folder now.
+        """
+        self.folder = os.path.abspath(folder)
+        self.files_by_name = {}  # Lower-case file name -> set of full paths
+        if scan:
+            self.add_tree(self.folder)
+
+    def __len__(self):
+        return sum(len(paths) for paths in self.files_by_name.values())
+
+    def add_file(self, path):
+        self.files_by_name.setdefault(os.path.basename(path).lower(), set()).add(path)
+
+    def remove_file(self, path):
+        paths = self.files_by_name.get(os.path.basename(path).lower())
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self.files_by_name[os.path.basename(path).lower()]
+
+    def add_tree(self, folder):
+        for root, _, files in os.walk(folder):
+            for file in files:
+                self.add_file(os.path.join(root, file))
+
+    def remove_tree(self, folder):
+        prefix = folder.rstrip(os.sep) + os.sep
+        for name in list(self.files_by_name):
+            for path in [path for path in self.files_by_name[name] if path.startswith(prefix)]:
+                self.remove_file(path)
+
+    def update(self, paths):
+        """
+        Applies changed paths: existing files are added, existing folders are
+        indexed, and paths that no longer exist are removed with everything under them.
+
+        Args:
+            paths (iterable): Absolute paths reported as changed.
+        """
+        for path in paths:
+            path = os.path.abspath(path)
+            if path != self.folder and not path.startswith(self.folder + os.sep):
+                continue
+            if os.path.isfile(path):
+                self.add_file(path)
+            elif os.path.isdir(path):
+                self.remove_tree(path)
+                self.add_tree(path)
+            else:
+                self.remove_file(path)
+                self.remove_tree(path)
+
+    def find(self, name, file_types):
+        """
+        Finds the file for a marker name.
+
+        A file in a shallower folder wins (then the first folder in sort order), and
+        within one folder the first extension in `file_types` wins.
+
+        Args:
+            name (str): Marker name.
+            file_types (list): Valid file extensions, e.g. [".png", ".jpg"].
+
+        Returns:
+            str or None: Full path of the file.
+        """
+        candidates = []
+        for extension_index, ext in enumerate(file_types):
+            for path in self.files_by_name.get(f"{name.strip()}{ext}".lower(), ()):
+                directory = os.path.dirname(path)
+                candidates.append((directory.count(os.sep), directory, extension_index, path))
+        return min(candidates)[3] if candidates else None
+
+    def match_markers(self, markers, file_types):
+        """
+        Finds the file for every named marker.
+
+        Returns:
+            dict: Marker index -> full path of the matching file.
+        """
+        matches = {}
+        for index, marker in enumerate(markers):
+            marker_name = marker.get("Name", None)
+            if not marker_name:
+                continue
+            path = self.find(marker_name, file_types)
+            if path:
+                matches[index] = path
+        return matches
@@ -0,0 +1,142 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Services.startup_profiler import lazy_import
+
+
+class DecodeStream:
+    """
+    One video decoded at a fixed tile size.
+
+    At most one decode per stream is in flight, so its capture is never used by
+    two workers at once. Frames are skipped so the stream advances in real time
+    at the presenter's tick rate instead of the source frame rate.
+    """
+
+    def __init__(self, path, tile_size, tick_fps):
+        self.path = path
+        self.tile_size = tile_size
+        self.tick_fps = tick_fps
+        self.capture = None
+        self.step = 1
+        self.pending = None
+        self.latest = None
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def decode_next(self):
+        """Decodes the next frame, resized to the tile and converted to RGB. Runs on a pool worker."""
+        cv2 = lazy_import("cv2")
+        with self.lock:
+            if self.closed:
+                return None
+            if self.capture is None:
+                self.capture = cv2.VideoCapture(self.path)
+                source_fps = self.capture.get(cv2.CAP_PROP_FPS) or self.tick_fps
+                self.step = max(1, int(round(source_fps / self.tick_fps)))
+
+            for _ in range(self.step - 1):
+                self.capture.grab()  # Frames between ticks are never shown
+            ret, frame = self.capture.read()
+            if not ret:
+                # Loop the clip while the grid is open
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.capture.read()
+                if not ret:
+                    return None
+
+            frame = cv2.resize(frame, self.tile_size, interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.capture is not None:
+                self.capture.release()
+                self.capture = None
+
+
+class DecodePool:
+    """
+    Bounded worker pool shared by every video shown in the grid preview.
+
+    The presenter calls `poll()` once per tick for each stream: it collects a
+    finished frame and queues the next decode, so the number of decoding
+    threads stays fixed no matter how many tiles are open.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers (int, optional): Decoding threads. Defaults to half the CPUs, at most 4.
+        """
+        if max_workers is None:
+            max_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="decode")
+
+    def open(self, path, tile_size, tick_fps=15):
+        """
+        Creates a stream for a video.
+
+        Args:
+            path (str): Video file.
+            tile_size (tuple): (width, height) frames are resized to.
+            tick_fps (float): Rate at which the presenter polls the stream.
+
+        Returns:
+            DecodeStream: The stream; decoding starts on the first poll.
+        """
+        return DecodeStream(path, tile_size, tick_fps)
+
+    def poll(self, stream):
+        """
+        Returns the most recent decoded frame of a stream and queues the next decode.
+
+        Args:
+            stream (DecodeStream): Stream returned by open().
+
+        Returns:
+            numpy.ndarray or None: RGB frame of the tile size, or None before the first frame.
+        """
+        if stream.pending is not None and stream.pending.done():
+            if stream.pending.exception() is None and stream.pending.result() is not None:
+                stream.latest = stream.pending.result()
+            stream.pending = None
+        if stream.pending is None and not stream.closed:
+            stream.pending = self.executor.submit(stream.decode_next)
+        return stream.latest
+
+    def close(self, stream):
+        """Stops decoding a stream and releases its capture once the in-flight decode ends."""
+        stream.closed = True
+        if stream.pending is not None and not stream.pending.done():
+            stream.pending.add_done_callback(lambda _: stream.close())
+        else:
+            stream.close()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def composite_tiles(frames, columns, tile_size):
+    """
+    Places tile frames into one canvas, row by row.
+
+    Args:
+        frames (list): RGB frames of the tile size, or None for tiles without a frame yet.
+        columns (int): Tiles per row.
+        tile_size (tuple): (width, height) of each tile.
+
+    Returns:
+        numpy.ndarray: The RGB canvas.
+    """
+    np = lazy_import("numpy")
+    width, height = tile_size
+    rows = max(1, -(-len(frames) // columns))
+    canvas = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+    for index, frame in enumerate(frames):
+        if frame is None:
+            continue
+        row, column = divmod(index, columns)
+        canvas[row * height:(row + 1) * height, column * width:(column + 1) * width] = frame
+    return canvas
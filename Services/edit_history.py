@@ -0,0 +1,161 @@
+from collections import namedtuple
+
+# One inserted or removed element: the element, its parent and its index in the parent
+Change = namedtuple("Change", ["action", "parent", "index", "element"])
+
+# The changes made by one operation, with the label shown for undo/redo
+Patch = namedtuple("Patch", ["label", "changes"])
+
+INSERT = "insert"
+REMOVE = "remove"
+
+
+class EditHistory:
+    """
+    Undo/redo history of an XML document as structured patches.
+
+    An operation is run through `record()`, which compares the child lists of
+    the document before and after it and stores only the elements that were
+    inserted or removed, with their parent and position. Undoing or redoing
+    replays those changes, so memory grows with the size of the edits rather
+    than with the size of the document times the number of steps.
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (xml.etree.ElementTree.Element): The document root edited in place.
+        """
+        self.root = root
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def record(self, label, operation, *args, **kwargs):
+        """
+        Runs an operation on the document and records what it inserted and removed.
+
+        Args:
+            label (str): Name of the operation, e.g. "Add Producer".
+            operation (callable): Called as operation(root, *args, **kwargs); edits the root in place.
+
+        Returns:
+            The operation's return value.
+
+        Raises:
+            Exception: Whatever the operation raised, after the elements it had already
+                inserted or removed were put back, so the document is left unchanged.
+        """
+        # Transient snapshot of every child list (None for leaves); only the differences are kept
+        before = {element: list(element) if len(element) else None for element in self.root.iter()}
+        try:
+            result = operation(self.root, *args, **kwargs)
+        except BaseException:
+            revert(self.changes_since(before))
+            raise
+
+        changes = self.changes_since(before)
+        if changes:
+            self.undo_stack.append(Patch(label, changes))
+            self.redo_stack.clear()
+        return result
+
+    def changes_since(self, before):
+        """Lists the insertions and removals since a snapshot of the child lists."""
+        changes = []
+        for parent in self.root.iter():
+            if parent not in before:
+                continue  # Part of an inserted subtree, which is restored as a whole
+            old_children = before[parent] or []
+            new_children = list(parent)
+            if old_children != new_children:
+                changes.extend(diff_children(parent, old_children, new_children))
+        return changes
+
+    def undo(self):
+        """
+        Reverts the latest recorded operation.
+
+        Returns:
+            str or None: Label of the undone operation, or None if there is nothing to undo.
+        """
+        if not self.undo_stack:
+            return None
+        patch = self.undo_stack.pop()
+        revert(patch.changes)
+        self.redo_stack.append(patch)
+        return patch.label
+
+    def redo(self):
+        """
+        Reapplies the latest undone operation.
+
+        Returns:
+            str or None: Label of the redone operation, or None if there is nothing to redo.
+        """
+        if not self.redo_stack:
+            return None
+        patch = self.redo_stack.pop()
+        apply(patch.changes)
+        self.undo_stack.append(patch)
+        return patch.label
+
+
+def diff_children(parent, old_children, new_children):
+    """
+    Lists the removals and insertions that turn one child list into another.
+
+    Elements are compared by identity. Removals come first (by old index) and
+    insertions after (by new index), which is the order `apply` replays them in.
+    If the children that were kept changed order, every child is replaced.
+    """
+    new_set = set(new_children)
+    old_set = set(old_children)
+    kept_old = [child for child in old_children if child in new_set]
+    kept_new = [child for child in new_children if child in old_set]
+    if kept_old != kept_new:
+        new_set = old_set = set()
+
+    changes = [Change(REMOVE, parent, index, child) for index, child in enumerate(old_children) if child not in new_set]
+    changes += [Change(INSERT, parent, index, child) for index, child in enumerate(new_children) if child not in old_set]
+    return changes
+
+
+def apply(changes):
+    """Replays recorded changes."""
+    replay(changes, REMOVE, INSERT)
+
+
+def revert(changes):
+    """Undoes recorded changes: inserted elements are removed and removed ones restored."""
+    replay(changes, INSERT, REMOVE)
+
+
+def replay(changes, drop_action, add_action):
+    """
+    Rebuilds the child list of every changed parent once.
+
+    Elements of drop_action are taken out, then elements of add_action are merged
+    in at their indexes, so large patches take linear time per parent.
+    """
+    by_parent = {}
+    for change in changes:
+        by_parent.setdefault(change.parent, []).append(change)
+
+    for parent, parent_changes in by_parent.items():
+        dropped = {change.element for change in parent_changes if change.action == drop_action}
+        kept = iter([child for child in parent if child not in dropped])
+        added = sorted((change for change in parent_changes if change.action == add_action), key=lambda change: change.index)
+
+        children = []
+        for change in added:
+            while len(children) < change.index:
+                children.append(next(kept))
+            children.append(change.element)
+        children.extend(kept)
+        parent[:] = children
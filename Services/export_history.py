@@ -0,0 +1,331 @@
+import difflib
+import hashlib
+import json
+import os
+import threading
+import uuid
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+from Services.app_logging import get_logger
+from Services.mlt_splice import atomic_write
+
+log = get_logger(__name__)
+
+# One recorded export: the manifest of the chunks that rebuild it
+ExportVersion = namedtuple("ExportVersion", ["version_id", "created", "source", "export_path", "size", "sha256", "chunks"])
+
+
+def split_chunks(data, average_size=8192, min_size=2048, max_size=65536):
+    """
+    Splits bytes into content-defined chunks that end at line boundaries.
+
+    A chunk ends after a line whose hash hits 1 in average_size/line-length, so
+    boundaries depend only on nearby lines: inserting producers or playlists
+    into a project changes the chunks around the insertion and leaves the rest
+    identical to the previous export.
+
+    Args:
+        data (bytes): Document bytes.
+        average_size (int): Target chunk size in bytes.
+        min_size (int): No boundary before a chunk has this many bytes.
+        max_size (int): A boundary is forced at the first line end past this size.
+
+    Returns:
+        list: Chunks (bytes) that join back to data.
+    """
+    chunks = []
+    start = 0
+    position = 0
+    length = len(data)
+    while position < length:
+        end = data.find(b"\n", position)
+        end = length if end == -1 else end + 1
+        line = data[position:end]
+        position = end
+        size = position - start
+        if size < min_size:
+            continue
+        # The chance of a cut grows with the line length, so the average does not depend on it
+        if size >= max_size or zlib.crc32(line) % average_size < len(line):
+            chunks.append(data[start:position])
+            start = position
+    if start < length:
+        chunks.append(data[start:])
+    return chunks
+
+
+# One lock per history folder, shared by every ExportHistory on it, so recording and
+# garbage collection from different Export Manager windows never interleave
+FOLDER_LOCKS = {}
+FOLDER_LOCKS_GUARD = threading.Lock()
+
+
+def folder_lock(folder):
+    """Returns the lock of a history folder."""
+    with FOLDER_LOCKS_GUARD:
+        return FOLDER_LOCKS.setdefault(os.path.abspath(folder), threading.RLock())
+
+
+class ExportHistory:
+    """
+    Content-addressed store of every exported project.
+
+    Each export is split into content-defined chunks, and every chunk is stored
+    once under its SHA-256, zlib-compressed, in `objects/`. A JSON manifest in
+    `manifests/` lists the chunks of one export with its time and source
+    project, so many near-identical exports of a large project take little more
+    space than one, and any of them can be restored or compared.
+    """
+
+    def __init__(self, folder="export_history", compression_level=6):
+        """
+        Args:
+            folder (str): Folder of the store; created on first use.
+            compression_level (int): zlib level of new chunks.
+        """
+        self.folder = folder
+        self.objects_folder = os.path.join(folder, "objects")
+        self.manifests_folder = os.path.join(folder, "manifests")
+        self.compression_level = compression_level
+        self.lock = folder_lock(folder)  # Held while chunks are added or deleted
+
+    # Chunks
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_folder, digest[:2], digest)
+
+    def put_chunk(self, chunk):
+        """
+        Stores a chunk unless it is already present.
+
+        Returns:
+            tuple: (hex digest, bytes written to disk; 0 for a known chunk)
+        """
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(chunk, self.compression_level)
+        atomic_write(path, [compressed])
+        return digest, len(compressed)
+
+    def get_chunk(self, digest):
+        with open(self.object_path(digest), "rb") as file:
+            chunk = zlib.decompress(file.read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Export history chunk {digest} is corrupt")
+        return chunk
+
+    # Versions
+
+    def record(self, export_path, source=None, data=None):
+        """
+        Adds an export to the history.
+
+        Args:
+            export_path (str): The exported file.
+            source (str, optional): The project the export was made from.
+            data (bytes, optional): The exported bytes; read from export_path when omitted.
+
+        Returns:
+            ExportVersion: The new version.
+        """
+        if data is None:
+            with open(export_path, "rb") as file:
+                data = file.read()
+
+        # A chunk found on disk is only safe to reuse if garbage collection cannot
+        # delete it before the manifest referring to it is written
+        with self.lock:
+            chunks = []
+            written = 0
+            for chunk in split_chunks(data):
+                digest, size = self.put_chunk(chunk)
+                chunks.append(digest)
+                written += size
+
+            created = datetime.now(timezone.utc)
+            version = ExportVersion(
+                version_id=f"{created.strftime('%Y%m%dT%H%M%S%fZ')}-{uuid.uuid4().hex[:8]}",
+                created=created.isoformat(),
+                source=os.path.abspath(source) if source else None,
+                export_path=os.path.abspath(export_path),
+                size=len(data),
+                sha256=hashlib.sha256(data).hexdigest(),
+                chunks=chunks,
+            )
+            os.makedirs(self.manifests_folder, exist_ok=True)
+            manifest = json.dumps(version._asdict(), indent=1).encode("utf-8")
+            atomic_write(os.path.join(self.manifests_folder, f"{version.version_id}.json"), [manifest])
+        log.info("Recorded export %s: %d chunks, %d new bytes stored.", version.version_id, len(chunks), written)
+        return version
+
+    def versions(self, source=None, strict=False):
+        """
+        Lists recorded exports, oldest first.
+
+        Args:
+            source (str, optional): Only exports of this project.
+            strict (bool): Raise on an unreadable manifest instead of skipping it with a warning.
+
+        Returns:
+            list: ExportVersion objects.
+
+        Raises:
+            OSError, ValueError, TypeError: With strict, if a manifest cannot be read.
+        """
+        if not os.path.isdir(self.manifests_folder):
+            return []
+        versions = []
+        for name in sorted(os.listdir(self.manifests_folder)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.manifests_folder, name), "r", encoding="utf-8") as file:
+                    version = ExportVersion(**json.load(file))
+            except (OSError, ValueError, TypeError) as e:
+                if strict:
+                    raise
+                log.warning("Skipping unreadable export manifest %s: %s", name, e)
+                continue
+            if source is None or version.source == os.path.abspath(source):
+                versions.append(version)
+        return versions
+
+    def get(self, version_id):
+        """Returns the ExportVersion with the given id (or unique id prefix)."""
+        matches = [version for version in self.versions() if version.version_id.startswith(version_id)]
+        if len(matches) != 1:
+            raise KeyError(f"{'No' if not matches else 'More than one'} export version matches '{version_id}'")
+        return matches[0]
+
+    def read(self, version):
+        """
+        Rebuilds the bytes of a version.
+
+        Args:
+            version (ExportVersion or str): The version or its id.
+
+        Returns:
+            bytes: The exported file as it was written.
+        """
+        if isinstance(version, str):
+            version = self.get(version)
+        data = b"".join(self.get_chunk(digest) for digest in version.chunks)
+        if hashlib.sha256(data).hexdigest() != version.sha256:
+            raise ValueError(f"Export version {version.version_id} does not match its checksum")
+        return data
+
+    def restore(self, version, path=None):
+        """
+        Writes a version back to disk, atomically.
+
+        Args:
+            version (ExportVersion or str): The version or its id.
+            path (str, optional): Target file. Defaults to the file the version was exported to.
+
+        Returns:
+            str: The written path.
+        """
+        if isinstance(version, str):
+            version = self.get(version)
+        path = path or version.export_path
+        atomic_write(path, [self.read(version)])
+        return path
+
+    def diff(self, old, new, context=3):
+        """
+        Compares two versions line by line.
+
+        Chunks shared by both versions are decompressed once.
+
+        Returns:
+            list: Lines of a unified diff.
+        """
+        if isinstance(old, str):
+            old = self.get(old)
+        if isinstance(new, str):
+            new = self.get(new)
+        cache = {}
+
+        def lines(version):
+            result = []
+            for digest in version.chunks:
+                if digest not in cache:
+                    cache[digest] = self.get_chunk(digest).decode("utf-8", errors="replace").splitlines()
+                result.extend(cache[digest])
+            return result
+
+        return list(difflib.unified_diff(
+            lines(old), lines(new),
+            fromfile=f"{old.version_id} ({old.created})", tofile=f"{new.version_id} ({new.created})",
+            n=context, lineterm="",
+        ))
+
+    def delete(self, version):
+        """Removes a version's manifest; run collect_garbage() to free its chunks."""
+        if isinstance(version, str):
+            version = self.get(version)
+        os.remove(os.path.join(self.manifests_folder, f"{version.version_id}.json"))
+
+    def prune(self, keep):
+        """
+        Keeps the newest `keep` versions of every source project and frees unused chunks.
+
+        Returns:
+            int: Number of versions removed.
+        """
+        with self.lock:
+            by_source = {}
+            for version in self.versions():
+                by_source.setdefault(version.source, []).append(version)
+            removed = 0
+            for versions in by_source.values():
+                for version in versions[:max(0, len(versions) - keep)]:
+                    self.delete(version)
+                    removed += 1
+            if removed:
+                self.collect_garbage()
+            return removed
+
+    def collect_garbage(self):
+        """
+        Deletes chunks no manifest refers to.
+
+        Nothing is deleted while any manifest cannot be read, since its chunks
+        would be lost for good.
+
+        Returns:
+            int: Number of chunks deleted.
+        """
+        with self.lock:
+            try:
+                used = {digest for version in self.versions(strict=True) for digest in version.chunks}
+            except (OSError, ValueError, TypeError) as e:
+                log.warning("Export history garbage collection skipped, a manifest is unreadable: %s", e)
+                return 0
+            deleted = 0
+            if not os.path.isdir(self.objects_folder):
+                return 0
+            for prefix in os.listdir(self.objects_folder):
+                folder = os.path.join(self.objects_folder, prefix)
+                for digest in os.listdir(folder):
+                    if digest not in used:
+                        os.remove(os.path.join(folder, digest))
+                        deleted += 1
+            return deleted
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of versions, total exported bytes and bytes stored on disk.
+        """
+        versions = self.versions()
+        stored = 0
+        if os.path.isdir(self.objects_folder):
+            for prefix in os.listdir(self.objects_folder):
+                folder = os.path.join(self.objects_folder, prefix)
+                stored += sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+        return {"versions": len(versions), "exported_bytes": sum(version.size for version in versions), "stored_bytes": stored}
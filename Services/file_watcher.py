@@ -0,0 +1,243 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def load_inotify():
+    """Returns libc with the inotify functions, or None where inotify is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """
+    Watches files and folder trees and reports changed paths in debounced batches.
+
+    Uses inotify on Linux and falls back to stat polling elsewhere. Polling
+    compares file stats and folder mtimes, and only lists a folder again when
+    its mtime changed, so large asset trees are not rescanned. Events are
+    collected on a background thread; `poll()` returns a batch once no new
+    event arrived for `debounce` seconds, so a burst of writes (such as a
+    save) is reported once. Call `poll()` from the Tk loop with root.after.
+    """
+
+    def __init__(self, debounce=0.5, poll_interval=1.0, use_inotify=True):
+        """
+        Args:
+            debounce (float): Seconds without events before a batch is reported.
+            poll_interval (float): Seconds between stat checks of the polling fallback.
+            use_inotify (bool): Use inotify when the platform has it.
+        """
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.files = set()  # Watched files
+        self.trees = set()  # Watched folder roots
+        self.pending = set()
+        self.last_event = 0.0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.libc = load_inotify() if use_inotify else None
+        self.inotify_fd = None
+        self.watch_dirs = {}  # inotify watch descriptor -> folder
+        self.stats = {}  # Polling: path -> (mtime_ns, size) of watched files and folders
+        self.listings = {}  # Polling: folder -> set of entry names
+
+        if self.libc is not None:
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self.inotify_fd = fd
+            else:
+                self.libc = None
+
+    @property
+    def backend(self):
+        return "inotify" if self.inotify_fd is not None else "polling"
+
+    def watch_file(self, path):
+        """Watches one file; its folder is watched so atomic saves (write and rename) are seen."""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.files.add(path)
+            self.add_directory(os.path.dirname(path), recursive=False)
+            self.stats[path] = stat_key(path)
+
+    def watch_tree(self, folder):
+        """Watches a folder and everything under it."""
+        folder = os.path.abspath(folder)
+        with self.lock:
+            self.trees.add(folder)
+            for root, _, _ in os.walk(folder):
+                self.add_directory(root, recursive=True)
+
+    def add_directory(self, folder, recursive):
+        if self.inotify_fd is not None:
+            descriptor = self.libc.inotify_add_watch(self.inotify_fd, os.fsencode(folder), WATCH_MASK)
+            if descriptor >= 0:
+                self.watch_dirs[descriptor] = folder
+        elif recursive:
+            self.stats[folder] = stat_key(folder)
+            self.listings[folder] = list_names(folder)
+
+    def start(self):
+        if self.thread is None:
+            target = self.run_inotify if self.inotify_fd is not None else self.run_polling
+            self.thread = threading.Thread(target=target, name="file-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+    def poll(self):
+        """
+        Returns the changed paths once events have settled.
+
+        Returns:
+            set: Absolute paths that changed, or an empty set while events are still arriving.
+        """
+        with self.lock:
+            if not self.pending or time.monotonic() - self.last_event < self.debounce:
+                return set()
+            batch, self.pending = self.pending, set()
+            return batch
+
+    def report(self, paths):
+        with self.lock:
+            self.pending.update(paths)
+            self.last_event = time.monotonic()
+
+    def is_relevant(self, path):
+        if path in self.files:
+            return True
+        return any(path == tree or path.startswith(tree + os.sep) for tree in self.trees)
+
+    # inotify backend
+
+    def run_inotify(self):
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.inotify_fd], [], [], 0.2)
+            if not readable:
+                continue
+            try:
+                data = os.read(self.inotify_fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return  # Closed by stop()
+            changed = self.parse_events(data)
+            if changed:
+                self.report(changed)
+
+    def parse_events(self, data):
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.files | self.trees)  # Events were lost: everything may have changed
+                continue
+            with self.lock:
+                folder = self.watch_dirs.get(descriptor)
+                if mask & IN_IGNORED:
+                    self.watch_dirs.pop(descriptor, None)
+            if folder is None:
+                continue
+            path = os.path.join(folder, os.fsdecode(name)) if name else folder
+            with self.lock:
+                if not self.is_relevant(path):
+                    continue
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    for root, _, _ in os.walk(path):
+                        self.add_directory(root, recursive=True)  # New folders are watched too
+            changed.add(path)
+        return changed
+
+    # Polling backend
+
+    def run_polling(self):
+        while not self.stop_event.wait(self.poll_interval):
+            with self.lock:
+                files = list(self.files)
+                folders = list(self.listings)
+            changed = set()
+            for path in files:
+                key = stat_key(path)
+                if key != self.stats.get(path):
+                    self.stats[path] = key
+                    changed.add(path)
+            for folder in folders:
+                changed.update(self.poll_folder(folder))
+            if changed:
+                self.report(changed)
+
+    def poll_folder(self, folder):
+        """Lists a folder again only if its mtime changed; returns added and removed paths."""
+        key = stat_key(folder)
+        if key == self.stats.get(folder):
+            return set()
+        self.stats[folder] = key
+        if key is None:
+            with self.lock:
+                self.listings.pop(folder, None)
+            return {folder}
+
+        names = list_names(folder)
+        previous = self.listings.get(folder, set())
+        changed = {os.path.join(folder, name) for name in names ^ previous}
+        with self.lock:
+            self.listings[folder] = names
+            for path in changed:
+                if os.path.isdir(path) and path not in self.listings:
+                    for root, _, _ in os.walk(path):
+                        self.add_directory(root, recursive=True)
+        return changed
+
+
+def stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def list_names(folder):
+    try:
+        return set(os.listdir(folder))
+    except OSError:
+        return set()
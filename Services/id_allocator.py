@@ -0,0 +1,82 @@
+import re
+
+# Splits ids like "producer12" into ("producer", "12")
+ID_PATTERN = re.compile(r"^(.*?)(\d+)$")
+
+
+class IdAllocator:
+    """
+    Document-wide allocator for element ids such as producerN, playlistN, chainN and transitionN.
+
+    The document is scanned once: every id is recorded, together with the highest
+    number used per prefix, and every `producer=` reference (playlist entries,
+    tractor tracks, the `<mlt>` root) is collected so dangling references can be
+    reported before export. Handing out a fresh id is O(1) after that.
+    """
+
+    def __init__(self, root):
+        """
+        Scans the document in one pass.
+
+        Args:
+            root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+        """
+        self.ids = set()
+        self.highest = {}
+        self.references = []
+
+        for element in root.iter():
+            element_id = element.get("id")
+            if element_id:
+                self.reserve(element_id)
+            reference = element.get("producer")
+            if reference is not None:
+                self.references.append((element.tag, reference))
+
+    def reserve(self, element_id):
+        """Marks an id as used."""
+        self.ids.add(element_id)
+        match = ID_PATTERN.match(element_id)
+        if match:
+            prefix, number = match.group(1), int(match.group(2))
+            if number > self.highest.get(prefix, -1):
+                self.highest[prefix] = number
+
+    def allocate_number(self, prefix):
+        """
+        Reserves the next free number for a prefix.
+
+        Args:
+            prefix (str): Id prefix, e.g. "producer".
+
+        Returns:
+            int: A number such that f"{prefix}{number}" is unused.
+        """
+        number = self.highest.get(prefix, -1) + 1
+        self.reserve(f"{prefix}{number}")
+        return number
+
+    def allocate(self, prefix):
+        """
+        Reserves and returns a fresh id for a prefix.
+
+        Args:
+            prefix (str): Id prefix, e.g. "playlist".
+
+        Returns:
+            str: The new id, e.g. "playlist4".
+        """
+        return f"{prefix}{self.allocate_number(prefix)}"
+
+    def add_reference(self, tag, reference):
+        """Records a `producer=` reference added after the scan."""
+        self.references.append((tag, reference))
+
+    def dangling_references(self):
+        """
+        Lists references that do not resolve to any id in the document.
+
+        Returns:
+            list: (tag, reference) tuples, e.g. ("entry", "producer9").
+        """
+        return [(tag, reference) for tag, reference in self.references if reference not in self.ids]
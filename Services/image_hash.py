@@ -0,0 +1,254 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from Services.app_logging import get_logger
+from Services.mlt_splice import atomic_write
+from Services.startup_profiler import lazy_import
+
+log = get_logger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
+
+
+def dhash(path, hash_size=8):
+    """
+    Computes the difference hash of a picture.
+
+    The picture is reduced to (hash_size + 1) x hash_size grey pixels and every
+    bit records whether a pixel is brighter than its right neighbour, so
+    re-saved, re-compressed or rescaled copies get the same or a close hash.
+
+    Args:
+        path (str): Picture file.
+        hash_size (int): Bits per row; the hash has hash_size ** 2 bits.
+
+    Returns:
+        int: The hash.
+    """
+    Image = lazy_import("PIL.Image")
+    with Image.open(path) as image:
+        image.draft("L", (hash_size * 4, hash_size * 4))  # Lets JPEG decode at a fraction of full size
+        pixels = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def popcount(values):
+    """Counts the set bits of every element of a uint64 NumPy array."""
+    np = lazy_import("numpy")
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class ImageHashIndex:
+    """
+    Perceptual hashes of asset pictures for duplicate and near-duplicate lookups.
+
+    Hashes are cached in `cache_file` by path, mtime and size, so only new or
+    changed pictures are decoded again. Missing hashes are computed on a thread
+    pool (Pillow releases the GIL while decoding and resizing). Lookups compare
+    a hash against every indexed hash at once with NumPy XOR and bit counts.
+    """
+
+    def __init__(self, cache_file="image_hashes.json", max_workers=None):
+        """
+        Args:
+            cache_file (str or None): JSON file the hashes are kept in; None keeps them in memory only.
+            max_workers (int, optional): Threads hashing pictures. Defaults to the CPU count, at most 8.
+        """
+        self.cache_file = cache_file
+        self.max_workers = max_workers or max(1, min(8, os.cpu_count() or 2))
+        self.entries = {}  # Path -> [mtime_ns, size, hash]
+        self.paths = []
+        self.hashes = None  # uint64 array parallel to self.paths, built on demand
+        self.load()
+
+    # Cache
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                self.entries = {path: list(entry) for path, entry in json.load(file).items()}
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring damaged image hash cache %s: %s", self.cache_file, e)
+            self.entries = {}
+
+    def save(self):
+        if not self.cache_file:
+            return
+        try:
+            atomic_write(self.cache_file, [json.dumps(self.entries).encode("utf-8")])
+        except OSError as e:
+            log.warning("Failed to save image hashes: %s", e)
+
+    # Indexing
+
+    def add_folder(self, folder, progress=None):
+        """
+        Hashes every picture under a folder and forgets cached pictures under it
+        that no longer exist. See `add_files`.
+        """
+        paths = []
+        for root, _, files in os.walk(folder):
+            paths.extend(os.path.abspath(os.path.join(root, file)) for file in files if file.lower().endswith(IMAGE_EXTENSIONS))
+        prefix = os.path.abspath(folder) + os.sep
+        seen = set(paths)
+        gone = [path for path in self.entries if path.startswith(prefix) and path not in seen]
+        for path in gone:
+            del self.entries[path]
+        hashed = self.add_files(paths, progress)
+        if gone and not hashed:
+            self.save()  # add_files only saves when it hashed something
+        return hashed
+
+    def add_files(self, paths, progress=None):
+        """
+        Hashes pictures that are not cached or changed since they were hashed.
+
+        Args:
+            paths (iterable): Picture files.
+            progress (callable, optional): Called as progress(done, total) while hashing.
+
+        Returns:
+            int: Number of pictures hashed.
+        """
+        stale = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.entries.pop(path, None)
+                continue
+            entry = self.entries.get(path)
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                stale.append((path, stat.st_mtime_ns, stat.st_size))
+
+        if stale:
+            def hash_one(item):
+                try:
+                    return item, dhash(item[0])
+                except (OSError, ValueError) as e:
+                    log.warning("Cannot hash picture %s: %s", item[0], e)
+                    return item, None
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-hash") as executor:
+                for done, ((path, mtime_ns, size), value) in enumerate(executor.map(hash_one, stale), 1):
+                    if value is not None:
+                        self.entries[path] = [mtime_ns, size, value]
+                    if progress is not None:
+                        progress(done, len(stale))
+            self.save()
+        self.hashes = None
+        return len(stale)
+
+    def array(self):
+        """Returns (paths, uint64 hash array) of the indexed pictures."""
+        if self.hashes is None:
+            np = lazy_import("numpy")
+            self.paths = sorted(self.entries)
+            self.hashes = np.fromiter((self.entries[path][2] for path in self.paths), dtype=np.uint64, count=len(self.paths))
+        return self.paths, self.hashes
+
+    # Queries
+
+    def near(self, value, max_distance=4, within=None):
+        """
+        Finds pictures whose hash is within a Hamming distance of a hash.
+
+        Args:
+            value (int): A hash from dhash().
+            max_distance (int): Largest number of differing bits.
+            within (str, optional): Only pictures under this folder.
+
+        Returns:
+            list: (distance, path) tuples, closest first.
+        """
+        np = lazy_import("numpy")
+        paths, hashes = self.array()
+        if not paths:
+            return []
+        distances = popcount(hashes ^ np.uint64(value))
+        prefix = os.path.abspath(within) + os.sep if within else None
+        return sorted(
+            (int(distances[position]), paths[position])
+            for position in np.nonzero(distances <= max_distance)[0]
+            if (prefix is None or paths[position].startswith(prefix)) and os.path.exists(paths[position])
+        )
+
+    def duplicates_of(self, path, max_distance=4):
+        """Returns the indexed pictures that look like `path`, including itself, closest first."""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None:
+            return []
+        return [match for _, match in self.near(entry[2], max_distance)]
+
+    def duplicate_groups(self, max_distance=4, within=None):
+        """
+        Groups pictures that are near-duplicates of each other (transitively).
+
+        Args:
+            max_distance (int): Largest Hamming distance counted as a duplicate.
+            within (str, optional): Only pictures under this folder.
+
+        Returns:
+            list: Groups of two or more paths, each with its canonical picture first.
+        """
+        np = lazy_import("numpy")
+        paths, hashes = self.array()
+        if within:
+            prefix = os.path.abspath(within) + os.sep
+            selected = [position for position, path in enumerate(paths) if path.startswith(prefix)]
+            paths = [paths[position] for position in selected]
+            hashes = hashes[selected]
+
+        parents = list(range(len(paths)))
+
+        def find(position):
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+            return position
+
+        # One vectorized comparison per picture against all pictures after it
+        for position in range(len(paths) - 1):
+            for other in np.nonzero(popcount(hashes[position + 1:] ^ hashes[position]) <= max_distance)[0]:
+                parents[find(position + 1 + int(other))] = find(position)
+
+        groups = {}
+        for position, path in enumerate(paths):
+            groups.setdefault(find(position), []).append(path)
+        result = []
+        for group in groups.values():
+            group = [path for path in group if os.path.exists(path)]
+            if len(group) > 1:
+                canonical = self.canonical(group)
+                result.append([canonical] + sorted(path for path in group if path != canonical))
+        return sorted(result, key=lambda group: group[0])
+
+    def canonical(self, paths):
+        """
+        Picks the picture to use among duplicates: the oldest file, then the shortest path.
+        Re-saved copies are newer than the picture they were made from. Pictures deleted
+        since they were indexed are skipped.
+        """
+        existing = [path for path in paths if os.path.exists(path)] or list(paths)
+        return min(existing, key=lambda path: (self.entries.get(path, [float("inf")])[0], len(path), path))
+
+    def canonical_for(self, path, max_distance=4, within=None):
+        """
+        Returns the canonical picture of the duplicates of `path`, or `path` itself
+        if it has none or is not indexed.
+        """
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None:
+            return path
+        matches = [match for _, match in self.near(entry[2], max_distance, within)]
+        return self.canonical(matches) if len(matches) > 1 else path
@@ -0,0 +1,221 @@
+import bisect
+import functools
+import json
+import platform
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Inclusive upper bounds (ms) of the lag histogram buckets; the last bucket is open-ended
+LAG_BUCKETS_MS = (16, 33, 50, 100, 250, 500, 1000, 2000, 5000)
+
+
+class LagWatchdog:
+    """
+    Measures how responsive the Tk event loop is.
+
+    A heartbeat is scheduled with root.after every `interval_ms`; the delay
+    between when a beat was due and when it ran is the time the loop was busy.
+    Every lag goes into a histogram, and lags of at least `stall_ms` are kept as
+    stalls with the registered operations that ran during them. With
+    `sample_stacks`, a monitor thread grabs the main thread's stack while a stall
+    is still in progress, which shows where the time went.
+    """
+
+    def __init__(self, interval_ms=50, stall_ms=200, sample_stacks=False, max_stalls=200):
+        """
+        Args:
+            interval_ms (int): Heartbeat period.
+            stall_ms (int): Lag from which a beat counts as a stall.
+            sample_stacks (bool): Record the main thread's stack during stalls.
+            max_stalls (int): Number of most recent stalls kept.
+        """
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.sample_stacks = sample_stacks
+        self.root = None
+        self.job = None
+        self.monitor = None
+        self.lock = threading.Lock()
+        self.main_thread_id = threading.main_thread().ident
+        self.active = []  # Operations running on the main thread, outermost first
+        self.recent = set()  # Operations that ran since the last beat
+        self.reset(max_stalls)
+
+    def reset(self, max_stalls=None):
+        """Clears the collected measurements."""
+        with self.lock:
+            self.started = time.time()
+            self.beats = 0
+            self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+            self.total_lag_ms = 0.0
+            self.max_lag_ms = 0.0
+            self.stall_count = 0
+            self.recent_lags = deque(maxlen=10000)  # For percentiles
+            self.stalls = deque(maxlen=max_stalls or self.stalls.maxlen)
+            self.operations = {}  # Name -> {"stalls", "stall_ms", "max_ms"}
+            self.pending_sample = None
+        self.due = None
+
+    # Heartbeat
+
+    def start(self, root):
+        """Starts the heartbeat on a Tk root (and the stack sampler if enabled)."""
+        self.root = root
+        self.due = time.perf_counter() + self.interval_ms / 1000.0
+        self.job = root.after(self.interval_ms, self.beat)
+        self.set_stack_sampling(self.sample_stacks)
+
+    def set_stack_sampling(self, enabled):
+        """Turns the stack sampler thread on or off."""
+        self.sample_stacks = enabled
+        if enabled and (self.monitor is None or not self.monitor.is_alive()):
+            self.monitor = threading.Thread(target=self.watch_main_thread, name="lag-watchdog", daemon=True)
+            self.monitor.start()
+
+    def stop(self):
+        if self.root is not None and self.job is not None:
+            try:
+                self.root.after_cancel(self.job)
+            except Exception:
+                pass  # The root was already destroyed
+        self.root = None
+        self.job = None
+        self.due = None
+
+    def beat(self):
+        now = time.perf_counter()
+        if self.due is not None:
+            self.record(max(0.0, (now - self.due) * 1000.0))
+        if self.root is not None:
+            self.due = now + self.interval_ms / 1000.0
+            self.job = self.root.after(self.interval_ms, self.beat)
+
+    def record(self, lag_ms, operations=None):
+        """
+        Adds one heartbeat's lag to the statistics.
+
+        Args:
+            lag_ms (float): How late the beat ran.
+            operations (iterable, optional): Operations that ran during the lag.
+                Defaults to those registered since the previous beat.
+        """
+        with self.lock:
+            operations = sorted(self.recent if operations is None else operations)
+            self.recent = set(self.active)
+            sample, self.pending_sample = self.pending_sample, None
+
+            self.beats += 1
+            self.histogram[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+            self.total_lag_ms += lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self.recent_lags.append(lag_ms)
+            if lag_ms < self.stall_ms:
+                return
+
+            self.stall_count += 1
+            stall = {
+                "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "lag_ms": round(lag_ms, 1),
+                "operations": operations,
+            }
+            if sample is not None:
+                stall["stack"] = sample
+            self.stalls.append(stall)
+            for name in operations or ["(unregistered)"]:
+                stats = self.operations.setdefault(name, {"stalls": 0, "stall_ms": 0.0, "max_ms": 0.0})
+                stats["stalls"] += 1
+                stats["stall_ms"] += lag_ms
+                stats["max_ms"] = max(stats["max_ms"], lag_ms)
+
+    def watch_main_thread(self):
+        """Monitor thread: samples the main thread's stack once per stall, while it is stalled."""
+        sampled_due = None
+        while self.sample_stacks:
+            time.sleep(self.stall_ms / 2000.0)
+            due = self.due
+            if due is None or due == sampled_due:
+                continue
+            if (time.perf_counter() - due) * 1000.0 < self.stall_ms:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            with self.lock:
+                self.pending_sample = [line.rstrip() for line in traceback.format_stack(frame)][-25:]
+            sampled_due = due
+
+    # Operation registry
+
+    @contextmanager
+    def operation(self, name):
+        """
+        Marks a block of main-thread work, so stalls during it are attributed to `name`.
+        """
+        with self.lock:
+            self.active.append(name)
+            self.recent.add(name)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active.remove(name)
+
+    def track(self, name=None):
+        """Decorator form of operation(); the name defaults to the function's qualified name."""
+        def decorate(function):
+            label = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.operation(label):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # Results
+
+    def percentile(self, lags, fraction):
+        if not lags:
+            return 0.0
+        return lags[min(len(lags) - 1, int(fraction * len(lags)))]
+
+    def report(self):
+        """Returns the measurements as a JSON-serializable dictionary (milliseconds)."""
+        with self.lock:
+            lags = sorted(self.recent_lags)
+            labels = [f"<={bound}" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}"]
+            return {
+                "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+                "duration_s": round(time.time() - self.started, 1),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "interval_ms": self.interval_ms,
+                "stall_ms": self.stall_ms,
+                "beats": self.beats,
+                "mean_lag_ms": round(self.total_lag_ms / self.beats, 2) if self.beats else 0.0,
+                "p50_lag_ms": round(self.percentile(lags, 0.50), 1),
+                "p95_lag_ms": round(self.percentile(lags, 0.95), 1),
+                "p99_lag_ms": round(self.percentile(lags, 0.99), 1),
+                "max_lag_ms": round(self.max_lag_ms, 1),
+                "histogram": dict(zip(labels, self.histogram)),
+                "stall_count": self.stall_count,
+                "operations": {
+                    name: {"stalls": stats["stalls"], "stall_ms": round(stats["stall_ms"], 1), "max_ms": round(stats["max_ms"], 1)}
+                    for name, stats in sorted(self.operations.items(), key=lambda item: -item[1]["stall_ms"])
+                },
+                "stalls": list(self.stalls),
+            }
+
+    def write(self, file_path):
+        """Writes the JSON report to a file."""
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=4)
+
+
+# Shared watchdog started by the main window; GUI code registers its operations here
+watchdog = LagWatchdog()
@@ -0,0 +1,158 @@
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_right
+
+
+class LineDocument:
+    """
+    Read-only text document addressed by line number.
+
+    The bytes are memory-mapped from a file or held once for rendered output, and
+    a line-offset index is built in one pass, so any range of lines can be decoded
+    without materializing the whole document as Python strings.
+    """
+
+    def __init__(self, data, source=None):
+        """
+        Args:
+            data (bytes or mmap.mmap): UTF-8 document bytes.
+            source (str, optional): Path of the file the bytes came from.
+        """
+        self.data = data
+        self.source = source
+        self.offsets = array("Q", [0])
+        position = data.find(b"\n")
+        while position != -1:
+            self.offsets.append(position + 1)
+            position = data.find(b"\n", position + 1)
+        self.end = len(data)
+        if len(self.offsets) > 1 and self.offsets[-1] == len(data):
+            self.offsets.pop()  # A trailing newline does not start another line
+            self.end -= 1
+
+    @classmethod
+    def from_file(cls, file_path, snapshot=False):
+        """
+        Memory-maps a file. Empty files cannot be mapped, and on Windows a mapped file
+        cannot be replaced by the editor saving it, so those are read normally.
+
+        Args:
+            file_path (str): The file.
+            snapshot (bool): Map a private copy instead of the file itself. Use it for
+                files other programs write to (the Shotcut project): truncating a
+                mapped file in place makes reads of the lost pages crash the process (SIGBUS).
+        """
+        with open(file_path, "rb") as file:
+            if os.name == "nt":
+                return cls(file.read(), file_path)
+            if snapshot:
+                # Anonymous temporary file: nobody else can write to it, and it is removed once unmapped
+                with tempfile.TemporaryFile() as copy:
+                    shutil.copyfileobj(file, copy, 1024 * 1024)
+                    copy.flush()
+                    return cls(cls.map(copy), file_path)
+            return cls(cls.map(file), file_path)
+
+    @staticmethod
+    def map(file):
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            file.seek(0)
+            return file.read()  # Empty file
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(text.encode("utf-8"))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def replace_lines(self, first, last, text):
+        """
+        Returns a new document with the lines first..last-1 (0-based) replaced by text.
+
+        Args:
+            first (int): First replaced line.
+            last (int): Line after the last replaced one.
+            text (str): Replacement, without a trailing newline.
+        """
+        start = self.offsets[first] if first < len(self.offsets) else self.end
+        end = self.offsets[last] - 1 if last < len(self.offsets) else self.end
+        return LineDocument(self.data[:start] + text.encode("utf-8") + self.data[end:], self.source)
+
+    def line_span(self, number):
+        """Returns the (start, end) byte offsets of a 0-based line, without its newline."""
+        start = self.offsets[number]
+        end = self.offsets[number + 1] - 1 if number + 1 < len(self.offsets) else self.end
+        if end > start and self.data[end - 1:end] == b"\r":
+            end -= 1
+        return start, end
+
+    def line(self, number):
+        start, end = self.line_span(number)
+        return self.data[start:end].decode("utf-8", errors="replace")
+
+    def lines(self, first, last):
+        """Returns the lines first..last-1 (0-based), clamped to the document."""
+        first = max(0, first)
+        last = min(len(self.offsets), last)
+        return [self.line(number) for number in range(first, last)]
+
+    def iter_lines(self):
+        for number in range(len(self.offsets)):
+            yield self.line(number)
+
+    def text(self):
+        """Decodes the whole document."""
+        return self.data[:].decode("utf-8", errors="replace")
+
+    def line_of_offset(self, offset):
+        """Returns the 0-based line containing a byte offset."""
+        return bisect_right(self.offsets, offset) - 1
+
+    def find_id(self, element_id):
+        """
+        Finds the element with an id attribute.
+
+        Args:
+            element_id (str): Value of the id attribute, e.g. "producer3".
+
+        Returns:
+            int or None: The 0-based line of the element, or None if no element has that id.
+        """
+        pattern = re.compile(rb"""\sid=(["'])""" + re.escape(element_id.encode("utf-8")) + rb"\1")
+        match = pattern.search(self.data)
+        return self.line_of_offset(match.start()) if match else None
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+def changed_lines(original_lines, output_lines):
+    """
+    Compares two lists of lines, ignoring surrounding whitespace.
+
+    A plain function of picklable lists, so the diff can run in a worker process.
+
+    Returns:
+        tuple: (set of changed or deleted line indexes of the original,
+                set of changed or inserted line indexes of the output)
+    """
+    import difflib
+
+    original = [line.strip() for line in original_lines]
+    output = [line.strip() for line in output_lines]
+    original_diff, output_diff = set(), set()
+    matcher = difflib.SequenceMatcher(None, original, output)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "delete"):  # Lines that differ or were deleted from the original
+            original_diff.update(range(i1, i2))
+        if tag in ("replace", "insert"):  # Lines that differ or were added to the output
+            output_diff.update(range(j1, j2))
+    return original_diff, output_diff
@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right
+from Services.timecode import parse_timecode
+
+
+class MarkerIndex:
+    """
+    Sorted interval index over marker start and end times.
+
+    Markers are stored sorted by start time, so point and range queries are
+    answered with a binary search instead of a scan over every marker. Queries
+    for the markers containing a time use a centered interval tree, so they take
+    O(log n + k) time for k results even when long markers span many short ones.
+    Query results are positions in the marker list the index was built from.
+    """
+
+    def __init__(self, markers):
+        """
+        Builds the index.
+
+        Args:
+            markers (list): Marker dictionaries with "StartTime" and optional "EndTime".
+        """
+        entries = []
+        for position, marker in enumerate(markers):
+            try:
+                start = parse_timecode(marker.get("StartTime"))
+            except ValueError:
+                continue  # Markers without a usable start time cannot be placed on the timeline
+
+            try:
+                end = parse_timecode(marker.get("EndTime"))
+            except ValueError:
+                end = start
+            entries.append((start, max(start, end), position))
+
+        entries.sort()
+        self.starts = [start for start, _, _ in entries]
+        self.ends = [end for _, end, _ in entries]
+        self.positions = [position for _, _, position in entries]
+        self.start_by_position = {position: start for start, _, position in entries}
+        self.tree = self.build_tree(list(range(len(entries))))
+
+    def build_tree(self, slots):
+        """
+        Builds a centered interval tree over slots (indexes into the sorted lists).
+
+        Each node is (center, slots spanning the center by ascending start, the same
+        by descending end, left subtree, right subtree). The center is the median
+        start, so each subtree holds at most half the slots and the depth is O(log n).
+        """
+        if not slots:
+            return None
+        center = self.starts[slots[len(slots) // 2]]
+        left, spanning, right = [], [], []
+        for slot in slots:
+            if self.ends[slot] < center:
+                left.append(slot)
+            elif self.starts[slot] > center:
+                right.append(slot)
+            else:
+                spanning.append(slot)
+        by_end = sorted(spanning, key=lambda slot: self.ends[slot], reverse=True)
+        return (center, spanning, by_end, self.build_tree(left), self.build_tree(right))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def start_of(self, position):
+        """Returns the start time in seconds of the marker at the given list position, or None."""
+        return self.start_by_position.get(position)
+
+    def current(self, seconds):
+        """
+        Returns the marker the playhead is in: the last marker starting at or before `seconds`.
+
+        Args:
+            seconds (float): Playhead time in seconds.
+
+        Returns:
+            int or None: Marker position, or None if the playhead is before the first marker.
+        """
+        slot = bisect_right(self.starts, seconds) - 1
+        if slot < 0:
+            return None
+        return self.positions[slot]
+
+    def containing(self, seconds):
+        """
+        Returns every marker whose [start, end] interval contains `seconds`.
+
+        Args:
+            seconds (float): Time in seconds.
+
+        Returns:
+            list: Marker positions ordered by start time.
+        """
+        found = []
+        node = self.tree
+        while node is not None:
+            center, by_start, by_end, left, right = node
+            if seconds < center:
+                # Every spanning marker ends at or after the center, so only its start matters
+                for slot in by_start:
+                    if self.starts[slot] > seconds:
+                        break
+                    found.append(slot)
+                node = left
+            else:
+                for slot in by_end:
+                    if self.ends[slot] < seconds:
+                        break
+                    found.append(slot)
+                node = right if seconds > center else None
+        found.sort()
+        return [self.positions[slot] for slot in found]
+
+    def between(self, start, end):
+        """
+        Returns every marker overlapping the range [start, end].
+
+        Args:
+            start (float): Range start in seconds.
+            end (float): Range end in seconds.
+
+        Returns:
+            list: Marker positions ordered by start time.
+        """
+        found = self.containing(start)
+        first = bisect_right(self.starts, start)
+        last = bisect_right(self.starts, end)
+        found.extend(self.positions[first:last])
+        return found
+
+    def next_after(self, seconds):
+        """
+        Returns the first marker starting strictly after `seconds`.
+
+        Args:
+            seconds (float): Time in seconds.
+
+        Returns:
+            int or None: Marker position, or None if there is no later marker.
+        """
+        slot = bisect_right(self.starts, seconds)
+        if slot >= len(self.starts):
+            return None
+        return self.positions[slot]
+
+    def previous_before(self, seconds, tolerance=0.5):
+        """
+        Returns the last marker starting before `seconds`.
+
+        Markers starting within `tolerance` seconds before the playhead are skipped,
+        so pressing "previous" repeatedly during playback keeps moving backwards.
+
+        Args:
+            seconds (float): Time in seconds.
+            tolerance (float): Grace period in seconds.
+
+        Returns:
+            int or None: Marker position, or None if there is no earlier marker.
+        """
+        slot = bisect_left(self.starts, seconds - tolerance) - 1
+        if slot < 0:
+            return None
+        return self.positions[slot]
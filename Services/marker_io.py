@@ -0,0 +1,330 @@
+import csv
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from itertools import chain
+from xml.parsers import expat
+from Services.mlt_splice import atomic_write, copy_range, file_indentation, file_tag_end
+from Services.timecode import format_timecode, parse_timecode
+
+# Columns written for every marker, in order
+MARKER_FIELDS = ["Number", "Name", "StartTime", "EndTime", "Color", "Picture", "Video"]
+
+# Extra marker properties used to keep Picture/Video assignments in the .mlt markers block
+ASSIGNMENT_PROPERTIES = {"Picture": "ltd:picture", "Video": "ltd:video"}
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".edl": "edl", ".mlt": "mlt", ".xml": "mlt"}
+
+EDL_EVENT = re.compile(r"^(\d{3,})\s+\S+\s+\S+\s+\S+\s+(\d{2}:\d{2}:\d{2}[:;]\d{2})\s+(\d{2}:\d{2}:\d{2}[:;]\d{2})")
+
+
+def detect_format(file_path):
+    """Returns the marker file format for a path from its extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported marker file type: {extension or file_path}")
+    return FORMATS[extension]
+
+
+def normalize_marker(marker, number):
+    """Returns a marker dictionary with every field present."""
+    normalized = {field: marker.get(field, "") or "" for field in MARKER_FIELDS}
+    normalized["Number"] = int(marker.get("Number", number) or number)
+    if not normalized["EndTime"]:
+        normalized["EndTime"] = normalized["StartTime"]
+    return normalized
+
+
+# Reading
+
+def read_markers(file_path, file_format=None):
+    """
+    Reads markers one at a time, so arbitrarily long lists use bounded memory.
+
+    Args:
+        file_path (str): CSV, JSON Lines, EDL or .mlt file.
+        file_format (str, optional): "csv", "jsonl", "edl" or "mlt". Defaults to the extension.
+
+    Yields:
+        dict: Marker dictionaries including Picture and Video assignments.
+    """
+    file_format = file_format or detect_format(file_path)
+    readers = {"csv": read_csv, "jsonl": read_jsonl, "edl": read_edl, "mlt": read_mlt}
+    for number, marker in enumerate(readers[file_format](file_path)):
+        yield normalize_marker(marker, number)
+
+
+def read_csv(file_path):
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        yield from csv.DictReader(file)
+
+
+def read_jsonl(file_path):
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_edl(file_path, fps=30):
+    """
+    Reads a CMX3600 EDL written by write_edl, or any EDL with one event per marker.
+
+    Exact times, colors and assignments come from the "* MARKER" comments when
+    present; otherwise the record in/out timecodes are used.
+    """
+    marker = None
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.rstrip("\r\n")
+            event = EDL_EVENT.match(line)
+            if event:
+                if marker is not None:
+                    yield marker
+                marker = {
+                    "Name": "",
+                    "StartTime": format_timecode(edl_timecode_to_seconds(event.group(2), fps)),
+                    "EndTime": format_timecode(edl_timecode_to_seconds(event.group(3), fps)),
+                }
+            elif marker is not None and line.startswith("* FROM CLIP NAME:"):
+                marker["Name"] = line.split(":", 1)[1].strip()
+            elif marker is not None and line.startswith("* MARKER "):
+                key, _, value = line[len("* MARKER "):].partition("=")
+                if key in MARKER_FIELDS:
+                    marker[key] = value
+    if marker is not None:
+        yield marker
+
+
+def read_mlt(file_path):
+    """Streams the markers block of an .mlt file with iterparse."""
+    inside_markers = False
+    marker = None
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if element.tag != "properties" and element.tag != "property":
+            if event == "end" and not inside_markers:
+                element.clear()  # Drop the rest of the project as it streams past
+            continue
+        name = element.get("name")
+        if event == "start" and element.tag == "properties":
+            if name == "shotcut:markers":
+                inside_markers = True
+            elif inside_markers:
+                marker = {}
+        elif event == "end" and element.tag == "property" and marker is not None:
+            key = {"text": "Name", "start": "StartTime", "end": "EndTime", "color": "Color"}.get(name)
+            for field, property_name in ASSIGNMENT_PROPERTIES.items():
+                if name == property_name:
+                    key = field
+            if key:
+                marker[key] = element.text or ""
+        elif event == "end" and element.tag == "properties":
+            if name == "shotcut:markers":
+                return
+            if inside_markers and marker is not None:
+                yield marker
+                marker = None
+                element.clear()
+
+
+# Writing
+
+def write_markers(markers, file_path, file_format=None):
+    """
+    Writes markers one at a time.
+
+    Args:
+        markers (iterable): Marker dictionaries; may be a generator.
+        file_path (str): Destination file.
+        file_format (str, optional): "csv", "jsonl", "edl" or "mlt". Defaults to the extension.
+            For "mlt" the file must exist; its markers block is replaced.
+
+    Returns:
+        int: Number of markers written.
+    """
+    file_format = file_format or detect_format(file_path)
+    normalized = (normalize_marker(marker, number) for number, marker in enumerate(markers))
+    if file_format == "mlt":
+        return write_mlt_markers(file_path, normalized)
+
+    writers = {"csv": write_csv, "jsonl": write_jsonl, "edl": write_edl}
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8", newline="") as file:
+        count = writers[file_format](normalized, file)
+    os.replace(temp_path, file_path)
+    return count
+
+
+def write_csv(markers, file):
+    writer = csv.DictWriter(file, fieldnames=MARKER_FIELDS)
+    writer.writeheader()
+    count = 0
+    for marker in markers:
+        writer.writerow(marker)
+        count += 1
+    return count
+
+
+def write_jsonl(markers, file):
+    count = 0
+    for marker in markers:
+        file.write(json.dumps(marker, ensure_ascii=False))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def write_edl(markers, file, fps=30, title="Markers"):
+    """
+    Writes one CMX3600 event per marker.
+
+    EDL timecodes are frame-based, so exact times, color and assignments are also
+    kept in "* MARKER key=value" comments that read_edl uses for a lossless round trip.
+    """
+    file.write(f"TITLE: {title}\nFCM: NON-DROP FRAME\n\n")
+    count = 0
+    for marker in markers:
+        count += 1
+        start = seconds_to_edl_timecode(parse_timecode(marker["StartTime"]), fps)
+        end = seconds_to_edl_timecode(max(parse_timecode(marker["EndTime"]), parse_timecode(marker["StartTime"]) + 1 / fps), fps)
+        file.write(f"{count:03d}  AX       V     C        {start} {end} {start} {end}\n")
+        file.write(f"* FROM CLIP NAME: {marker['Name']}\n")
+        for field in ("StartTime", "EndTime", "Color", "Picture", "Video"):
+            if marker[field]:
+                file.write(f"* MARKER {field}={marker[field]}\n")
+        file.write("\n")
+    return count
+
+
+def write_mlt_markers(file_path, markers):
+    """
+    Replaces the markers block of an .mlt file, keeping Picture/Video assignments as extra properties.
+
+    Only the bytes of the `shotcut:markers` properties change (or the block is
+    inserted before the first track); the rest of the project, including its
+    formatting, comments and declaration, stays byte-identical. The project is
+    scanned and copied in blocks and the markers are serialized one at a time
+    as they are written, so memory stays bounded for any number of markers.
+    The file is written through a temporary file and swapped in atomically.
+
+    Returns:
+        int: Number of markers written.
+    """
+    block = find_markers_block(file_path)
+    with open(file_path, "rb") as file:
+        if block["markers"] is not None:
+            start, end_tag = block["markers"]
+            start_tag_end = file_tag_end(file, start)
+            file.seek(start_tag_end - 2)
+            end = start_tag_end if file.read(1) == b"/" else file_tag_end(file, end_tag)
+            indent = file_indentation(file, start)
+            before = after = b""
+        elif block["tractor"] is None:
+            raise ValueError(f"No <tractor> to hold markers in {file_path}")
+        elif block["track"] is not None:
+            start = end = block["track"]
+            indent = file_indentation(file, start)
+            before, after = b"", b"\n" + indent
+        else:
+            tractor_start, end_tag = block["tractor"]
+            start_tag_end = file_tag_end(file, tractor_start)
+            file.seek(start_tag_end - 2)
+            if file.read(1) == b"/":
+                raise ValueError(f"<tractor> is an empty-element tag in {file_path}")
+            start = end = end_tag
+            tractor_indent = file_indentation(file, tractor_start)
+            indent = tractor_indent + b"  "
+            before, after = b"  ", b"\n" + tractor_indent
+
+    count = 0
+
+    def markers_block():
+        nonlocal count
+        level = len(indent) // 2
+        for number, marker in enumerate(markers):
+            if number == 0:
+                yield b'<properties name="shotcut:markers">'
+            marker_element = ET.Element("properties", name=str(number))
+            ET.SubElement(marker_element, "property", name="text").text = marker["Name"]
+            ET.SubElement(marker_element, "property", name="start").text = marker["StartTime"]
+            ET.SubElement(marker_element, "property", name="end").text = marker["EndTime"]
+            ET.SubElement(marker_element, "property", name="color").text = marker["Color"] or "#FFFFFF"
+            for field, property_name in ASSIGNMENT_PROPERTIES.items():
+                if marker[field]:
+                    ET.SubElement(marker_element, "property", name=property_name).text = marker[field]
+            ET.indent(marker_element, space="  ", level=level + 1)
+            yield b"\n" + b"  " * (level + 1) + ET.tostring(marker_element, encoding="utf-8", xml_declaration=False)
+            count += 1
+        yield b"\n" + b"  " * level + b"</properties>" if count else b'<properties name="shotcut:markers" />'
+
+    atomic_write(file_path, chain(copy_range(file_path, 0, start), [before], markers_block(), [after], copy_range(file_path, end)))
+    return count
+
+
+class ScanDone(Exception):
+    """Stops find_markers_block once the markers block has been found."""
+
+
+def find_markers_block(file_path):
+    """
+    Streams an .mlt file with expat and locates where its markers block goes, without building a tree.
+
+    Returns:
+        dict: "markers": (start, end tag offset) of the first `shotcut:markers` properties,
+            "tractor": (start, end tag offset) of the first tractor, "track": start of its
+            first track; each None if there is none. An end tag offset is where expat
+            reported the end of the element; see write_mlt_markers for reading it.
+    """
+    parser = expat.ParserCreate()
+    depth = 0
+    found = {"markers": None, "tractor": None, "track": None}
+    open_at = {}  # Depth of the markers block and tractor -> their start offset
+
+    def start_element(tag, attributes):
+        nonlocal depth
+        index = parser.CurrentByteIndex
+        if tag == "properties" and attributes.get("name") == "shotcut:markers" and "markers" not in open_at:
+            open_at["markers"] = (depth, index)
+        elif tag == "tractor" and "tractor" not in open_at:
+            open_at["tractor"] = (depth, index)
+        elif tag == "track" and found["track"] is None and found["tractor"] is None and open_at.get("tractor", (None,))[0] == depth - 1:
+            found["track"] = index
+        depth += 1
+
+    def end_element(tag):
+        nonlocal depth
+        depth -= 1
+        for name in ("markers", "tractor"):
+            if name in open_at and found[name] is None and open_at[name][0] == depth:
+                found[name] = (open_at[name][1], parser.CurrentByteIndex)
+        if found["markers"] is not None:
+            raise ScanDone()
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    with open(file_path, "rb") as file:
+        try:
+            parser.ParseFile(file)
+        except ScanDone:
+            pass
+        except expat.ExpatError as e:
+            raise ValueError(f"{file_path} is not valid XML: {e}") from e
+    return found
+
+
+# EDL timecodes
+
+def seconds_to_edl_timecode(seconds, fps=30):
+    """Formats seconds as an HH:MM:SS:FF timecode."""
+    total_frames = int(round(seconds * fps))
+    total_seconds, frames = divmod(total_frames, fps)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02}:{frames:02}"
+
+
+def edl_timecode_to_seconds(timecode, fps=30):
+    """Parses an HH:MM:SS:FF (or drop-frame HH:MM:SS;FF) timecode to seconds."""
+    hours, minutes, seconds, frames = (int(part) for part in re.split(r"[:;]", timecode))
+    return hours * 3600 + minutes * 60 + seconds + frames / fps
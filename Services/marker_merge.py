@@ -0,0 +1,55 @@
+from collections import defaultdict, deque
+
+ASSIGNMENT_FIELDS = ("Picture", "Video")
+
+
+def merge_markers(current, reloaded):
+    """
+    Merges a freshly extracted marker list into the current one.
+
+    The reloaded list decides which markers exist, their order, times, names and
+    colors. Picture and Video assignments are carried over from the current list:
+    first from the marker with the same name and start time, then from the next
+    unused marker with the same name (for markers that were moved), so
+    assignments survive edits made in Shotcut.
+
+    Args:
+        current (list): Markers shown in the app, with assignments.
+        reloaded (list): Markers extracted from the changed project.
+
+    Returns:
+        list: The reloaded markers with assignments filled in.
+    """
+    by_position = {}
+    by_name = defaultdict(deque)
+    for marker in current:
+        if not any(marker.get(field) for field in ASSIGNMENT_FIELDS):
+            continue
+        by_position.setdefault((marker.get("Name"), marker.get("StartTime")), marker)
+        by_name[marker.get("Name")].append(marker)
+
+    used = set()
+    unmatched = []
+    for marker in reloaded:
+        previous = by_position.get((marker.get("Name"), marker.get("StartTime")))
+        if previous is not None and id(previous) not in used:
+            copy_assignments(previous, marker)
+            used.add(id(previous))
+        else:
+            unmatched.append(marker)
+
+    for marker in unmatched:
+        candidates = by_name.get(marker.get("Name"))
+        while candidates and id(candidates[0]) in used:
+            candidates.popleft()
+        if candidates:
+            previous = candidates.popleft()
+            copy_assignments(previous, marker)
+            used.add(id(previous))
+    return reloaded
+
+
+def copy_assignments(source, target):
+    for field in ASSIGNMENT_FIELDS:
+        if source.get(field) and not target.get(field):
+            target[field] = source[field]
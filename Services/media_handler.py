@@ -1,5 +1,10 @@
 import os
 import xml.etree.ElementTree as ET
+from Services.app_logging import get_logger
+from Services.asset_index import AssetIndex
+from Services.marker_io import ASSIGNMENT_PROPERTIES
+
+log = get_logger(__name__)
 
 class MediaHandler:
     # Existing functions...
@@ -35,10 +40,10 @@ class MediaHandler:
 
             # Write the modified XML to the output file
             tree.write(output_file_path, encoding="utf-8", xml_declaration=True)
-            print(f"Exported modified .mlt file to {output_file_path}")
+            log.info("Exported modified .mlt file to %s", output_file_path)
             return output_file_path
         except Exception as e:
-            print(f"An error occurred during processing: {e}")
+            log.error("An error occurred during processing: %s", e)
             return None
         
     def extract_markers_from_file(self, file_path):
@@ -59,7 +64,7 @@ class MediaHandler:
             # Locate the markers section
             markers_element = root.find(".//properties[@name='shotcut:markers']")
             if not markers_element:
-                print("No markers found in the file.")
+                log.info("No markers found in the file.")
                 return []
 
             # Extract each marker's details
@@ -74,16 +79,37 @@ class MediaHandler:
                     "Picture": "",  # Default empty
                     "Video": ""    # Default empty
                 }
+                # Assignments written back by marker_io.write_mlt_markers
+                for key, property_name in ASSIGNMENT_PROPERTIES.items():
+                    assignment = marker_element.find(f"property[@name='{property_name}']")
+                    if assignment is not None and assignment.text:
+                        marker[key] = assignment.text
                 markers.append(marker)
 
-            print(f"Extracted {len(markers)} markers with colors.")
+            log.info("Extracted %d markers with colors.", len(markers))
             return markers
 
         except ET.ParseError as e:
-            print(f"Error parsing XML: {e}")
+            log.error("Error parsing XML: %s", e)
             return []
         except Exception as e:
-            print(f"An error occurred while extracting markers: {e}")
+            log.error("An error occurred while extracting markers: %s", e)
             return []
-        
-        
\ No newline at end of file
+
+    def find_matching_files(self, markers, folder, file_types):
+        """
+        Finds a file named after each marker, searching the folder recursively.
+
+        The folder is walked once and indexed by lower-case file name (see
+        AssetIndex). A match in a shallower directory wins, and within one
+        directory the first extension in `file_types` wins.
+
+        Args:
+            markers (list): Marker dictionaries with a "Name".
+            folder (str): Folder to search.
+            file_types (list): Valid file extensions, e.g. [".png", ".jpg"].
+
+        Returns:
+            dict: Marker index -> full path of the matching file.
+        """
+        return AssetIndex(folder).match_markers(markers, file_types)
@@ -0,0 +1,221 @@
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from xml.dom import minidom
+from Services.app_logging import get_logger
+from Services.id_allocator import IdAllocator
+from Services.marker_io import MARKER_FIELDS
+from Services.producer_registry import ProducerRegistry, normalize_resource
+from Services.producer_templates import TEMPLATES
+from Services.project_validator import frame_duration
+from Services.timecode import format_timecode, parse_timecode
+from Services.track_packer import pack_intervals
+from Services.tractor_graph import TractorGraph
+
+log = get_logger(__name__)
+
+# Length of each marker picture on the timeline
+ENTRY_DURATION = "00:00:00.483"
+
+
+def prettify_xml_with_no_extra_lines(element):
+    """Prettify XML and remove unnecessary blank lines."""
+    rough_string = ET.tostring(element, encoding="utf-8")
+    pretty_string = minidom.parseString(rough_string).toprettyxml(indent="  ")
+    # Remove extra blank lines
+    lines = [line for line in pretty_string.splitlines() if line.strip()]
+    return "\n".join(lines)
+
+
+def add_marker_producers(root, markers, template=None):
+    """
+    Add a producer for every distinct marker resource that has none yet.
+
+    Markers without a resource are skipped with a warning.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+        markers (list): Marker dictionaries.
+        template (ProducerTemplate, optional): Template stamped for each producer; its
+            source field (Picture, Video or Color) is the resource. Defaults to qimage.
+
+    Returns:
+        list: Ids of the new producers.
+    """
+    template = template or TEMPLATES["qimage"]
+    prefix = "chain" if template.tag == "chain" else "producer"
+
+    # Producers that already exist in the document are reused for the same resource
+    registry = ProducerRegistry(root)
+
+    # Insert new producers, in marker order, after the last playlist
+    playlist = root.find(".//playlist[last()]")
+    insert_index = list(root).index(playlist) + 1 if playlist is not None else None
+
+    # Fresh producer IDs come from the ids used in the document
+    allocator = IdAllocator(root)
+
+    # One creation time for the whole batch
+    creation_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+    added = []
+    for marker in markers:
+        marker_name = marker.get("Name", "unknown")
+        resource = normalize_resource(marker.get(template.source, None))  # Ensure correct slashes
+
+        # Skip markers without a resource
+        if not resource:
+            log.warning("Marker '%s' has no %s assigned. Skipping.", marker_name, template.source.lower())
+            continue
+
+        if resource in registry:
+            continue  # Share the existing producer for this asset
+
+        producer_id = allocator.allocate(prefix)
+        producer = template.stamp({
+            **dict.fromkeys(MARKER_FIELDS, ""),  # Every slot a template may name has a value
+            **marker,
+            "id": producer_id,
+            "resource": resource,
+            "caption": os.path.basename(resource),
+            "creation_time": creation_time,
+            "hash": hashlib.md5(f"{producer_id}_{marker_name}_{creation_time}".encode("utf-8")).hexdigest(),
+        })
+
+        # Add the producer element after the last </playlist>
+        if insert_index is not None:
+            root.insert(insert_index, producer)
+            insert_index += 1
+        registry.register(resource, producer_id)
+        added.append(producer_id)
+
+    return added
+
+
+def marker_duration(marker, default=ENTRY_DURATION):
+    """
+    Length of a marker's entry on the timeline.
+
+    Args:
+        marker (dict): Marker dictionary.
+        default (str): Duration used when the marker has no EndTime after its StartTime.
+
+    Returns:
+        float: The duration in seconds.
+    """
+    start = parse_timecode(marker["StartTime"])
+    try:
+        end = parse_timecode(marker.get("EndTime"))
+    except ValueError:
+        end = start
+    return end - start if end > start else parse_timecode(default)
+
+
+def add_marker_playlists(root, markers, source="Picture"):
+    """
+    Add playlists for the markers, immediately after the producers, and a track for each.
+
+    Every marker gets an entry from its StartTime to its EndTime (or ENTRY_DURATION for
+    point markers); the entry's out point is its last frame, one profile frame before
+    the end. Entries that would overlap are packed onto as few extra tracks as
+    possible, so no entry is shifted or cut short.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+        markers (list): Marker dictionaries; markers whose resource has no producer are skipped.
+        source (str): Marker field holding the resource (Picture, Video or Color).
+
+    Returns:
+        list: Ids of the new playlists, bottom track first; empty if no marker has a producer.
+    """
+    # Shared producers, keyed by resource (created by "Add Producer")
+    registry = ProducerRegistry(root)
+
+    # Entries run from their in point through their out frame, so out is one frame before the end
+    frame = frame_duration(root)
+    intervals = []
+    for marker in markers:
+        resource = marker.get(source, None)
+        producer_id = registry.lookup(resource) if resource else None
+        if producer_id is None:
+            log.warning("Marker '%s' has no producer for its %s. Skipping.", marker.get('Name', 'unknown'), source.lower())
+            continue
+        start = parse_timecode(marker["StartTime"])
+        intervals.append((start, start + max(marker_duration(marker), frame) - frame, producer_id))
+    if not intervals:
+        log.warning("No marker has a producer for its %s; no playlist added.", source.lower())
+        return []
+
+    # Allocate the new playlist IDs from the ids used in the document
+    allocator = IdAllocator(root)
+
+    playlists = []
+    for lane in pack_intervals(intervals):
+        new_playlist_id = allocator.allocate_number("playlist")
+        playlist = ET.Element("playlist", id=f"playlist{new_playlist_id}")
+        ET.SubElement(playlist, "property", name="shotcut:video").text = "1"
+        ET.SubElement(playlist, "property", name="shotcut:name").text = f"V{new_playlist_id}"
+
+        # Add Blank Space and Entry Producer to playlist. The position follows the
+        # rounded times as written, so rounding never adds up along the playlist.
+        position = 0.0
+        for start, last, producer_id in lane:
+            blank = format_timecode(start - position)
+            out = format_timecode(last - start)
+            ET.SubElement(playlist, "blank", length=blank)
+            ET.SubElement(playlist, "entry", producer=producer_id, **{"in": "00:00:00.000", "out": out})
+            position += parse_timecode(blank) + parse_timecode(out) + frame
+        playlists.append(playlist)
+
+    # Find the last <producer> and the <tractor> element
+    last_producer = root.find(".//producer[last()]")
+    tractor = root.find(".//tractor")
+
+    if last_producer is not None and tractor is not None:
+        # Insert the new playlists after the last producer and before the tractor
+        producer_index = list(root).index(last_producer)
+        for offset, playlist in enumerate(playlists):
+            root.insert(producer_index + 1 + offset, playlist)
+    else:
+        log.error("Could not find <producer> or <tractor> to determine insertion point.")
+
+    if tractor is not None and tractor.find("track") is not None:
+        # Add the tracks on top of the existing ones; transitions refer to tracks by
+        # position, so appending after the last track leaves them all valid
+        last_track = tractor.findall("track")[-1]
+        index = list(tractor).index(last_track)
+        for offset, playlist in enumerate(playlists):
+            tractor.insert(index + 1 + offset, ET.Element("track", producer=playlist.get("id")))
+    else:
+        log.error("Could not find the <track> section.")
+
+    return [playlist.get("id") for playlist in playlists]
+
+
+def add_missing_transitions(root):
+    """
+    Add the transitions Shotcut expects for every track that are still missing.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+
+    Returns:
+        list or None: Ids of the new transitions, or None if the document has no tractor.
+    """
+    # Locate the tractor element
+    tractor = root.find(".//tractor")
+    if tractor is None:
+        log.error("No <tractor> element found in the XML.")
+        return None
+
+    # Index the tracks and transitions once
+    graph = TractorGraph(tractor)
+    allocator = IdAllocator(root)
+
+    added = []
+    for transition in graph.missing_transitions():
+        transition_id = allocator.allocate("transition")
+        graph.add_transition(transition_id, transition)
+        added.append(transition_id)
+    return added
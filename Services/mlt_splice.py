@@ -0,0 +1,236 @@
+import os
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+
+class SpliceError(Exception):
+    """Raised when the output cannot be expressed as insertions into the original file."""
+
+
+def atomic_write(file_path, chunks):
+    """
+    Writes byte chunks to a temporary file next to the target, then swaps it in.
+
+    Args:
+        file_path (str): Destination file.
+        chunks (iterable): Byte strings (or memoryviews) written in order.
+    """
+    temp_path = f"{file_path}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def parse_with_offsets(data):
+    """
+    Parses an XML document and records where every element sits in the bytes.
+
+    Args:
+        data (bytes): The document.
+
+    Returns:
+        tuple: (root element, {element: (start, start tag end, end tag start or None, end)}).
+            Offsets are byte positions; the end tag start is None for empty-element tags.
+    """
+    builder = ET.TreeBuilder()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    starts = []
+    offsets = {}
+
+    def start_element(tag, attributes):
+        starts.append(parser.CurrentByteIndex)
+        builder.start(tag, attributes)
+
+    def end_element(tag):
+        element = builder.end(tag)
+        start = starts.pop()
+        start_tag_end = tag_end(data, start)
+        if data[start_tag_end - 2] == 0x2F:  # <tag/> has no end tag
+            offsets[element] = (start, start_tag_end, None, start_tag_end)
+        else:
+            index = parser.CurrentByteIndex
+            offsets[element] = (start, start_tag_end, index, tag_end(data, index))
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = builder.data
+    try:
+        parser.Parse(data, True)
+    except expat.ExpatError as e:
+        raise SpliceError(f"Original file is not valid XML: {e}") from e
+    return builder.close(), offsets
+
+
+def tag_end(data, index):
+    """Returns the offset just past the tag starting at index, skipping quoted attribute values."""
+    quote = None
+    for position in range(index + 1, len(data)):
+        byte = data[position]
+        if quote is not None:
+            if byte == quote:
+                quote = None
+        elif byte in (0x22, 0x27):  # " or '
+            quote = byte
+        elif byte == 0x3E:  # >
+            return position + 1
+    raise SpliceError(f"Unterminated tag at byte {index}")
+
+
+def file_tag_end(file, index, block_size=4096):
+    """Returns the offset just past the tag starting at index of a binary file, reading only that tag."""
+    file.seek(index)
+    data = b""
+    while True:
+        chunk = file.read(block_size)
+        data += chunk
+        try:
+            return index + tag_end(data, 0)
+        except SpliceError:
+            if not chunk:
+                raise SpliceError(f"Unterminated tag at byte {index}") from None
+
+
+def file_indentation(file, index, limit=1024):
+    """Returns the whitespace between the start of the line and index of a binary file."""
+    start = max(0, index - limit)
+    file.seek(start)
+    return indentation(file.read(index - start), index - start)
+
+
+def copy_range(file_path, start, end=None, block_size=1024 * 1024):
+    """Yields the bytes of a file from start to end (or the end of the file) in blocks."""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        remaining = float("inf") if end is None else end - start
+        while remaining > 0:
+            chunk = file.read(int(min(block_size, remaining)))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def element_key(element):
+    """Key used to match an output element with the original it came from."""
+    element_id = element.get("id")
+    if element_id is not None:
+        return element.tag, element_id
+    return element.tag, tuple(sorted(element.attrib.items()))
+
+
+def fingerprint(element):
+    """Tags, attributes and texts of an element and its descendants, ignoring formatting whitespace."""
+    return [(node.tag, node.attrib, (node.text or "").strip()) for node in node_iter(element)]
+
+
+def node_iter(element):
+    return (node for node in element.iter() if isinstance(node.tag, str))
+
+
+def find_insertions(original, output, offsets, data, insertions):
+    """
+    Matches the children of an output element against the original and records new ones.
+
+    Original children must appear in the output in the same order; everything between
+    them is an insertion. Matched children that differ are compared recursively, so
+    changes other than insertions raise SpliceError.
+    """
+    if original.tag != output.tag or original.attrib != output.attrib or (original.text or "").strip() != (output.text or "").strip():
+        raise SpliceError(f"<{original.tag} id={original.get('id')!r}> was modified")
+
+    original_children = [child for child in original if isinstance(child.tag, str)]
+    output_children = [child for child in output if isinstance(child.tag, str)]
+    start, start_tag_end, end_tag_start, _ = offsets[original]
+    child_indent = indentation(data, offsets[original_children[0]][0]) if original_children else indentation(data, start) + b"  "
+
+    position = 0  # Next original child to match
+    insert_at = start_tag_end
+    pending = []
+    for child in output_children:
+        if position < len(original_children) and element_key(child) == element_key(original_children[position]):
+            if pending:
+                insertions.append((insert_at, child_indent, pending))
+                pending = []
+            match = original_children[position]
+            if fingerprint(match) != fingerprint(child):
+                find_insertions(match, child, offsets, data, insertions)
+            insert_at = offsets[match][3]
+            position += 1
+        else:
+            pending.append(child)
+
+    if position < len(original_children):
+        missing = original_children[position]
+        raise SpliceError(f"<{missing.tag} id={missing.get('id')!r}> was removed or reordered")
+    if pending:
+        if end_tag_start is None:
+            raise SpliceError(f"<{original.tag}> is an empty-element tag")
+        insertions.append((insert_at, child_indent, pending))
+
+
+def indentation(data, index):
+    """Returns the whitespace between the start of the line and index."""
+    line_start = data.rfind(b"\n", 0, index) + 1
+    prefix = data[line_start:index]
+    return prefix if not prefix.strip() else b""
+
+
+def serialize(elements, indent):
+    """Serializes inserted elements, each on its own line at the given indentation."""
+    chunks = []
+    for element in elements:
+        element = ET.fromstring(ET.tostring(element))  # Indenting must not touch the output tree
+        element.tail = None
+        ET.indent(element, space="  ", level=len(indent) // 2)
+        chunks.append(b"\n" + indent + ET.tostring(element, encoding="utf-8", xml_declaration=False))
+    return b"".join(chunks)
+
+
+def splice_export(original_path, output_root, export_path):
+    """
+    Writes the output as the original file with only the new elements spliced in.
+
+    Untouched byte ranges of the original are streamed through unchanged, so the
+    export differs from the original only where producers, playlists, tracks or
+    transitions were added. The file is written atomically through a temp file.
+
+    Args:
+        original_path (str): The original .mlt file.
+        output_root (xml.etree.ElementTree.Element): The edited `<mlt>` root.
+        export_path (str): Destination file.
+
+    Returns:
+        int: Number of elements spliced in.
+
+    Raises:
+        SpliceError: If the output removes, reorders or changes original elements.
+    """
+    with open(original_path, "rb") as file:
+        data = file.read()
+    original_root, offsets = parse_with_offsets(data)
+
+    insertions = []
+    find_insertions(original_root, output_root, offsets, data, insertions)
+    insertions.sort(key=lambda insertion: insertion[0])
+
+    view = memoryview(data)
+
+    def chunks():
+        position = 0
+        for offset, indent, elements in insertions:
+            yield view[position:offset]
+            yield serialize(elements, indent)
+            position = offset
+        yield view[position:]
+
+    atomic_write(export_path, chunks())
+    return sum(len(elements) for _, _, elements in insertions)
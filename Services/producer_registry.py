@@ -0,0 +1,58 @@
+def normalize_resource(resource):
+    """Normalizes a resource path so the same asset always maps to the same key."""
+    return resource.strip().replace("\\", "/") if resource else ""
+
+
+class ProducerRegistry:
+    """
+    Resource-keyed registry of the producers in an .mlt document.
+
+    Every `<producer>` and `<chain>` that already exists in the document is
+    registered by its `resource` property, so one producer is shared by all
+    markers that use the same asset instead of emitting a copy per marker.
+    """
+
+    def __init__(self, root):
+        """
+        Registers the producers and chains already present in the document.
+
+        Args:
+            root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+        """
+        self.producers = {}
+        for element in root.iter():
+            if element.tag not in ("producer", "chain"):
+                continue
+            producer_id = element.get("id")
+            resource = element.find("property[@name='resource']")
+            if producer_id and resource is not None and resource.text:
+                # The first producer for a resource wins, like Shotcut's own lookup order
+                self.producers.setdefault(normalize_resource(resource.text), producer_id)
+
+    def __len__(self):
+        return len(self.producers)
+
+    def __contains__(self, resource):
+        return normalize_resource(resource) in self.producers
+
+    def lookup(self, resource):
+        """
+        Returns the id of the producer for a resource.
+
+        Args:
+            resource (str): Path of the asset.
+
+        Returns:
+            str or None: The producer id, or None if no producer uses the resource yet.
+        """
+        return self.producers.get(normalize_resource(resource))
+
+    def register(self, resource, producer_id):
+        """
+        Records a new producer for a resource.
+
+        Args:
+            resource (str): Path of the asset.
+            producer_id (str): Id of the producer element.
+        """
+        self.producers[normalize_resource(resource)] = producer_id
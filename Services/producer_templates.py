@@ -0,0 +1,192 @@
+import string
+import xml.etree.ElementTree as ET
+from Services.marker_io import MARKER_FIELDS
+
+# Slot names a template may use: the values add_marker_producers fills in, plus every marker field
+SLOTS = {"id", "resource", "caption", "creation_time", "hash", *MARKER_FIELDS}
+
+# Built-in templates. "{slot}" fields are filled for every producer; use "{{" and "}}" for literal braces.
+# The root's "template" attribute names the template and "source" is the marker field used as resource.
+QIMAGE_TEMPLATE = """
+<producer template="qimage" source="Picture" id="{id}" in="00:00:00.000" out="03:59:59.983">
+  <property name="length">04:00:00.000</property>
+  <property name="eof">pause</property>
+  <property name="resource">{resource}</property>
+  <property name="ttl">1</property>
+  <property name="aspect_ratio">1</property>
+  <property name="meta.media.progressive">1</property>
+  <property name="seekable">1</property>
+  <property name="format">2</property>
+  <property name="meta.media.width">1920</property>
+  <property name="meta.media.height">1080</property>
+  <property name="mlt_service">qimage</property>
+  <property name="creation_time">{creation_time}</property>
+  <property name="shotcut:hash">{hash}</property>
+  <property name="shotcut:caption">{caption}</property>
+</producer>
+"""
+
+AVFORMAT_TEMPLATE = """
+<chain template="avformat" source="Video" id="{id}">
+  <property name="eof">pause</property>
+  <property name="resource">{resource}</property>
+  <property name="mlt_service">avformat-novalidate</property>
+  <property name="seekable">1</property>
+  <property name="audio_index">1</property>
+  <property name="video_index">0</property>
+  <property name="mute_on_pause">0</property>
+  <property name="creation_time">{creation_time}</property>
+  <property name="shotcut:hash">{hash}</property>
+  <property name="shotcut:caption">{caption}</property>
+</chain>
+"""
+
+COLOR_TEMPLATE = """
+<producer template="color" source="Color" id="{id}" in="00:00:00.000" out="03:59:59.983">
+  <property name="length">04:00:00.000</property>
+  <property name="eof">pause</property>
+  <property name="resource">{resource}</property>
+  <property name="aspect_ratio">1</property>
+  <property name="mlt_service">color</property>
+  <property name="mlt_image_format">rgba</property>
+  <property name="shotcut:caption">{Name}</property>
+</producer>
+"""
+
+
+class ProducerTemplate:
+    """
+    A producer fragment compiled once and stamped out per marker.
+
+    Compiling turns the fragment into a plan of (tag, static attributes, text)
+    per element and records which attributes and texts contain "{slot}"
+    fields. Stamping replays the plan with ElementTree's C constructors and
+    formats only those slots, so no per-producer work is spent on parsing,
+    lookups or copying the fragment.
+    """
+
+    def __init__(self, element):
+        """
+        Compiles a template element.
+
+        Args:
+            element (xml.etree.ElementTree.Element): A `<producer>` or `<chain>` with
+                "template" and "source" attributes and "{slot}" fields.
+
+        Raises:
+            ValueError: If a field is malformed or names something that is not in SLOTS.
+        """
+        attributes = dict(element.attrib)
+        self.name = attributes.pop("template", element.tag)
+        self.source = attributes.pop("source", "Picture")
+        self.tag = element.tag
+        self.plan = self.compile(element.tag, attributes, element.text, list(element))
+
+    @classmethod
+    def from_string(cls, text):
+        return cls(ET.fromstring(text))
+
+    @classmethod
+    def compile(cls, tag, attributes, text, children):
+        """Returns the plan of one element: (tag, static attributes, attribute slots, text, text is a slot, child plans)."""
+        static = {key: value for key, value in attributes.items() if "{" not in value}
+        slots = [(key, check_slots(value)) for key, value in attributes.items() if "{" in value]
+        text = text if text and text.strip() else None  # Drop indentation-only text
+        if text and "{" in text:
+            check_slots(text)
+        return (
+            tag,
+            static,
+            slots,
+            text,
+            bool(text and "{" in text),
+            [cls.compile(child.tag, child.attrib, child.text, list(child)) for child in children],
+        )
+
+    def stamp(self, values):
+        """
+        Creates one producer element.
+
+        Args:
+            values (dict): Slot values, e.g. id, resource, caption, hash, creation_time
+                and any marker field.
+
+        Returns:
+            xml.etree.ElementTree.Element: The new element.
+        """
+        return self.build(None, self.plan, values)
+
+    def build(self, parent, plan, values):
+        tag, static, slots, text, text_is_slot, children = plan
+        attributes = static
+        if slots:
+            attributes = dict(static)
+            for key, pattern in slots:
+                attributes[key] = pattern.format_map(values)
+        element = ET.Element(tag, attributes) if parent is None else ET.SubElement(parent, tag, attributes)
+        if text is not None:
+            element.text = text.format_map(values) if text_is_slot else text
+        for child in children:
+            self.build(element, child, values)
+        return element
+
+
+def check_slots(pattern):
+    """
+    Returns a pattern after checking that every "{slot}" field in it can be filled.
+
+    Raises:
+        ValueError: If the pattern has unbalanced braces or a field that is not in SLOTS.
+    """
+    for _, field, _, _ in string.Formatter().parse(pattern):
+        if field is None:
+            continue
+        name = field.split(".", 1)[0].split("[", 1)[0]
+        if name not in SLOTS:
+            raise ValueError(f"Unknown template slot '{{{field}}}'. Available: {', '.join(sorted(SLOTS))}")
+    return pattern
+
+
+TEMPLATES = {
+    template.name: template
+    for template in (ProducerTemplate.from_string(text) for text in (QIMAGE_TEMPLATE, AVFORMAT_TEMPLATE, COLOR_TEMPLATE))
+}
+
+
+def load_templates(file_path):
+    """
+    Loads user-defined producer templates.
+
+    The file holds one template element, or any root element whose children are
+    template elements; each needs a "template" attribute naming it.
+
+    Args:
+        file_path (str): Path to the template XML file.
+
+    Returns:
+        dict: Templates keyed by name.
+    """
+    root = ET.parse(file_path).getroot()
+    elements = [root] if root.get("template") else [child for child in root if child.get("template")]
+    if not elements:
+        raise ValueError(f"No element with a 'template' attribute in {file_path}")
+    return {template.name: template for template in map(ProducerTemplate, elements)}
+
+
+def get_template(name="qimage", file_path=None):
+    """
+    Returns a template by name, looking in the user template file first.
+
+    Args:
+        name (str): Template name.
+        file_path (str, optional): User template file.
+
+    Returns:
+        ProducerTemplate: The template.
+    """
+    templates = dict(TEMPLATES)
+    if file_path:
+        templates.update(load_templates(file_path))
+    if name not in templates:
+        raise ValueError(f"Unknown producer template '{name}'. Available: {', '.join(sorted(templates))}")
+    return templates[name]
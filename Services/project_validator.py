@@ -0,0 +1,171 @@
+import ntpath
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from Services.id_allocator import IdAllocator
+from Services.timecode import parse_timecode
+
+# A single validation finding. severity is "error" or "warning"; element is the id it concerns.
+Diagnostic = namedtuple("Diagnostic", ["severity", "code", "message", "element"])
+
+# Services whose "resource" property is not a file path
+NON_FILE_SERVICES = {"color", "colour", "noise", "tone", "count", "blipflash"}
+
+# Frame rate assumed when the document has no <profile>
+DEFAULT_FPS = 30
+
+
+def validate_file(file_path, max_workers=32):
+    """
+    Validates an .mlt file on disk.
+
+    Args:
+        file_path (str): Path to the .mlt file.
+        max_workers (int): Threads used to stat resource files.
+
+    Returns:
+        list: Diagnostic tuples; empty if the project is valid.
+    """
+    try:
+        root = ET.parse(file_path).getroot()
+    except (ET.ParseError, OSError) as e:
+        return [Diagnostic("error", "unreadable", f"Cannot read {file_path}: {e}", None)]
+    return validate_project(root, os.path.dirname(os.path.abspath(file_path)), max_workers)
+
+
+def validate_project(root, base_dir=None, max_workers=32):
+    """
+    Validates a parsed .mlt document before it is exported or opened in Shotcut.
+
+    Checks that every resource file exists (stat'ed concurrently), that every
+    `producer=` reference resolves, and that the playlist timelines have no
+    negative blanks (which overlap entries), inverted entries or unparseable times.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The `<mlt>` root element.
+        base_dir (str, optional): Directory relative resources are resolved against.
+            Defaults to the document's `root` attribute or the working directory.
+        max_workers (int): Threads used to stat resource files.
+
+    Returns:
+        list: Diagnostic tuples; empty if the project is valid.
+    """
+    base_dir = root.get("root") or base_dir or os.getcwd()
+    diagnostics = []
+    diagnostics.extend(check_references(root))
+    diagnostics.extend(check_resources(root, base_dir, max_workers))
+    diagnostics.extend(check_timeline(root))
+    return diagnostics
+
+
+def check_references(root):
+    """Reports entries and tracks whose `producer=` points at an id missing from the document."""
+    return [
+        Diagnostic("error", "dangling-reference", f"<{tag}> refers to missing id '{reference}'", reference)
+        for tag, reference in IdAllocator(root).dangling_references()
+        if tag != "mlt"  # The root's producer attribute only names the bin
+    ]
+
+
+def check_resources(root, base_dir, max_workers=32):
+    """
+    Reports producers and chains whose resource file does not exist.
+
+    Each distinct path is stat'ed once, in a thread pool, so projects with
+    thousands of resources are checked in parallel.
+    """
+    users = {}
+    for element in root.iter():
+        if element.tag not in ("producer", "chain"):
+            continue
+        properties = {prop.get("name"): prop.text for prop in element.findall("property")}
+        resource = properties.get("resource")
+        if not resource or properties.get("mlt_service") in NON_FILE_SERVICES or resource.startswith("<"):
+            continue
+        is_absolute = os.path.isabs(resource) or ntpath.isabs(resource)  # Projects often carry Windows paths
+        path = resource if is_absolute else os.path.join(base_dir, resource)
+        users.setdefault(os.path.normpath(path), []).append(element.get("id"))
+
+    if not users:
+        return []
+
+    paths = list(users)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as executor:
+        exists = list(executor.map(os.path.exists, paths))
+
+    diagnostics = []
+    for path, found in zip(paths, exists):
+        if not found:
+            for element_id in users[path]:
+                diagnostics.append(Diagnostic("error", "missing-resource", f"Resource not found: {path}", element_id))
+    return diagnostics
+
+
+def check_timeline(root):
+    """
+    Lays out every playlist and checks its blanks and entries.
+
+    A playlist plays its children back to back, so its entries can only overlap
+    where a negative blank pulls the next entry back over the previous one;
+    that is reported as a negative blank.
+    """
+    diagnostics = []
+    frame = frame_duration(root)
+    for playlist in root.iter("playlist"):
+        layout_playlist(playlist, frame, diagnostics)
+    return diagnostics
+
+
+def layout_playlist(playlist, frame, diagnostics=None):
+    """
+    Places the entries of a playlist on the timeline.
+
+    Args:
+        playlist (xml.etree.ElementTree.Element): A `<playlist>` element.
+        frame (float): Length of one frame in seconds; see frame_duration().
+        diagnostics (list, optional): Receives a Diagnostic for every broken blank or entry.
+
+    Returns:
+        list: (start, end, producer id) of every entry, in seconds, in playlist order.
+    """
+    playlist_id = playlist.get("id")
+    placed = []
+    position = 0.0
+    for child in playlist:
+        try:
+            if child.tag == "blank":
+                length = parse_timecode(child.get("length"))
+                if length < 0 and diagnostics is not None:
+                    diagnostics.append(Diagnostic("error", "negative-blank", f"Negative blank length {child.get('length')} in {playlist_id}", playlist_id))
+                position += length
+            elif child.tag == "entry":
+                entry_in = parse_timecode(child.get("in", "0"))
+                entry_out = parse_timecode(child.get("out", child.get("in", "0")))
+                if entry_out < entry_in:
+                    if diagnostics is not None:
+                        diagnostics.append(Diagnostic("error", "inverted-entry", f"Entry for {child.get('producer')} in {playlist_id} ends before it starts", playlist_id))
+                    entry_out = entry_in
+                length = entry_out - entry_in + frame  # Shotcut's out is the last frame shown
+                placed.append((position, position + length, child.get("producer")))
+                position += length
+        except ValueError:
+            if diagnostics is not None:
+                diagnostics.append(Diagnostic("error", "bad-timecode", f"Unparseable time in <{child.tag}> of {playlist_id}", playlist_id))
+    return placed
+
+
+def frame_duration(root):
+    """Returns the length of one frame in seconds, from the document's <profile> frame rate."""
+    profile = root.find("profile")
+    try:
+        fps = int(profile.get("frame_rate_num")) / int(profile.get("frame_rate_den"))
+    except (AttributeError, TypeError, ValueError, ZeroDivisionError):
+        return 1 / DEFAULT_FPS
+    return 1 / fps if fps > 0 else 1 / DEFAULT_FPS
+
+
+def format_diagnostics(diagnostics):
+    """Formats diagnostics one per line, errors first."""
+    ordered = sorted(diagnostics, key=lambda diagnostic: diagnostic.severity != "error")
+    return "\n".join(f"{diagnostic.severity.upper()} [{diagnostic.code}] {diagnostic.message}" for diagnostic in ordered)
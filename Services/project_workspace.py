@@ -0,0 +1,222 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from Services.app_logging import get_logger
+from Services.edit_history import REMOVE
+from Services.file_watcher import stat_key
+
+log = get_logger(__name__)
+
+
+class ProjectState:
+    """What is kept open for one project: its markers with assignments and the Export Manager's document."""
+
+    def __init__(self, path, stamp, markers):
+        """
+        Args:
+            path (str): Absolute path of the .mlt file.
+            stamp (tuple): (mtime_ns, size) of the file the state was built from.
+            markers (list or None): Markers with their Picture and Video assignments; None until they are loaded.
+        """
+        self.path = path
+        self.stamp = stamp
+        self.markers = markers
+        self.document = None  # Root element edited by the Export Manager
+        self.history = None  # EditHistory of the document
+        self.size = 0  # Estimated bytes, see measure()
+
+
+def markers_size(markers):
+    """Estimates the memory used by a marker list."""
+    total = sys.getsizeof(markers)
+    for marker in markers or ():
+        total += sys.getsizeof(marker)
+        for key, value in marker.items():
+            total += sys.getsizeof(key) + sys.getsizeof(value)
+    return total
+
+
+def element_size(element):
+    """Estimates the memory used by an element tree."""
+    total = 0
+    for node in element.iter():
+        total += sys.getsizeof(node) + sys.getsizeof(node.attrib) + sys.getsizeof(node.text or "") + sys.getsizeof(node.tail or "")
+        for key, value in node.attrib.items():
+            total += sys.getsizeof(key) + sys.getsizeof(value)
+    return total
+
+
+def measure(state):
+    """Estimates the memory held by a project state."""
+    total = markers_size(state.markers)
+    if state.document is not None:
+        total += element_size(state.document)
+    if state.history is not None:
+        # Removed elements live only in the patches; inserted ones are already part of the document
+        for patch in state.history.undo_stack + state.history.redo_stack:
+            for change in patch.changes:
+                total += element_size(change.element) if change.action == REMOVE else 64
+    return total
+
+
+class ProjectWorkspace:
+    """
+    Recently used projects, kept open so switching back to one is instant.
+
+    Projects are held in least-recently-used order. A cached project is only
+    returned while its file still has the mtime and size it was built from;
+    after the file changed only its markers remain available, so their
+    assignments can be merged into the fresh extraction. Projects are evicted,
+    least recently used first, while the estimated memory exceeds `max_bytes`
+    or more than `max_projects` are open; the most recent one always stays.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_projects=8):
+        """
+        Args:
+            max_bytes (int): Memory budget of the cached projects.
+            max_projects (int): Largest number of cached projects.
+        """
+        self.max_bytes = max_bytes
+        self.max_projects = max_projects
+        self.projects = OrderedDict()  # Absolute path -> ProjectState, least recently used first
+        self.lock = threading.Lock()  # Export Managers store their document from background tasks
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, path):
+        with self.lock:
+            return os.path.abspath(path) in self.projects
+
+    def paths(self):
+        """Returns the cached projects, most recently used first."""
+        with self.lock:
+            return list(reversed(self.projects))
+
+    def get(self, path):
+        """
+        Returns the state of a project if its file is unchanged since it was cached, else None.
+        The state's markers are None if only the Export Manager's document was cached.
+        A stale state loses its document but keeps its markers for markers_of().
+        """
+        path = os.path.abspath(path)
+        stamp = stat_key(path)
+        with self.lock:
+            state = self.projects.get(path)
+            if state is None or stamp is None:
+                self.misses += 1
+                return None
+            if state.stamp != stamp:
+                self.misses += 1
+                state.document = None
+                state.history = None
+                state.size = markers_size(state.markers)
+                return None
+            self.hits += 1
+            self.projects.move_to_end(path)
+            return state
+
+    def markers_of(self, path):
+        """Returns the cached markers of a project, even if its file has changed since, or None."""
+        with self.lock:
+            state = self.projects.get(os.path.abspath(path))
+            return state.markers if state is not None else None
+
+    def put(self, path, markers, stamp=None):
+        """
+        Caches the markers of a project and makes it the most recently used.
+
+        Args:
+            path (str): The .mlt file.
+            markers (list): Markers with assignments; the list is kept, not copied.
+            stamp (tuple, optional): stat_key() of the file taken before it was read,
+                so a change during reading is noticed. Defaults to the current one.
+
+        Returns:
+            ProjectState: The cached state.
+        """
+        path = os.path.abspath(path)
+        stamp = stamp or stat_key(path)
+        with self.lock:
+            state = self.projects.get(path)
+            if state is None:
+                state = self.projects[path] = ProjectState(path, stamp, markers)
+            else:
+                if state.stamp != stamp:
+                    state.document = None
+                    state.history = None
+                state.stamp = stamp
+                state.markers = markers
+            self.projects.move_to_end(path)
+            state.size = measure(state)
+            self.evict()
+            return state
+
+    def set_document(self, path, document, history, stamp=None):
+        """
+        Caches the Export Manager's document of a project (and its undo history).
+
+        Args:
+            path (str): The .mlt file the document was parsed from.
+            document (Element): The parsed, possibly edited document.
+            history (EditHistory): Its undo/redo history.
+            stamp (tuple, optional): stat_key() of the file taken before it was parsed.
+        """
+        path = os.path.abspath(path)
+        stamp = stamp or stat_key(path)
+        with self.lock:
+            state = self.projects.get(path)
+            if state is None:
+                state = self.projects[path] = ProjectState(path, stamp, None)
+            elif state.stamp != stamp:
+                return  # The markers were read from another version of the file
+            state.document = document
+            state.history = history
+            state.size = measure(state)
+            self.evict()
+
+    def take_document(self, path):
+        """
+        Hands the cached document of an unchanged project to an Export Manager.
+        The document leaves the cache until it is stored again with set_document(),
+        so two windows never edit the same tree.
+
+        Returns:
+            tuple or None: (document, history, stamp).
+        """
+        path = os.path.abspath(path)
+        stamp = stat_key(path)
+        with self.lock:
+            state = self.projects.get(path)
+            if state is None or state.document is None or state.stamp != stamp:
+                return None
+            taken = (state.document, state.history, state.stamp)
+            state.document = None
+            state.history = None
+            state.size = measure(state)
+            return taken
+
+    def discard(self, path):
+        with self.lock:
+            self.projects.pop(os.path.abspath(path), None)
+
+    def evict(self):
+        """Drops least recently used projects until the cache fits its limits. Called with the lock held."""
+        total = sum(state.size for state in self.projects.values())
+        while len(self.projects) > 1 and (total > self.max_bytes or len(self.projects) > self.max_projects):
+            path, state = self.projects.popitem(last=False)
+            total -= state.size
+            self.evictions += 1
+            log.debug("Closed cached project %s (%d bytes)", path, state.size)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "projects": len(self.projects),
+                "bytes": sum(state.size for state in self.projects.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Services.app_logging import get_logger
+from Services.startup_profiler import lazy_import
+
+log = get_logger(__name__)
+
+
+class ProxyCache:
+    """
+    Low-resolution preview copies of source videos, generated in the background.
+
+    Proxies are transcoded with `cv2.VideoWriter` by a small worker pool and
+    stored in `cache_dir` under a key derived from the source path and mtime, so
+    an edited recording gets a fresh proxy. The cache is trimmed to `max_bytes`
+    by evicting the least recently used proxies.
+    """
+
+    def __init__(self, cache_dir="proxies", max_bytes=2 * 1024 ** 3, height=360, max_fps=30, max_workers=2):
+        """
+        Args:
+            cache_dir (str): Folder proxies are stored in.
+            max_bytes (int): Size limit of the cache folder.
+            height (int): Height of the proxy frames; the width keeps the aspect ratio.
+            max_fps (float): Frame rate cap; faster sources have frames dropped.
+            max_workers (int): Number of proxies transcoded at once.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.height = height
+        self.max_fps = max_fps
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="proxy")
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def key(self, source):
+        """Returns the cache key of a source video, or None if it does not exist."""
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        identity = f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def path_for(self, source):
+        """Returns where the proxy of a source is stored, or None if the source is missing."""
+        key = self.key(source)
+        return os.path.join(self.cache_dir, f"{key}.mp4") if key else None
+
+    def proxy_path(self, source):
+        """
+        Returns the proxy to play instead of a source, if one has been generated.
+
+        Args:
+            source (str): Path of the source video.
+
+        Returns:
+            str or None: Path of the proxy file.
+        """
+        path = self.path_for(source)
+        if path and os.path.exists(path):
+            os.utime(path)  # Mark as recently used for eviction
+            return path
+        return None
+
+    def request(self, source):
+        """
+        Queues proxy generation for a source unless a proxy exists or is being generated.
+
+        Args:
+            source (str): Path of the source video.
+
+        Returns:
+            concurrent.futures.Future or None: The pending transcode, if one was queued.
+        """
+        path = self.path_for(source)
+        if not path or os.path.exists(path):
+            return None
+        with self.lock:
+            if path in self.pending:
+                return self.pending[path]
+            future = self.executor.submit(self.generate, source, path)
+            self.pending[path] = future
+        future.add_done_callback(lambda _: self.finish(path))
+        return future
+
+    def finish(self, path):
+        with self.lock:
+            self.pending.pop(path, None)
+
+    def generate(self, source, path):
+        """
+        Transcodes a source into a proxy. Runs on a worker thread.
+
+        The proxy is written to a temporary file first, so a half-written proxy is never played.
+
+        Returns:
+            str or None: Path of the proxy, or None if the source could not be read.
+
+        Raises:
+            RuntimeError: If OpenCV cannot open a writer for the proxy (e.g. no mp4v encoder).
+        """
+        cv2 = lazy_import("cv2")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            log.error("Cannot open video for proxy: %s", source)
+            return None
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        proxy_height = min(self.height, height) if height else self.height
+        proxy_width = max(2, int(round(width * proxy_height / height / 2)) * 2) if height else proxy_height * 16 // 9
+        step = max(1, int(round(fps / self.max_fps)))
+
+        temp_path = f"{path}.part.mp4"
+        writer = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*"mp4v"), fps / step, (proxy_width, proxy_height))
+        if not writer.isOpened():
+            capture.release()
+            writer.release()
+            remove_file(temp_path)
+            raise RuntimeError(f"Cannot write proxy {temp_path} for {source}")
+        index = 0
+        try:
+            while True:
+                if index % step == 0:
+                    ret, frame = capture.read()
+                    if not ret:
+                        break
+                    writer.write(cv2.resize(frame, (proxy_width, proxy_height), interpolation=cv2.INTER_AREA))
+                elif not capture.grab():  # Skip dropped frames without decoding them
+                    break
+                index += 1
+        except BaseException:
+            writer.release()
+            remove_file(temp_path)
+            raise
+        finally:
+            capture.release()
+            writer.release()
+
+        if index == 0:
+            remove_file(temp_path)
+            return None
+        os.replace(temp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Deletes the least recently used proxies until the cache fits in max_bytes."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part.mp4"):
+                continue  # Still being written
+            file_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+                total -= size
+            except OSError as e:
+                log.error("Failed to evict proxy %s: %s", file_path, e)
+
+    def shutdown(self):
+        """Stops accepting work; queued transcodes are dropped."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def remove_file(file_path):
+    """Deletes a file if it exists."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import subprocess
+import threading
+from Services.app_logging import get_logger
+
+log = get_logger(__name__)
+
+# melt -progress prints "Current Frame: 120, percentage: 42"
+PROGRESS_PATTERN = re.compile(r"percentage:\s*(\d+)")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class RenderJob:
+    """A single render of an exported project."""
+
+    def __init__(self, job_id, project, output, status=QUEUED, progress=0, attempts=0, error=""):
+        self.job_id = job_id
+        self.project = project
+        self.output = output
+        self.status = status
+        self.progress = progress
+        self.attempts = attempts
+        self.error = error
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "project": self.project,
+            "output": self.output,
+            "status": self.status,
+            "progress": self.progress,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class RenderQueue:
+    """
+    Renders exported .mlt projects with melt, several at a time.
+
+    Jobs run as subprocesses; a dispatcher thread starts queued jobs while fewer
+    than `max_concurrent` are running, and one watcher thread per job parses
+    melt's progress output. The queue is saved to `state_file` after every
+    change, so queued and interrupted jobs survive a restart.
+    """
+
+    def __init__(self, state_file="render_queue.json", melt_path="melt", max_concurrent=2, on_update=None):
+        """
+        Args:
+            state_file (str): JSON file the queue is persisted to.
+            melt_path (str or list): melt executable, or a full command prefix such as
+                [sys.executable, "fake_melt.py"].
+            max_concurrent (int): Maximum number of renders running at once.
+            on_update (callable, optional): Called with a RenderJob whenever it changes.
+                Runs on a worker thread.
+        """
+        self.state_file = state_file
+        self.melt_command = [melt_path] if isinstance(melt_path, str) else list(melt_path)
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.on_update = on_update
+
+        self.jobs = []
+        self.processes = {}
+        self.condition = threading.Condition(threading.RLock())
+        self.dispatcher = None
+        self.stopping = False
+        self.load()
+
+    # Persistence
+
+    def load(self):
+        """Loads the queue from the state file; jobs interrupted mid-render are queued again."""
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            log.error("Failed to load render queue: %s", e)
+            return
+
+        self.jobs = [RenderJob.from_dict(job) for job in data.get("jobs", [])]
+        for job in self.jobs:
+            if job.status == RUNNING:
+                job.status = QUEUED
+                job.progress = 0
+
+    def save(self):
+        """Writes the queue to the state file."""
+        with self.condition:
+            data = {"jobs": [job.to_dict() for job in self.jobs]}
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4)
+        os.replace(temp_file, self.state_file)
+
+    # Queue operations
+
+    def add(self, project, output=None):
+        """
+        Queues a project for rendering.
+
+        Args:
+            project (str): Path to the .mlt file.
+            output (str, optional): Rendered file. Defaults to the project path with an .mp4 extension.
+
+        Returns:
+            RenderJob: The new job.
+        """
+        with self.condition:
+            job_id = max((job.job_id for job in self.jobs), default=0) + 1
+            job = RenderJob(job_id, project, output or os.path.splitext(project)[0] + ".mp4")
+            self.jobs.append(job)
+            self.condition.notify_all()
+        self.changed(job)
+        return job
+
+    def get(self, job_id):
+        with self.condition:
+            for job in self.jobs:
+                if job.job_id == job_id:
+                    return job
+        return None
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns True if the job was cancelled."""
+        with self.condition:
+            job = self.get(job_id)
+            if job is None or job.status not in (QUEUED, RUNNING):
+                return False
+            job.status = CANCELLED
+            process = self.processes.get(job_id)
+            if process is not None:
+                process.terminate()
+            self.condition.notify_all()
+        self.changed(job)
+        return True
+
+    def retry(self, job_id):
+        """Queues a failed or cancelled job again. Returns True if the job was requeued."""
+        with self.condition:
+            job = self.get(job_id)
+            if job is None or job.status not in (FAILED, CANCELLED):
+                return False
+            job.status = QUEUED
+            job.progress = 0
+            job.error = ""
+            self.condition.notify_all()
+        self.changed(job)
+        return True
+
+    def clear_finished(self):
+        """Removes done, failed and cancelled jobs from the queue."""
+        with self.condition:
+            self.jobs = [job for job in self.jobs if job.status in (QUEUED, RUNNING)]
+        self.save()
+
+    def pending(self):
+        """Returns True while any job is queued or running."""
+        with self.condition:
+            return any(job.status in (QUEUED, RUNNING) for job in self.jobs)
+
+    # Scheduling
+
+    def start(self):
+        """Starts the dispatcher thread if it is not running."""
+        with self.condition:
+            self.stopping = False
+            if self.dispatcher is None or not self.dispatcher.is_alive():
+                self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+                self.dispatcher.start()
+
+    def stop(self, terminate=True):
+        """
+        Stops the dispatcher. Running renders are terminated and requeued unless `terminate` is False.
+        """
+        with self.condition:
+            self.stopping = True
+            if terminate:
+                for job_id, process in list(self.processes.items()):
+                    job = self.get(job_id)
+                    if job is not None:
+                        job.status = QUEUED
+                        job.progress = 0
+                    process.terminate()
+            self.condition.notify_all()
+        self.save()
+
+    def wait(self, timeout=None):
+        """Blocks until no job is queued or running. Returns False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending(), timeout)
+
+    def dispatch(self):
+        """Dispatcher loop: keeps up to max_concurrent renders running."""
+        with self.condition:
+            while not self.stopping:
+                for job in self.jobs:
+                    if len(self.processes) >= self.max_concurrent:
+                        break
+                    if job.status == QUEUED:
+                        self.launch(job)
+                self.condition.wait(0.5)
+
+    def launch(self, job):
+        """Starts melt for a job; called with the lock held."""
+        command = self.melt_command + [job.project, "-progress", "-consumer", f"avformat:{job.output}"]
+        job.attempts += 1
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+        except OSError as e:
+            job.status = FAILED
+            job.error = str(e)
+            self.changed(job)
+            return
+
+        job.status = RUNNING
+        job.progress = 0
+        self.processes[job.job_id] = process
+        threading.Thread(target=self.watch, args=(job, process), daemon=True).start()
+        self.changed(job)
+
+    def watch(self, job, process):
+        """Parses progress from a running render and records its result."""
+        buffer = ""
+        tail = []
+        for chunk in iter(lambda: process.stdout.read1(4096), b""):
+            buffer += chunk.decode("utf-8", errors="replace")
+            lines = re.split(r"[\r\n]", buffer)
+            buffer = lines.pop()
+            for line in lines:
+                if not line.strip():
+                    continue
+                match = PROGRESS_PATTERN.search(line)
+                if match:
+                    progress = min(100, int(match.group(1)))
+                    if progress != job.progress:
+                        job.progress = progress
+                        self.changed(job, persist=False)
+                else:
+                    tail = (tail + [line])[-5:]  # Keep the last lines for error reports
+        return_code = process.wait()
+        process.stdout.close()
+
+        with self.condition:
+            self.processes.pop(job.job_id, None)
+            if job.status == RUNNING:
+                if return_code == 0:
+                    job.status = DONE
+                    job.progress = 100
+                else:
+                    job.status = FAILED
+                    job.error = "\n".join(tail) or f"melt exited with code {return_code}"
+            self.changed(job)  # Persist before waking wait() callers
+            self.condition.notify_all()
+
+    def changed(self, job, persist=True):
+        """Persists the queue and notifies the listener about a job change."""
+        if persist:
+            try:
+                self.save()
+            except OSError as e:
+                log.error("Failed to save render queue: %s", e)
+        if self.on_update:
+            self.on_update(job)
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from Services.app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class SpriteSheet:
+    """
+    Thumbnails packed into a few atlas images.
+
+    `index` maps an image path to (atlas number, x, y) of its cell, so a
+    thumbnail is cut out of an atlas instead of decoding the original file.
+    """
+
+    def __init__(self, atlases, index, thumb_size):
+        self.atlases = atlases
+        self.index = index
+        self.thumb_size = thumb_size
+
+    def __contains__(self, path):
+        return path in self.index
+
+    def cell(self, path):
+        """Returns (atlas number, x, y) of a path's thumbnail, or None if it is not in the sheet."""
+        return self.index.get(path)
+
+    def crop(self, path):
+        """Returns the thumbnail of a path as a PIL image, or None if it is not in the sheet."""
+        cell = self.cell(path)
+        if cell is None:
+            return None
+        atlas_number, x, y = cell
+        return self.atlases[atlas_number].crop((x, y, x + self.thumb_size, y + self.thumb_size))
+
+
+class SpriteSheetBuilder:
+    """
+    Builds sprite sheets of downscaled marker pictures in a background worker.
+
+    Every thumbnail is cached in `cache_dir` as its own small PNG, keyed by the
+    picture's path, mtime and size, and sheets are composed from those tiles.
+    Assigning one picture therefore decodes only that picture, and reopening a
+    project reads a few hundred tiny PNGs instead of the full-size pictures.
+    The folder is pruned, least recently used tiles first, to `max_bytes` and
+    `max_age` seconds.
+    """
+
+    def __init__(self, cache_dir="thumbnails", thumb_size=24, columns=40, rows=40, max_bytes=64 * 1024 * 1024, max_age=30 * 24 * 3600):
+        """
+        Args:
+            cache_dir (str): Folder the thumbnails are cached in.
+            thumb_size (int): Width and height of each thumbnail cell.
+            columns (int): Cells per atlas row.
+            rows (int): Cell rows per atlas.
+            max_bytes (int): Largest total size of the cached thumbnails.
+            max_age (float): Seconds a thumbnail is kept after it was last used.
+        """
+        self.cache_dir = cache_dir
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.rows = rows
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sprites")
+
+    def tile_path(self, path):
+        """Returns the cache file of a picture's thumbnail, or None if the picture is missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = f"{self.thumb_size}|{os.path.abspath(path)}|{stat.st_mtime_ns}:{stat.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def build_async(self, paths):
+        """Builds a sheet on the background worker. Returns a Future of a SpriteSheet."""
+        return self.executor.submit(self.build, list(paths))
+
+    def build(self, paths):
+        """
+        Returns the sprite sheet of the given pictures, decoding only those without a cached thumbnail.
+
+        Args:
+            paths (iterable): Picture paths; duplicates and empty entries are ignored.
+
+        Returns:
+            SpriteSheet: The sheet. Pictures that cannot be read are left out.
+        """
+        paths = sorted({path for path in paths if path})
+        per_atlas = self.columns * self.rows
+        atlases = []
+        index = {}
+        created = 0
+        for path in paths:
+            thumbnail, cached = self.thumbnail(path)
+            if thumbnail is None:
+                continue
+            created += not cached
+            slot = len(index)
+            atlas_number, cell = divmod(slot, per_atlas)
+            if atlas_number == len(atlases):
+                atlases.append(Image.new("RGBA", (self.columns * self.thumb_size, self.rows * self.thumb_size)))
+            x = (cell % self.columns) * self.thumb_size
+            y = (cell // self.columns) * self.thumb_size
+            # Center thumbnails that are not square
+            atlases[atlas_number].paste(thumbnail, (x + (self.thumb_size - thumbnail.width) // 2, y + (self.thumb_size - thumbnail.height) // 2))
+            index[path] = (atlas_number, x, y)
+
+        if created:
+            log.debug("Decoded %d of %d thumbnails", created, len(index))
+            self.prune()
+        return SpriteSheet(atlases, index, self.thumb_size)
+
+    def thumbnail(self, path):
+        """
+        Returns (thumbnail, cached) for one picture, reading the cached tile when it is current.
+        The thumbnail is None if the picture cannot be read.
+        """
+        tile_path = self.tile_path(path)
+        if tile_path is None:
+            log.warning("Cannot read picture for thumbnail %s: file not found", path)
+            return None, False
+        try:
+            with Image.open(tile_path) as tile:
+                thumbnail = tile.convert("RGBA")
+            os.utime(tile_path)  # Marks the tile as recently used for prune()
+            return thumbnail, True
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring damaged thumbnail %s: %s", tile_path, e)
+
+        thumbnail = self.make_thumbnail(path)
+        if thumbnail is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                thumbnail.save(tile_path)
+            except OSError as e:
+                log.warning("Failed to cache thumbnail of %s: %s", path, e)  # Only costs a decode next time
+        return thumbnail, False
+
+    def make_thumbnail(self, path):
+        """Decodes one picture at reduced size. Returns None if it cannot be read."""
+        try:
+            with Image.open(path) as image:
+                image.draft("RGB", (self.thumb_size, self.thumb_size))  # Lets JPEG decode at a fraction of full size
+                image.thumbnail((self.thumb_size, self.thumb_size))
+                return image.convert("RGBA")
+        except (OSError, ValueError) as e:
+            log.warning("Cannot read picture for thumbnail %s: %s", path, e)
+            return None
+
+    def prune(self):
+        """
+        Deletes cached thumbnails unused for longer than max_age, then the least
+        recently used ones until the folder fits max_bytes.
+
+        Returns:
+            int: Number of files deleted.
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+        except OSError:
+            return 0
+        files = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()  # Least recently used first
+
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                log.warning("Cannot remove cached thumbnail %s: %s", path, e)
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            log.debug("Pruned %d cached thumbnails", removed)
+        return removed
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,87 @@
+import importlib
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+# Taken when this module is first imported; main.py imports it before anything else
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """
+    Records how long startup takes: named phases, lazily imported modules and time to first paint.
+    """
+
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.phases = []
+        self.imports = {}
+        self.first_paint = None
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as a named startup phase."""
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - began))
+
+    def import_module(self, name):
+        """
+        Imports a module on first use and records how long the import took.
+
+        Args:
+            name (str): Module name, e.g. "cv2".
+
+        Returns:
+            module: The imported module.
+        """
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        began = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports[name] = time.perf_counter() - began
+        return module
+
+    def mark_first_paint(self):
+        """Records the time the window was first drawn; later calls are ignored."""
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter() - self.start
+
+    def report(self):
+        """Returns the timings as a JSON-serializable dictionary (seconds)."""
+        return {
+            "first_paint": self.first_paint,
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases},
+            "lazy_imports": {name: round(seconds, 4) for name, seconds in self.imports.items()},
+            "modules_loaded": len(sys.modules),
+        }
+
+    def format_report(self):
+        """Returns the timings as readable text."""
+        lines = ["Startup timing:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<30} {seconds * 1000:8.1f} ms")
+        for name, seconds in self.imports.items():
+            lines.append(f"  lazy import {name:<18} {seconds * 1000:8.1f} ms")
+        if self.first_paint is not None:
+            lines.append(f"  {'time to first paint':<30} {self.first_paint * 1000:8.1f} ms")
+        lines.append(f"  {'modules loaded':<30} {len(sys.modules):8d}")
+        return "\n".join(lines)
+
+    def write(self, file_path):
+        """Writes the JSON report to a file."""
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=4)
+
+
+# Shared profiler used by main.py and the lazily importing modules
+profiler = StartupProfiler()
+
+
+def lazy_import(name):
+    """Imports a heavy module on first use, recording its import time in the startup profile."""
+    return profiler.import_module(name)
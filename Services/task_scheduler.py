@@ -0,0 +1,375 @@
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from Services.app_logging import get_logger
+from Services.lag_watchdog import watchdog
+
+log = get_logger(__name__)
+
+# Priorities: lower runs first
+HIGH = 0
+NORMAL = 10
+LOW = 20
+
+# Lanes: threads share memory with the app, processes get around the GIL for CPU-bound work
+THREAD = "thread"
+PROCESS = "process"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class TaskCancelled(Exception):
+    """Raised inside a thread-lane task whose cancellation was requested."""
+
+
+class CancelToken:
+    """Cancellation flag shared between the UI and a running task."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def check(self):
+        """Raises TaskCancelled once the task was cancelled; call it between steps of long work."""
+        if self.event.is_set():
+            raise TaskCancelled()
+
+
+class Task:
+    """One unit of background work and its state, as seen from the Tk thread."""
+
+    def __init__(self, scheduler, task_id, name, function, args, kwargs, priority, lane, group,
+                 pass_task, on_done, on_error, on_progress):
+        self.scheduler = scheduler
+        self.task_id = task_id
+        self.name = name
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.lane = lane
+        self.group = group
+        self.pass_task = pass_task
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+
+        self.status = QUEUED
+        self.progress = None  # 0-100, or None while unknown
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.token = CancelToken()
+        self.future = None  # Process lane only
+        self.progress_posted = False
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    def report(self, progress=None, message=""):
+        """
+        Reports progress from inside the task (thread lane, submitted with pass_task=True).
+
+        Reports are coalesced: however often this is called, the Tk thread gets at
+        most one pending update per task. Also raises TaskCancelled if the task
+        was cancelled, so reporting doubles as a cancellation point.
+
+        Args:
+            progress (float, optional): Percentage done.
+            message (str): Short description of the current step.
+        """
+        self.token.check()
+        self.progress = progress
+        self.message = message
+        if not self.progress_posted:
+            self.progress_posted = True
+            self.scheduler.post(self.deliver_progress)
+
+    def deliver_progress(self):
+        self.progress_posted = False
+        if self.status != RUNNING:
+            return
+        if self.on_progress is not None:
+            with watchdog.operation(f"{self.name} (progress)"):
+                self.on_progress(self)
+        self.scheduler.changed(self)
+
+    def deliver_result(self):
+        # Result callbacks run on the Tk thread; the lag watchdog attributes stalls to the task
+        with watchdog.operation(f"{self.name} (result)"):
+            if self.status == DONE and self.on_done is not None:
+                self.on_done(self.result)
+            elif self.status == FAILED:
+                if self.on_error is not None:
+                    self.on_error(self.error)
+                else:
+                    log.error("Error in background task '%s': %s", self.name, self.error)
+        self.scheduler.changed(self)
+
+
+class TaskScheduler:
+    """
+    Runs background work for the GUI on shared worker pools.
+
+    Tasks are queued by priority on a thread lane (I/O and work that needs the
+    app's objects) or a process lane (CPU-bound work on picklable data). Tasks
+    with the same `group` run one at a time in submission order, so edits of
+    one document never overlap. Every callback - results, errors, progress and
+    `on_change` - is put on a single queue that `attach()` drains from the Tk
+    loop with root.after, so widgets are only ever touched on the main thread.
+    """
+
+    def __init__(self, thread_workers=None, process_workers=None, on_change=None):
+        """
+        Args:
+            thread_workers (int, optional): Threads of the thread lane. Defaults to the CPU count, 2 to 8.
+            process_workers (int, optional): Processes of the process lane. Defaults to half the CPUs.
+            on_change (callable, optional): Called on the Tk thread with a Task whenever its
+                status or progress changes.
+        """
+        cpus = os.cpu_count() or 2
+        self.worker_counts = {
+            THREAD: thread_workers or max(2, min(8, cpus)),
+            PROCESS: process_workers or max(1, cpus // 2),
+        }
+        self.on_change = on_change
+
+        self.condition = threading.Condition()
+        self.ready = {THREAD: [], PROCESS: []}  # Heaps of (priority, sequence, task)
+        self.waiting = {}  # Group -> deque of tasks queued behind the group's current task
+        self.busy_groups = set()
+        self.workers = {THREAD: [], PROCESS: []}
+        self.active = {}  # Task id -> queued or running task
+        self.sequence = itertools.count(1)
+        self.process_pool = None
+        self.stopping = False
+
+        self.ui_queue = queue.SimpleQueue()
+        self.root = None
+        self.interval = 30
+
+    # Submitting and cancelling
+
+    def submit(self, function, *args, name=None, priority=NORMAL, lane=THREAD, group=None, pass_task=False,
+               on_done=None, on_error=None, on_progress=None, **kwargs):
+        """
+        Queues function(*args, **kwargs).
+
+        Args:
+            function (callable): The work. On the process lane it and its arguments must be picklable.
+            name (str, optional): Shown in progress displays. Defaults to the function name.
+            priority (int): HIGH, NORMAL, LOW or any int; lower runs first.
+            lane (str): THREAD or PROCESS.
+            group (hashable, optional): Tasks of one group run one at a time, in order.
+            pass_task (bool): Call the function with task=<Task> for progress and cancellation (thread lane).
+            on_done (callable, optional): Called on the Tk thread with the result.
+            on_error (callable, optional): Called on the Tk thread with the exception.
+                Without it, the error is printed.
+            on_progress (callable, optional): Called on the Tk thread with the Task after report().
+
+        Returns:
+            Task: The queued task.
+        """
+        if lane not in self.ready:
+            raise ValueError(f"Unknown lane '{lane}'")
+        task_id = next(self.sequence)
+        task = Task(self, task_id, name or getattr(function, "__name__", "task"), function, args, kwargs,
+                    priority, lane, group, pass_task, on_done, on_error, on_progress)
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("The task scheduler has been shut down")
+            self.active[task_id] = task
+            if group is not None and group in self.busy_groups:
+                self.waiting.setdefault(group, deque()).append(task)
+            else:
+                if group is not None:
+                    self.busy_groups.add(group)
+                self.push(task)
+            self.start_workers(lane)
+        self.post(self.changed, task)
+        return task
+
+    def push(self, task):
+        """Makes a task ready to run; called with the lock held."""
+        heapq.heappush(self.ready[task.lane], (task.priority, task.task_id, task))
+        self.condition.notify_all()
+
+    def cancel(self, task):
+        """
+        Cancels a task. A queued task never starts; a running thread-lane task stops
+        at its next report() or token check; a running process-lane task's result is dropped.
+
+        Returns:
+            bool: False if the task had already finished.
+        """
+        with self.condition:
+            if task.status not in (QUEUED, RUNNING):
+                return False
+            task.token.cancel()
+            if task.future is not None:
+                task.future.cancel()
+            if task.status == QUEUED:
+                task.status = CANCELLED  # Skipped when a worker reaches it
+                self.active.pop(task.task_id, None)
+                self.post(self.changed, task)
+        return True
+
+    def cancel_all(self, name=None):
+        """Cancels every queued and running task, or only those with the given name."""
+        with self.condition:
+            tasks = [task for task in self.active.values() if name is None or task.name == name]
+        for task in tasks:
+            self.cancel(task)
+
+    def pending(self):
+        """Returns the queued and running tasks."""
+        with self.condition:
+            return sorted(self.active.values(), key=lambda task: task.task_id)
+
+    # Workers
+
+    def start_workers(self, lane):
+        """Starts the lane's threads on first use; called with the lock held."""
+        workers = self.workers[lane]
+        while len(workers) < self.worker_counts[lane]:
+            thread = threading.Thread(target=self.work, args=(lane,), name=f"task-{lane}-{len(workers)}", daemon=True)
+            workers.append(thread)
+            thread.start()
+
+    def get_process_pool(self):
+        if self.process_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Forking a process that runs Tk and worker threads is unsafe; start clean interpreters
+            self.process_pool = ProcessPoolExecutor(self.worker_counts[PROCESS], mp_context=multiprocessing.get_context("spawn"))
+        return self.process_pool
+
+    def work(self, lane):
+        """Worker loop: runs the highest-priority ready task of the lane."""
+        while True:
+            with self.condition:
+                while not self.stopping and not self.ready[lane]:
+                    self.condition.wait()
+                if self.stopping:
+                    return
+                _, _, task = heapq.heappop(self.ready[lane])
+                if task.status == CANCELLED:
+                    self.release(task)
+                    continue
+                task.status = RUNNING
+                if lane == PROCESS:
+                    task.future = self.get_process_pool().submit(task.function, *task.args, **task.kwargs)
+            self.post(self.changed, task)
+            self.run(task)
+
+    def run(self, task):
+        try:
+            if task.lane == PROCESS:
+                result = task.future.result()
+            elif task.pass_task:
+                result = task.function(*task.args, task=task, **task.kwargs)
+            else:
+                result = task.function(*task.args, **task.kwargs)
+            status, error = DONE, None
+        except TaskCancelled:
+            status, result, error = CANCELLED, None, None
+        except Exception as e:
+            status, result, error = FAILED, None, e
+        if task.cancelled:
+            status, result = CANCELLED, None  # Late results of cancelled tasks are dropped
+
+        with self.condition:
+            task.status = status
+            task.result = result
+            task.error = error
+            task.future = None
+            self.active.pop(task.task_id, None)
+            self.release(task)
+        self.post(task.deliver_result)
+
+    def release(self, task):
+        """Lets the next task of the finished task's group run; called with the lock held."""
+        if task.group is None:
+            return
+        waiting = self.waiting.get(task.group)
+        if waiting:
+            self.push(waiting.popleft())
+        else:
+            self.waiting.pop(task.group, None)
+            self.busy_groups.discard(task.group)
+
+    def shutdown(self):
+        """Cancels all work and stops the workers without waiting for running tasks."""
+        self.cancel_all()
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+    # Delivery to the Tk thread
+
+    def post(self, callback, *args):
+        """Queues a call for the Tk thread. Safe to call from any thread."""
+        self.ui_queue.put((callback, args))
+
+    def changed(self, task):
+        if self.on_change is not None:
+            self.on_change(task)
+
+    def attach(self, root, interval=30):
+        """
+        Drains the callback queue from root's event loop every `interval` milliseconds.
+        """
+        self.root = root
+        self.interval = interval
+        self.root.after(interval, self.pump)
+
+    def pump(self):
+        if self.stopping:
+            return
+        self.drain()
+        self.root.after(self.interval, self.pump)
+
+    def drain(self, budget=0.02):
+        """
+        Runs queued callbacks on the calling (Tk) thread for up to `budget` seconds,
+        leaving the rest for the next tick so a burst of results cannot freeze the UI.
+
+        Returns:
+            int: Number of callbacks run.
+        """
+        deadline = time.perf_counter() + budget
+        count = 0
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                log.error("Error in task callback: %s", e)
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+        return count
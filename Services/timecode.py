@@ -0,0 +1,41 @@
+def parse_timecode(timecode):
+    """
+    Converts a Shotcut timecode to seconds.
+
+    Args:
+        timecode (str): Time in "HH:MM:SS.mmm" format (a bare number of seconds is also accepted).
+
+    Returns:
+        float: The time in seconds.
+
+    Raises:
+        ValueError: If the timecode cannot be parsed.
+    """
+    if timecode is None:
+        raise ValueError("Empty timecode")
+    text = str(timecode).strip()
+    sign = -1.0 if text.startswith("-") else 1.0
+    parts = text.lstrip("+-").split(":")
+    if not parts[0]:
+        raise ValueError(f"Empty timecode: {timecode!r}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return sign * seconds
+
+
+def format_timecode(seconds):
+    """
+    Converts seconds to a Shotcut timecode.
+
+    Args:
+        seconds (float): Time in seconds. Negative values are clamped to zero.
+
+    Returns:
+        str: Time in "HH:MM:SS.mmm" format.
+    """
+    total_milliseconds = max(0, int(round(seconds * 1000)))
+    total_seconds, milliseconds = divmod(total_milliseconds, 1000)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02}.{milliseconds:03}"
@@ -0,0 +1,33 @@
+import heapq
+
+
+def pack_intervals(intervals):
+    """
+    Packs intervals into the fewest lanes in which none overlap.
+
+    Intervals are sorted by start once; a heap holds the end time of every lane,
+    so each interval goes to the lane that frees up first, or opens a new lane
+    when even that one is still busy. Runs in O(n log n).
+
+    Args:
+        intervals (iterable): (start, end, item) tuples, times in seconds. Intervals are
+            closed, like MLT entries whose out point is the last frame shown, so an
+            interval starting exactly where another ends overlaps it.
+
+    Returns:
+        list: One list per lane of (start, end, item) tuples, in start order.
+    """
+    ordered = sorted(enumerate(intervals), key=lambda pair: (pair[1][0], pair[0]))
+
+    lanes = []
+    free_at = []  # Heap of (end time, lane number)
+    for _, interval in ordered:
+        start, end = interval[0], interval[1]
+        if free_at and free_at[0][0] < start:
+            lane_number = heapq.heappop(free_at)[1]
+        else:
+            lane_number = len(lanes)
+            lanes.append([])
+        lanes[lane_number].append(interval)
+        heapq.heappush(free_at, (end, lane_number))
+    return lanes
@@ -0,0 +1,105 @@
+import xml.etree.ElementTree as ET
+
+# Properties of the transitions Shotcut puts on every track, keyed by service
+AUDIO_MIX = {"mlt_service": "mix", "always_active": "1", "sum": "1"}
+VIDEO_BLEND = {"version": "0.1", "mlt_service": "frei0r.cairoblend", "threads": "0", "disable": "0"}
+
+
+class TractorGraph:
+    """
+    Indexed model of a tractor's tracks and transitions.
+
+    Tracks are read in order (their position is the track number used by
+    `a_track`/`b_track`) and transitions are indexed by
+    (a_track, b_track, mlt_service), so checking whether a transition exists
+    is a dictionary lookup instead of a scan over every transition.
+    """
+
+    def __init__(self, tractor):
+        """
+        Indexes the tracks and transitions of a tractor in one pass.
+
+        Args:
+            tractor (xml.etree.ElementTree.Element): The `<tractor>` element.
+        """
+        self.tractor = tractor
+        self.tracks = []
+        self.transitions = {}
+
+        for child in tractor:
+            if child.tag == "track":
+                self.tracks.append(child)
+            elif child.tag == "transition":
+                properties = {prop.get("name"): prop.text for prop in child.findall("property")}
+                key = (properties.get("a_track"), properties.get("b_track"), properties.get("mlt_service"))
+                self.transitions.setdefault(key, child)
+
+    def has_transition(self, a_track, b_track, service):
+        """Returns True if a transition with this service already connects the two tracks."""
+        return (str(a_track), str(b_track), service) in self.transitions
+
+    def is_video_track(self, track_number):
+        """Returns True if the track shows video (Shotcut hides video on audio tracks)."""
+        return self.tracks[track_number].get("hide") not in ("video", "both")
+
+    def required_transitions(self, track_numbers=None):
+        """
+        Lists the transitions Shotcut expects for the given tracks.
+
+        Every track above the background gets an audio mix with track 0, and every
+        video track gets a blend with the bottom video track (track 0 for the bottom
+        video track itself).
+
+        Args:
+            track_numbers (iterable, optional): Tracks to check. Defaults to all tracks.
+
+        Returns:
+            list: Dictionaries of transition properties, including a_track and b_track.
+        """
+        if track_numbers is None:
+            track_numbers = range(len(self.tracks))
+
+        video_tracks = [number for number in range(1, len(self.tracks)) if self.is_video_track(number)]
+        bottom_video = video_tracks[0] if video_tracks else None
+
+        required = []
+        for number in track_numbers:
+            if number <= 0 or number >= len(self.tracks):
+                continue
+            required.append({"a_track": "0", "b_track": str(number), **AUDIO_MIX})
+            if self.is_video_track(number):
+                a_track = 0 if number == bottom_video else bottom_video
+                required.append({"a_track": str(a_track), "b_track": str(number), **VIDEO_BLEND})
+        return required
+
+    def missing_transitions(self, track_numbers=None):
+        """
+        Lists the required transitions that do not exist yet.
+
+        Args:
+            track_numbers (iterable, optional): Tracks to check. Defaults to all tracks.
+
+        Returns:
+            list: Dictionaries of transition properties, including a_track and b_track.
+        """
+        return [
+            transition for transition in self.required_transitions(track_numbers)
+            if not self.has_transition(transition["a_track"], transition["b_track"], transition["mlt_service"])
+        ]
+
+    def add_transition(self, transition_id, properties):
+        """
+        Appends a transition to the tractor and indexes it.
+
+        Args:
+            transition_id (str): Id of the new transition.
+            properties (dict): Transition properties, including a_track and b_track.
+
+        Returns:
+            xml.etree.ElementTree.Element: The new `<transition>` element.
+        """
+        element = ET.SubElement(self.tractor, "transition", id=transition_id)
+        for key, value in properties.items():
+            ET.SubElement(element, "property", name=key).text = value
+        self.transitions.setdefault((properties.get("a_track"), properties.get("b_track"), properties.get("mlt_service")), element)
+        return element
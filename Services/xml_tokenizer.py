@@ -0,0 +1,72 @@
+import re
+from collections import OrderedDict
+
+# Token classes, in the order the patterns are tried
+TOKEN_PATTERN = re.compile(
+    r"(?P<comment><!--.*?(?:-->|$))"
+    r"|(?P<declaration><\?.*?(?:\?>|$))"
+    r"|(?P<open></?)(?P<tag>[\w:.-]+)"
+    r"|(?P<attribute>[\w:.-]+)(?==)"
+    r"|(?P<value>\"[^\"]*\"?|'[^']*'?)"
+    r"|(?P<close>/?>)"
+)
+
+# Element names shown in their own color so the timeline structure stands out
+ELEMENT_CLASSES = {
+    "producer": "xml_producer",
+    "chain": "xml_producer",
+    "playlist": "xml_playlist",
+    "track": "xml_track",
+    "tractor": "xml_track",
+    "transition": "xml_transition",
+}
+
+
+def tokenize_line(line):
+    """
+    Splits one line of XML into highlight spans.
+
+    Lines are tokenized on their own; a construct that spans lines (such as a long
+    comment) is only highlighted on its first line.
+
+    Args:
+        line (str): A line of the document.
+
+    Returns:
+        list: (token class, start column, end column) tuples.
+    """
+    spans = []
+    for match in TOKEN_PATTERN.finditer(line):
+        kind = match.lastgroup
+        if kind == "tag":
+            spans.append(("xml_tag", match.start("open"), match.end("open")))
+            spans.append((ELEMENT_CLASSES.get(match.group("tag"), "xml_tag"), match.start("tag"), match.end("tag")))
+        elif kind == "close":
+            spans.append(("xml_tag", match.start(), match.end()))
+        else:
+            spans.append((f"xml_{kind}", match.start(), match.end()))
+    return spans
+
+
+class TokenCache:
+    """
+    Bounded cache of line spans keyed by line text.
+
+    Keying by text means identical lines (very common in .mlt files) share one
+    entry, and a line is re-tokenized only when its text changes.
+    """
+
+    def __init__(self, max_lines=50000):
+        self.max_lines = max_lines
+        self.spans = OrderedDict()
+
+    def get(self, line):
+        spans = self.spans.get(line)
+        if spans is None:
+            spans = tokenize_line(line)
+            self.spans[line] = spans
+            if len(self.spans) > self.max_lines:
+                self.spans.popitem(last=False)
+        else:
+            self.spans.move_to_end(line)
+        return spans
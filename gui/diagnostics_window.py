@@ -0,0 +1,117 @@
+import ttkbootstrap as ttk
+from tkinter import filedialog
+import tkinter as tk
+from Services.app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class DiagnosticsWindow:
+    """Window showing event-loop lag: the histogram, the slowest operations and recent stalls."""
+
+    def __init__(self, parent, watchdog):
+        """
+        Args:
+            parent: Parent window.
+            watchdog (LagWatchdog): The running watchdog.
+        """
+        self.watchdog = watchdog
+        self.stalls = []
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("900x700")
+
+        self.summary_label = ttk.Label(self.window, text="", font=("Courier", 10))
+        self.summary_label.pack(fill="x", padx=10, pady=5)
+
+        panes = ttk.Frame(self.window)
+        panes.pack(fill="both", expand=True, padx=10)
+        panes.grid_columnconfigure(0, weight=1)
+        panes.grid_columnconfigure(1, weight=2)
+        panes.grid_rowconfigure(0, weight=1)
+        panes.grid_rowconfigure(1, weight=1)
+
+        self.histogram_tree = self.make_tree(panes, (("Lag", 80), ("Beats", 70), ("", 160)))
+        self.histogram_tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        self.operation_tree = self.make_tree(panes, (("Operation", 300), ("Stalls", 60), ("Total ms", 80), ("Max ms", 80)))
+        self.operation_tree.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+        self.stall_tree = self.make_tree(panes, (("Time", 200), ("Lag ms", 70), ("Operations", 400)))
+        self.stall_tree.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        self.stall_tree.bind("<<TreeviewSelect>>", self.show_stack)
+
+        # Main thread stack sampled during the selected stall
+        self.stack_text = tk.Text(self.window, height=10, wrap="none", font=("Courier", 9))
+        self.stack_text.pack(fill="both", padx=10, pady=5)
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        self.stack_var = tk.BooleanVar(value=watchdog.sample_stacks)
+        ttk.Checkbutton(button_frame, text="Sample stacks", variable=self.stack_var, command=self.toggle_stacks).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Save Report", bootstyle="primary", command=self.save_report).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Reset", bootstyle="secondary", command=self.reset).pack(side="left", expand=True, padx=5)
+
+        self.refresh()
+
+    def make_tree(self, parent, columns):
+        tree = ttk.Treeview(parent, columns=[name for name, _ in columns], show="headings", height=8)
+        for name, width in columns:
+            tree.heading(name, text=name)
+            tree.column(name, width=width, anchor="w")
+        return tree
+
+    def refresh(self):
+        """Redraw the statistics every second while the window is open."""
+        if not self.window.winfo_exists():
+            return
+        report = self.watchdog.report()
+        self.summary_label.config(
+            text=(
+                f"beats {report['beats']}   mean {report['mean_lag_ms']} ms   p50 {report['p50_lag_ms']} ms   "
+                f"p95 {report['p95_lag_ms']} ms   p99 {report['p99_lag_ms']} ms   max {report['max_lag_ms']} ms   "
+                f"stalls (>= {report['stall_ms']} ms) {report['stall_count']}"
+            )
+        )
+
+        largest = max(report["histogram"].values(), default=0) or 1
+        self.fill(self.histogram_tree, [(label, count, "#" * round(20 * count / largest)) for label, count in report["histogram"].items()])
+        self.fill(self.operation_tree, [(name, stats["stalls"], stats["stall_ms"], stats["max_ms"]) for name, stats in report["operations"].items()])
+
+        if len(report["stalls"]) != len(self.stalls) or report["stalls"][-1:] != self.stalls[-1:]:
+            self.stalls = report["stalls"]
+            self.fill(self.stall_tree, [(stall["time"], stall["lag_ms"], ", ".join(stall["operations"]) or "(unregistered)") for stall in reversed(self.stalls)])
+
+        self.window.after(1000, self.refresh)
+
+    def fill(self, tree, rows):
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", "end", values=row)
+
+    def show_stack(self, event=None):
+        selection = self.stall_tree.selection()
+        self.stack_text.delete("1.0", "end")
+        if not selection:
+            return
+        stall = self.stalls[len(self.stalls) - 1 - self.stall_tree.index(selection[0])]
+        self.stack_text.insert("1.0", "\n".join(stall.get("stack", ["No stack sample (enable 'Sample stacks')."])))
+
+    def toggle_stacks(self):
+        self.watchdog.set_stack_sampling(self.stack_var.get())
+
+    def save_report(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Save Responsiveness Report",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            parent=self.window,
+        )
+        if file_path:
+            self.watchdog.write(file_path)
+            log.info("Responsiveness report saved to %s", file_path)
+
+    def reset(self):
+        self.watchdog.reset()
+        self.stalls = []
+        self.stall_tree.delete(*self.stall_tree.get_children())
+        self.stack_text.delete("1.0", "end")
@@ -0,0 +1,52 @@
+import ttkbootstrap as ttk
+import os
+
+
+class DuplicatesWindow:
+    """Window listing groups of duplicate pictures, canonical picture first."""
+
+    def __init__(self, parent, folder, groups, on_use_canonical=None):
+        """
+        Args:
+            parent: Parent window.
+            folder (str): The folder that was searched.
+            groups (list): Groups of paths from ImageHashIndex.duplicate_groups().
+            on_use_canonical (callable, optional): Called with {duplicate path: canonical path}
+                when the user asks to replace duplicates in the marker assignments.
+        """
+        self.folder = folder
+        self.groups = groups
+        self.on_use_canonical = on_use_canonical
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title(f"Duplicate Pictures - {os.path.basename(folder) or folder}")
+        self.window.geometry("900x500")
+
+        duplicate_count = sum(len(group) - 1 for group in groups)
+        ttk.Label(self.window, text=f"{len(groups)} groups, {duplicate_count} duplicate files").pack(fill="x", padx=10, pady=5)
+
+        self.group_tree = ttk.Treeview(self.window, columns=("Folder",), show="tree headings", selectmode="browse")
+        self.group_tree.heading("#0", text="Picture")
+        self.group_tree.heading("Folder", text="Folder")
+        self.group_tree.column("#0", width=300)
+        self.group_tree.column("Folder", width=550)
+        self.group_tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+        for group in groups:
+            canonical = group[0]
+            item = self.group_tree.insert("", "end", text=f"{os.path.basename(canonical)} (canonical)", values=(self.relative_folder(canonical),), open=False)
+            for path in group[1:]:
+                self.group_tree.insert(item, "end", text=os.path.basename(path), values=(self.relative_folder(path),))
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        if on_use_canonical is not None:
+            ttk.Button(button_frame, text="Use Canonical Pictures in Markers", bootstyle="primary", command=self.use_canonical).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Close", bootstyle="secondary", command=self.window.destroy).pack(side="left", expand=True, padx=5)
+
+    def relative_folder(self, path):
+        return os.path.relpath(os.path.dirname(path), self.folder)
+
+    def use_canonical(self):
+        replacements = {path: group[0] for group in self.groups for path in group[1:]}
+        self.on_use_canonical(replacements)
@@ -0,0 +1,128 @@
+import ttkbootstrap as ttk
+from tkinter import messagebox
+import os
+from Services.line_document import LineDocument
+from Services.task_scheduler import HIGH
+from gui.paged_text_viewer import PagedTextViewer
+
+
+class ExportHistoryWindow:
+    """Window listing recorded exports with restore and compare controls."""
+
+    def __init__(self, parent, history, scheduler, source=None):
+        """
+        Args:
+            parent: Parent window.
+            history (ExportHistory): The store to browse.
+            scheduler (TaskScheduler): Runs reads, restores and diffs in the background.
+            source (str, optional): Only show exports of this project.
+        """
+        self.history = history
+        self.scheduler = scheduler
+        self.source = source
+        self.versions = []
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Export History")
+        self.window.geometry("1000x700")
+
+        self.version_tree = ttk.Treeview(
+            self.window,
+            columns=("Version", "Created", "Size", "Chunks", "Source"),
+            show="headings",
+            selectmode="extended",
+            height=10,
+        )
+        for column, width in (("Version", 260), ("Created", 200), ("Size", 90), ("Chunks", 70), ("Source", 300)):
+            self.version_tree.heading(column, text=column)
+            self.version_tree.column(column, width=width, anchor="w" if column in ("Version", "Source") else "center")
+        self.version_tree.pack(fill="x", padx=10, pady=10)
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        ttk.Button(button_frame, text="Restore", bootstyle="warning", command=self.restore_selected).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Compare", bootstyle="info", command=self.compare_selected).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Refresh", bootstyle="secondary", command=self.refresh).pack(side="left", expand=True, padx=5)
+
+        self.summary_label = ttk.Label(self.window, text="")
+        self.summary_label.pack(fill="x", padx=10)
+
+        # Diff of the compared versions
+        self.diff_viewer = PagedTextViewer(self.window, height=20, width=120)
+        self.diff_viewer.pack(fill="both", expand=True, padx=10, pady=10)
+        self.diff_viewer.tag_configure("removed", foreground="#b3261e")
+        self.diff_viewer.tag_configure("added", foreground="#2e7d32")
+
+        self.refresh()
+
+    def refresh(self):
+        """Reload the version list and the storage summary in the background."""
+        def load():
+            return self.history.versions(self.source), self.history.stats()
+
+        self.scheduler.submit(load, name="Load export history", priority=HIGH, on_done=self.show_versions)
+
+    def show_versions(self, result):
+        if not self.window.winfo_exists():
+            return
+        self.versions, stats = result
+        for item in self.version_tree.get_children():
+            self.version_tree.delete(item)
+        for version in reversed(self.versions):  # Newest first
+            self.version_tree.insert(
+                "",
+                "end",
+                iid=version.version_id,
+                values=(version.version_id, version.created, f"{version.size // 1024} KB", len(version.chunks), os.path.basename(version.source or "")),
+            )
+        self.summary_label.config(
+            text=f"{stats['versions']} exports, {stats['exported_bytes'] // 1024} KB exported, {stats['stored_bytes'] // 1024} KB stored"
+        )
+
+    def selected_versions(self):
+        selected = set(self.version_tree.selection())
+        return [version for version in self.versions if version.version_id in selected]
+
+    def restore_selected(self):
+        selected = self.selected_versions()
+        if len(selected) != 1:
+            messagebox.showerror("Restore", "Select one export to restore.", parent=self.window)
+            return
+        version = selected[0]
+        if not messagebox.askyesno("Restore", f"Overwrite {version.export_path}\nwith the export from {version.created}?", parent=self.window):
+            return
+        self.scheduler.submit(
+            self.history.restore, version,
+            name="Restore export", priority=HIGH,
+            on_done=lambda path: messagebox.showinfo("Restore", f"Restored:\n{path}", parent=self.window),
+            on_error=lambda e: messagebox.showerror("Restore", f"Failed to restore the export:\n{e}", parent=self.window),
+        )
+
+    def compare_selected(self):
+        """Diff two selected exports, or one export with the export before it."""
+        selected = self.selected_versions()
+        if len(selected) == 1:
+            position = self.versions.index(selected[0])
+            if position == 0:
+                messagebox.showinfo("Compare", "This is the oldest export; select two exports to compare.", parent=self.window)
+                return
+            selected = [self.versions[position - 1], selected[0]]
+        if len(selected) != 2:
+            messagebox.showerror("Compare", "Select one or two exports to compare.", parent=self.window)
+            return
+        old, new = selected
+        self.scheduler.cancel_all("Compare exports")
+        self.scheduler.submit(
+            self.history.diff, old, new,
+            name="Compare exports", priority=HIGH, on_done=self.show_diff,
+            on_error=lambda e: messagebox.showerror("Compare", f"Failed to compare the exports:\n{e}", parent=self.window),
+        )
+
+    def show_diff(self, diff_lines):
+        if not self.window.winfo_exists():
+            return
+        if not diff_lines:
+            diff_lines = ["The exports are identical."]
+        self.diff_viewer.load_document(LineDocument.from_text("\n".join(diff_lines)))
+        self.diff_viewer.set_line_tags("removed", [number for number, line in enumerate(diff_lines) if line.startswith("-") and not line.startswith("---")])
+        self.diff_viewer.set_line_tags("added", [number for number, line in enumerate(diff_lines) if line.startswith("+") and not line.startswith("+++")])
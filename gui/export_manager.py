@@ -1,39 +1,78 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import tkinter as tk  # Import tkinter for `tk.END`
 from tkinter import messagebox
 import os
 import json
-import difflib
+import logging
 import xml.etree.ElementTree as ET
-import hashlib
-from datetime import datetime
 from xml.dom import minidom
+from Services.app_logging import get_logger
+from Services.edit_history import EditHistory
+from Services.export_history import ExportHistory
+from Services.file_watcher import stat_key
+from Services.lag_watchdog import watchdog
+from Services.line_document import LineDocument, changed_lines
+from Services.render_queue import RenderQueue
+from Services.task_scheduler import HIGH, PROCESS, TaskScheduler
+from Services.xml_tokenizer import TokenCache
+from Services.project_validator import format_diagnostics, validate_project
+from Services.mlt_builder import (
+    add_marker_playlists,
+    add_marker_producers,
+    add_missing_transitions,
+    prettify_xml_with_no_extra_lines,
+)
+from Services.mlt_splice import SpliceError, atomic_write, splice_export
+from Services.producer_templates import get_template
+from gui.paged_text_viewer import PagedTextViewer
+from gui.xml_highlighter import XmlHighlighter
+
+log = get_logger(__name__)
 
 class ExportManager:
-    def __init__(self, parent, markers):
+    def __init__(self, parent, markers, scheduler=None, workspace=None):
         self.parent = parent
         self.markers = markers
+        self.workspace = workspace  # ProjectWorkspace the edited document is kept in between windows and switches
 
         # Create the Export Manager window
         self.window = ttk.Toplevel(parent)
         self.window.title("Export Manager")
         self.window.geometry("2000x1200")
+
+        # Parsing, edits, diffs and exports run in the background; results arrive on the Tk thread
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler or TaskScheduler()
+        if self.owns_scheduler:
+            self.scheduler.attach(self.window)
+        self.window.bind("<Destroy>", self.on_destroy, add="+")
+        self.edit_group = f"export-manager-{id(self)}"  # Edits of output_root run one at a time
         self.config = self.load_config()
+        self.render_queue = None  # Created on first render
+        self.export_history = ExportHistory(self.config.get("export_history_folder", "export_history"))
+        self.output_root = None  # Document edited by the builder buttons, parsed on first edit
+        self.history = None  # Undo/redo patches of output_root
+        self.document_stamp = None  # stat_key() of the .mlt file output_root was parsed from
         self.debug_markers()
 
         # Set up the UI layout
         self.setup_ui()
 
+        # Continue the edits of an earlier window on this project
+        if self.workspace is not None:
+            self.submit_edit("Restore Document", self.restore_document)
+
     def debug_markers(self):
         """Display debug information about the markers."""
         if not self.markers:
-            print("Debug: No markers loaded.")
+            log.debug("No markers loaded.")
         else:
-            print(f"Debug: {len(self.markers)} markers loaded.")
-            for index, marker in enumerate(self.markers):
-                print(f"Marker {index + 1}: {marker}")
+            log.debug("%d markers loaded.", len(self.markers))
+            if log.isEnabledFor(logging.DEBUG):
+                for index, marker in enumerate(self.markers):
+                    log.debug("Marker %d: %s", index + 1, marker, extra={"marker": index + 1})
 
+    @watchdog.track()
     def highlight_differences(self):
         """Highlight differences between the original .mlt file and the output preview."""
         mlt_file = self.config.get("shortcut", None)
@@ -41,43 +80,85 @@ class ExportManager:
             messagebox.showerror("Error", "No valid .mlt file found in config.")
             return
 
-        try:
-            # Read the original content
-            with open(mlt_file, "r", encoding="utf-8") as file:
-                original_content = [line.strip() for line in file.readlines()]  # Strip whitespace
-
-            # Get the output preview content
-            output_content = [
-                line.strip() for line in self.output_mlt_text.get("1.0", "end").splitlines()
-            ]  # Strip whitespace
-
-            # Clear existing tags in both text widgets
-            self.current_mlt_text.tag_delete("diff")
-            self.output_mlt_text.tag_delete("diff")
-
-            # Compare the files line by line using difflib
-            matcher = difflib.SequenceMatcher(None, original_content, output_content)
-            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                if tag == "replace":  # Lines that differ
-                    for i in range(i1, i2):
-                        self.current_mlt_text.tag_add("diff", f"{i + 1}.0", f"{i + 1}.end")
-                    for j in range(j1, j2):
-                        self.output_mlt_text.tag_add("diff", f"{j + 1}.0", f"{j + 1}.end")
-                elif tag == "delete":  # Lines deleted from the original
-                    for i in range(i1, i2):
-                        self.current_mlt_text.tag_add("diff", f"{i + 1}.0", f"{i + 1}.end")
-                elif tag == "insert":  # Lines added to the output
-                    for j in range(j1, j2):
-                        self.output_mlt_text.tag_add("diff", f"{j + 1}.0", f"{j + 1}.end")
-
-            # Configure the highlight tag
-            self.current_mlt_text.tag_configure("diff", background="lightcoral")
-            self.output_mlt_text.tag_configure("diff", background="lightgreen")
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to highlight differences:\n{e}")
+        # Compare the indexed documents line by line; nothing is read back from the widgets.
+        # The diff is CPU-bound, so it runs in a worker process.
+        original_content = list(self.current_viewer.document.iter_lines())
+        output_document = self.output_viewer.current_document()
+        output_content = list(output_document.iter_lines()) if output_document else []
+        self.scheduler.cancel_all("Highlight Differences")
+        self.scheduler.submit(
+            changed_lines, original_content, output_content,
+            name="Highlight Differences", lane=PROCESS,
+            on_done=self.show_differences,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to highlight differences:\n{e}"),
+        )
+
+    @watchdog.track()
+    def show_differences(self, differences):
+        """Tag the changed lines of both panels with the result of changed_lines."""
+        if not self.window.winfo_exists():
+            return
+        original_diff, output_diff = differences
+
+        # Configure the highlight tag; the viewers tag lines as they scroll into view
+        self.current_viewer.tag_configure("diff", background="lightcoral")
+        self.output_viewer.tag_configure("diff", background="lightgreen")
+        self.current_viewer.set_line_tags("diff", original_diff)
+        self.output_viewer.set_line_tags("diff", output_diff)
+
+    def on_destroy(self, event):
+        if event.widget is self.window:
+            if self.render_queue is not None:
+                self.render_queue.stop()  # Running renders are requeued and resume with the next queue
+            mlt_file = self.config.get("shortcut")
+            if self.scheduler.stopping:
+                # The app is closing and its scheduler takes no more tasks; its edits were cancelled
+                self.store_document(mlt_file)
+                return
+
+            # Queued behind the edits still running on the document, so it is only handed on once they are done
+
+            def store():
+                self.store_document(mlt_file)
+                if self.owns_scheduler:
+                    self.scheduler.shutdown()
+
+            self.scheduler.submit(store, name="Store Document", priority=HIGH, group=self.edit_group)
+
+    def store_document(self, mlt_file):
+        """
+        Give the edited document back to the workspace, so the next window on the project continues it.
+        Runs as a task in edit_group, after every edit of the document.
+        """
+        if self.workspace is not None and self.output_root is not None and mlt_file:
+            self.workspace.set_document(mlt_file, self.output_root, self.history, self.document_stamp)
+
+    def switch_project(self, mlt_file, markers):
+        """
+        Continue with another project: its markers, its .mlt file and the document the
+        workspace kept for it, if any. Runs after the edits already queued.
+        """
+        self.markers = markers
+        previous_file = self.config.get("shortcut")
+        if mlt_file == previous_file:
+            return
+        self.config["shortcut"] = mlt_file
+        self.load_current_mlt()
+
+        def switch():
+            self.store_document(previous_file)
+            self.output_root = None
+            self.history = None
+            return self.restore_document() or ""  # Empty preview until the first edit
+
+        self.submit_edit("Switch Project", switch)
+
+    def restore_document(self):
+        """Take the project's document from the workspace if it kept one; returns its preview text or None."""
+        if self.get_output_root(parse=False) is None:
+            return None
+        return prettify_xml_with_no_extra_lines(self.output_root)
 
-    
 
     def load_config(self):
         """Load configuration from config.json."""
@@ -86,10 +167,10 @@ class ExportManager:
             with open(config_file, "r") as file:
                 try:
                     config = json.load(file)
-                    print(f"Debug: Loaded config: {config}")
+                    log.debug("Loaded config: %s", config)
                     return config
                 except json.JSONDecodeError:
-                    print("Error: Failed to decode config.json.")
+                    log.error("Failed to decode config.json.")
         return {}
 
     def setup_ui(self):
@@ -109,12 +190,17 @@ class ExportManager:
         ttk.Label(left_frame, text="Current .mlt File", font=("Helvetica", 14, "bold")).pack(pady=5)
         ttk.Label(right_frame, text="Output Preview", font=("Helvetica", 14, "bold")).pack(pady=5)
 
-        # Text widgets to display .mlt content
-        self.current_mlt_text = ttk.ScrolledText(left_frame, height=30, width=100)
-        self.current_mlt_text.pack(fill="both", expand=True, padx=10, pady=10)
+        # Paged viewers only keep the visible lines of the .mlt content in Tk
+        self.current_viewer = PagedTextViewer(left_frame, height=30, width=100)
+        self.current_viewer.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.output_viewer = PagedTextViewer(right_frame, height=30, width=100, editable=True)  # Can be touched up before export
+        self.output_viewer.pack(fill="both", expand=True, padx=10, pady=10)
 
-        self.output_mlt_text = ttk.ScrolledText(right_frame, height=30, width=100)
-        self.output_mlt_text.pack(fill="both", expand=True, padx=10, pady=10)
+        # Syntax highlighting of the visible lines; both panels share one token cache
+        token_cache = TokenCache()
+        self.current_highlighter = XmlHighlighter(self.current_viewer, cache=token_cache)
+        self.output_highlighter = XmlHighlighter(self.output_viewer, cache=token_cache)
 
         # Load initial content
         self.load_current_mlt()
@@ -124,157 +210,10 @@ class ExportManager:
         
     def add_playlists(self):
         """
-        Add a playlist for the markers to the .mlt file, ensuring the playlist is added 
+        Add playlists for the markers to the .mlt file, ensuring the playlists are added 
         immediately after the producers.
         """
-        # Check if there's content in the output text box
-        existing_output_content = self.output_mlt_text.get("1.0", tk.END).strip()
-
-        # Use existing content from the output text box if available; otherwise, use the .mlt file
-        if existing_output_content:
-            content = existing_output_content
-        else:
-            mlt_file = self.config.get("shortcut", None)
-            if not mlt_file or not os.path.exists(mlt_file):
-                print("Error: No valid .mlt file found in config.")
-                return
-            with open(mlt_file, "r", encoding="utf-8") as file:
-                content = file.read()
-
-        # Parse the .mlt file as XML
-        root = ET.fromstring(content)
-
-        # Find the current highest playlist ID
-        highest_playlist_id = 0
-        for playlist in root.findall(".//playlist"):
-            playlist_id = playlist.get("id", "")
-            if playlist_id.startswith("playlist"):
-                try:
-                    playlist_number = int(playlist_id.replace("playlist", ""))
-                    highest_playlist_id = max(highest_playlist_id, playlist_number)
-                except ValueError:
-                    pass
-
-        # Increment for the new playlist ID
-        new_playlist_id = highest_playlist_id + 1
-        playlist_id = f"playlist{new_playlist_id}"
-
-        # Create the playlist element
-        playlist = ET.Element("playlist", id=playlist_id)
-        ET.SubElement(playlist, "property", name="shotcut:video").text = "1"
-        ET.SubElement(playlist, "property", name="shotcut:name").text = f"V{new_playlist_id}"
-
-        # Track the previous marker time
-        previous_time = None
-
-        # Add Blank Space and Entry Produver to playlist
-        previous_end_time = "00:00:00.000"
-
-        for idx, marker in enumerate(self.markers):
-            producer_id = f"producer{idx}"  # Sequentially number producers starting from 0
-
-            # Calculate blank length and add to playlist
-            blank_length = calculate_blank_length(previous_end_time, marker["StartTime"])
-            ET.SubElement(playlist, "blank", length=blank_length)
-
-            # Add the producer entry
-            ET.SubElement(playlist, "entry", producer=producer_id, **{"in": "00:00:00.000", "out": "00:00:00.483"})
-
-            # Update the previous_end_time for the next iteration
-            previous_end_time = calculate_end_time(marker["StartTime"], "00:00:00.483")
-
-            
-        # Add the playlist to the XML
-        # last_playlist = root.find(".//playlist[last()]")
-        # if last_playlist is not None:
-        #     root.insert(list(root).index(last_playlist) + 1, playlist)
-        
-        # Find the last <producer> and the <tractor> element
-        last_producer = root.find(".//producer[last()]")
-        tractor = root.find(".//tractor")
-
-        if last_producer is not None and tractor is not None:
-            # Insert the new playlist after the last producer and before the tractor
-            producer_index = list(root).index(last_producer)
-            root.insert(producer_index + 1, playlist)
-        else:
-            print("Error: Could not find <producer> or <tractor> to determine insertion point.")
-
-
-        # Add the corresponding track in the <tractor> element
-            tractor = root.find(".//tractor")
-            if tractor is not None:
-                # Insert the new track for the playlist after the last existing track
-                new_track = ET.Element("track", producer=playlist_id)
-                tracks = tractor.findall(".//track")
-                if tracks:
-                    tractor.insert(list(tractor).index(tracks[-1]) + 1, new_track)
-                else:
-                    # If no tracks are found, add it as the first child of <tractor>
-                    tractor.insert(0, new_track)
-        # Find the <track producer="background"/> element
-        tracks_parent = root.find(".//track/..")  # Find the parent of the <track> elements
-        background_track = root.find(".//track[@producer='playlist2']")  # Find the background track
-
-        if tracks_parent is not None and background_track is not None:
-            # Create the new track element for the playlist
-            new_track = ET.Element("track", producer=playlist_id)
-
-            # Insert the new track after the background track
-            index = list(tracks_parent).index(background_track)
-            tracks_parent.insert(index + 1, new_track)
-        else:
-            print("Error: Could not find the <track> section or background track.")
-
-
-        # Serialize the updated XML back to a string
-        pretty_string = prettify_xml_with_no_extra_lines(root)
-
-        # Load the updated content into the Output Preview
-        self.load_output_preview(pretty_string)
-
-        from datetime import datetime, timedelta
-
-        def calculate_blank_length(previous_end_time, current_start_time):
-            """
-            Calculate the blank length between two time points.
-
-            Args:
-                previous_end_time (str): The end time of the previous entry in the format HH:MM:SS.mmm.
-                current_start_time (str): The start time of the current marker in the format HH:MM:SS.mmm.
-
-            Returns:
-                str: The blank length in the format HH:MM:SS.mmm.
-            """
-            fmt = "%H:%M:%S.%f"
-            previous = datetime.strptime(previous_end_time, fmt)
-            current = datetime.strptime(current_start_time, fmt)
-            difference = current - previous
-
-            if difference.total_seconds() < 0:
-                print("Warning: Negative blank length detected. Setting to 00:00:00.000.")
-                return "00:00:00.000"
-
-            return difference.strftime("%H:%M:%S.%f")[:-3]  # Trim to milliseconds
-
-
-        def calculate_end_time(start_time, duration="00:00:00.483"):
-            """
-            Calculate the end time based on the start time and duration.
-
-            Args:
-                start_time (str): The start time of the entry in the format HH:MM:SS.mmm.
-                duration (str): The duration of the entry in the format HH:MM:SS.mmm.
-
-            Returns:
-                str: The calculated end time in the format HH:MM:SS.mmm.
-            """
-            fmt = "%H:%M:%S.%f"
-            start = datetime.strptime(start_time, fmt)
-            duration_delta = datetime.strptime(duration, fmt) - datetime.strptime("00:00:00.000", fmt)
-            end_time = start + duration_delta
-            return end_time.strftime("%H:%M:%S.%f")[:-3]  # Trim to milliseconds
-
+        self.apply_edit("Add Playlists", add_marker_playlists, self.markers, self.get_producer_template().source)
 
 
     def calculate_time_difference(self, start_time, end_time):
@@ -336,163 +275,95 @@ class ExportManager:
         Add producers to the .mlt file based on markers.
         If a marker does not have a picture, it will be skipped with a warning.
         """
-        # Check if the output preview has content; use it as the base if present
-        existing_output_content = self.output_mlt_text.get("1.0", tk.END).strip()
-
-        if existing_output_content:
-            content = existing_output_content
-        else:
-            # Otherwise, load content from the .mlt file
-            mlt_file = self.config.get("shortcut", None)
-            if not mlt_file or not os.path.exists(mlt_file):
-                print("Error: No valid .mlt file found in config.")
-                return
-
-            with open(mlt_file, "r", encoding="utf-8") as file:
-                content = file.read()
-
-        # Parse the .mlt file as XML
-        root = ET.fromstring(content)
-
-        # Find the current highest producer number
-        highest_producer_id = 0
-        for producer in root.findall(".//producer"):
-            producer_id = producer.get("id", "")
-            if producer_id.startswith("producer"):
-                try:
-                    producer_number = int(producer_id.replace("producer", ""))
-                    highest_producer_id = max(highest_producer_id, producer_number)
-                except ValueError:
-                    pass
-
-        # Add a producer for each marker
-        for marker in self.markers:
-            marker_name = marker.get("Name", "unknown")
-            marker_picture = marker.get("Picture", None)
-
-            # Skip markers without pictures
-            if not marker_picture:
-                print(f"Warning: Marker '{marker_name}' has no picture assigned. Skipping.")
-                continue
-
-            highest_producer_id += 1  # Increment the producer ID
-            producer_id = f"producer{highest_producer_id}"
-
-            # Generate a unique hash
-            hash_input = f"{marker_name}_{datetime.utcnow().isoformat()}".encode("utf-8")
-            unique_hash = hashlib.md5(hash_input).hexdigest()
-
-            # Get the current datetime in the required format
-            creation_time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-
-            # Create the producer element
-            producer = ET.Element("producer", id=producer_id, attrib={"in": "00:00:00.000", "out": "03:59:59.983"})
-            ET.SubElement(producer, "property", name="length").text = "04:00:00.000"
-            ET.SubElement(producer, "property", name="eof").text = "pause"
-            ET.SubElement(producer, "property", name="resource").text = marker_picture.replace("\\", "/")  # Ensure correct slashes
-            ET.SubElement(producer, "property", name="ttl").text = "1"
-            ET.SubElement(producer, "property", name="aspect_ratio").text = "1"
-            ET.SubElement(producer, "property", name="meta.media.progressive").text = "1"
-            ET.SubElement(producer, "property", name="seekable").text = "1"
-            ET.SubElement(producer, "property", name="format").text = "2"
-            ET.SubElement(producer, "property", name="meta.media.width").text = "1920"
-            ET.SubElement(producer, "property", name="meta.media.height").text = "1080"
-            ET.SubElement(producer, "property", name="mlt_service").text = "qimage"
-            ET.SubElement(producer, "property", name="creation_time").text = creation_time
-            ET.SubElement(producer, "property", name="shotcut:hash").text = unique_hash
-            ET.SubElement(producer, "property", name="shotcut:caption").text = os.path.basename(marker_picture)
-
-            # Add the producer element before the last </mlt> or </playlist>
-            playlist = root.find(".//playlist[last()]")
-            if playlist is not None:
-                root.insert(list(root).index(playlist) + 1, producer)
-
-        # Serialize the updated XML back to a string
-        pretty_string = prettify_xml_with_no_extra_lines(root)
-
-        # Load the updated content into the Output Preview
-        self.load_output_preview(pretty_string)
- 
+        self.apply_edit("Add Producer", add_marker_producers, self.markers, self.get_producer_template())
 
     def add_transitions(self):
         """
         Adds necessary transitions before the `</tractor>` tag, ensuring proper sequencing
-        and adding only missing transitions starting from the lowest available ID.
+        and adding only missing transitions with fresh IDs.
         """
-        # Determine the base content (from output preview or original file)
-        existing_output_content = self.output_mlt_text.get("1.0", tk.END).strip()
-        if existing_output_content:
-            content = existing_output_content
-        else:
+        # Add every transition Shotcut expects for the tracks that is still missing
+        self.apply_edit("Add Transitions", add_missing_transitions)
+
+    def get_output_root(self, parse=True):
+        """
+        Return the document edited by the builder buttons. On first use it is taken from
+        the workspace if an earlier window left it there, otherwise the .mlt file is parsed.
+        """
+        if self.output_root is None:
             mlt_file = self.config.get("shortcut", None)
             if not mlt_file or not os.path.exists(mlt_file):
-                print("Error: No valid .mlt file found in config.")
-                return
-            with open(mlt_file, "r", encoding="utf-8") as file:
-                content = file.read()
-
-        # Parse the XML content
-        try:
-            root = ET.fromstring(content)
-        except ET.ParseError as e:
-            print(f"Error parsing XML: {e}")
-            return
-
-        # Locate the tractor element
-        tractor = root.find(".//tractor")
-        if tractor is None:
-            print("No <tractor> element found in the XML.")
-            return
-
-        # Extract existing transition IDs
-        existing_transition_ids = {
-            int(trans.get("id").replace("transition", ""))
-            for trans in tractor.findall("transition")
-            if trans.get("id", "").startswith("transition") and trans.get("id").replace("transition", "").isdigit()
-        }
-
-        # Find the lowest available transition ID
-        next_transition_id = 1
-        while next_transition_id in existing_transition_ids:
-            next_transition_id += 1
-
-        # Define the necessary transitions
-        required_transitions = [
-            {"a_track": "0", "b_track": "4", "mlt_service": "mix", "always_active": "1", "sum": "1"},
-            {"a_track": "1", "b_track": "4", "mlt_service": "frei0r.cairoblend", "version": "0.1", "threads": "0", "disable": "0"},
-        ]
-
-        # Generate missing transitions
-        for transition in required_transitions:
-            # Check if a similar transition exists
-            transition_exists = any(
-                all(
-                    prop.get("name") == key and prop.text == value
-                    for prop in trans.findall("property")
-                    for key, value in transition.items()
-                    if key not in {"a_track", "b_track"}
-                )
-                for trans in tractor.findall("transition")
-                if trans.find("property[@name='a_track']") is not None and
-                trans.find("property[@name='b_track']") is not None and
-                trans.find("property[@name='a_track']").text == transition["a_track"] and
-                trans.find("property[@name='b_track']").text == transition["b_track"]
-            )
-            if not transition_exists:
-                # Add the new transition with the next available ID
-                new_transition_id = f"transition{next_transition_id}"
-                new_transition = ET.SubElement(tractor, "transition", id=new_transition_id)
-                for key, value in transition.items():
-                    ET.SubElement(new_transition, "property", name=key).text = value
-                next_transition_id += 1  # Increment the transition ID for the next one
-
-        # Serialize back to string and load into the output preview
-        pretty_string = prettify_xml_with_no_extra_lines(root)
-        self.load_output_preview(pretty_string)
-        print(f"Transitions added successfully.")
+                if parse:
+                    log.error("No valid .mlt file found in config.")
+                return None
+            kept = self.workspace.take_document(mlt_file) if self.workspace is not None else None
+            if kept is not None:
+                self.output_root, self.history, self.document_stamp = kept
+                return self.output_root
+            if not parse:
+                return None
+            self.document_stamp = stat_key(mlt_file)
+            try:
+                self.output_root = ET.parse(mlt_file).getroot()
+            except ET.ParseError as e:
+                log.error("Error parsing XML: %s", e)
+                return None
+            self.history = EditHistory(self.output_root)
+        return self.output_root
+
+    def apply_edit(self, label, operation, *args):
+        """
+        Run a builder function on the output document in the background, record it for
+        undo and refresh the preview.
 
+        Returns:
+            Task: The queued edit.
+        """
+        def edit():
+            if self.get_output_root() is None:
+                return None
+            self.history.record(label, operation, *args)
+            return prettify_xml_with_no_extra_lines(self.output_root)
+
+        return self.submit_edit(label, edit)
+
+    def undo_edit(self, event=None):
+        def undo():
+            label = self.history.undo() if self.history else None
+            if label is None:
+                log.info("Nothing to undo.")
+                return None
+            log.info("Undid %s.", label)
+            return prettify_xml_with_no_extra_lines(self.output_root)
+
+        self.submit_edit("Undo", undo)
+
+    def redo_edit(self, event=None):
+        def redo():
+            label = self.history.redo() if self.history else None
+            if label is None:
+                log.info("Nothing to redo.")
+                return None
+            log.info("Redid %s.", label)
+            return prettify_xml_with_no_extra_lines(self.output_root)
+
+        self.submit_edit("Redo", redo)
+
+    def submit_edit(self, label, edit):
+        """
+        Queue a function that edits output_root and returns the serialized document.
+        Edits share one group, so they run in order and never overlap.
+        """
+        return self.scheduler.submit(edit, name=label, priority=HIGH, group=self.edit_group, on_done=self.show_output_text)
 
+    @watchdog.track()
+    def show_output_text(self, output_content):
+        if output_content is not None and self.window.winfo_exists():
+            self.load_output_preview(output_content)
 
+    def refresh_output_preview(self):
+        """Serialize the output document in the background and load it into the Output Preview."""
+        self.submit_edit("Refresh Preview", lambda: prettify_xml_with_no_extra_lines(self.output_root))
 
     def prettify_xml_with_no_extra_lines(element):
         """Prettify XML while removing extra blank lines."""
@@ -510,6 +381,10 @@ class ExportManager:
         ttk.Button(left_button_frame, text="Add Producer", bootstyle="secondary", command=self.add_producer).pack(side="left", expand=True, padx=5)
         ttk.Button(left_button_frame, text="Add Playlists", bootstyle="primary", command=self.add_playlists).pack(side="left", expand=True, padx=5)
         ttk.Button(left_button_frame, text="Add Transitions", bootstyle="warning", command=self.add_transitions).pack(side="left", expand=True, padx=5)
+        ttk.Button(left_button_frame, text="Undo", bootstyle="secondary-outline", command=self.undo_edit).pack(side="left", expand=True, padx=5)
+        ttk.Button(left_button_frame, text="Redo", bootstyle="secondary-outline", command=self.redo_edit).pack(side="left", expand=True, padx=5)
+        self.window.bind("<Control-z>", self.undo_edit)
+        self.window.bind("<Control-y>", self.redo_edit)
 
         # Button frame for the right side
         right_button_frame = ttk.Frame(right_frame)
@@ -519,29 +394,83 @@ class ExportManager:
         ttk.Button(right_button_frame, text="Highlight Differences", bootstyle="info", command=self.highlight_differences).pack(side="left", expand=True, padx=5)
         ttk.Button(right_button_frame, text="Button 5", bootstyle="danger", command=lambda: self.show_message("I'm here from Button 5")).pack(side="left", expand=True, padx=5)
         ttk.Button(right_button_frame, text="Export", bootstyle="success", command=self.export_output).pack(side="left", expand=True, padx=5)
+        ttk.Button(right_button_frame, text="Render", bootstyle="primary", command=self.render_export).pack(side="left", expand=True, padx=5)
+        ttk.Button(right_button_frame, text="History", bootstyle="secondary", command=self.open_export_history).pack(side="left", expand=True, padx=5)
 
     def show_message(self, message):
         """Display a simple message box."""
         messagebox.showinfo(title="Message", message=message)
 
     def load_current_mlt(self):
-        """Load the content of the current .mlt file into the left panel."""
+        """Load the current .mlt file into the left panel, memory-mapped and indexed in the background."""
         mlt_file = self.config.get("shortcut", None)
         if not mlt_file or not os.path.exists(mlt_file):
-            self.current_mlt_text.insert("1.0", "Error: No valid .mlt file found in config.")
+            self.current_viewer.load_document(LineDocument.from_text("Error: No valid .mlt file found in config."))
             return
 
-        with open(mlt_file, "r", encoding="utf-8") as file:
-            content = file.read()
-
-        self.current_mlt_text.delete("1.0", ttk.END)
-        self.current_mlt_text.insert("1.0", content)
+        self.scheduler.cancel_all("Load .mlt File")
+        self.scheduler.submit(
+            LineDocument.from_file, mlt_file,
+            snapshot=True,  # A private copy: Shotcut may rewrite the project while it is shown
+            name="Load .mlt File", priority=HIGH,
+            on_done=self.show_current_document,
+            on_error=lambda e: log.error("Error loading %s: %s", mlt_file, e),
+        )
+
+    @watchdog.track()
+    def show_current_document(self, document):
+        if self.window.winfo_exists():
+            self.current_viewer.load_document(document)
+        else:
+            document.close()
 
     def load_output_preview(self, output_content):
         """Load simulated output content into the right panel."""
-        self.output_mlt_text.delete("1.0", ttk.END)
-        self.output_mlt_text.insert("1.0", output_content)
+        self.output_viewer.load_document(LineDocument.from_text(output_content), keep_position=True)
+
+    def get_output_content(self):
+        """Return the output preview content, or an empty string before anything was generated."""
+        document = self.output_viewer.current_document()
+        return document.text().strip() if document is not None else ""
+
+    def get_producer_template(self):
+        """
+        Return the producer template chosen in config.json ("producer_template"), looking
+        in the user template file ("producer_template_file") first. Falls back to qimage if
+        the template cannot be loaded or uses a slot that no marker field fills.
+        """
+        try:
+            return get_template(self.config.get("producer_template", "qimage"), self.config.get("producer_template_file"))
+        except (OSError, ET.ParseError, ValueError) as e:
+            log.error("Could not load producer template: %s. Using qimage.", e)
+            return get_template("qimage")
+
+    def get_render_queue(self):
+        """Create the render queue from config.json on first use and start its dispatcher."""
+        if self.render_queue is None:
+            self.render_queue = RenderQueue(
+                state_file=self.config.get("render_queue_file", "render_queue.json"),
+                melt_path=self.config.get("melt_path", "melt"),
+                max_concurrent=self.config.get("render_concurrency", 2),
+            )
+        self.render_queue.start()
+        return self.render_queue
+
+    def render_export(self):
+        """Queue the exported project for rendering with melt and show the render queue."""
+        from gui.render_queue_window import RenderQueueWindow
+
+        export_folder = self.config.get("export_folder", None)
+        export_file_path = os.path.join(export_folder, "exported_file.mlt") if export_folder else None
+        if not export_file_path or not os.path.exists(export_file_path):
+            messagebox.showerror("Render Error", "Export the project before rendering it.")
+            return
+
+        render_queue = self.get_render_queue()
+        render_queue.add(export_file_path)
+        RenderQueueWindow(self.window, render_queue)
 
+    @watchdog.track()
     def export_output(self):
         """Export the output preview content to the export folder."""
         export_folder = self.config.get("export_folder", None)
@@ -550,28 +479,70 @@ class ExportManager:
             return
 
         # Get the content of the output preview
-        output_content = self.output_mlt_text.get("1.0", ttk.END).strip()
+        output_content = self.get_output_content()
         if not output_content:
             messagebox.showerror("Export Error", "Output content is empty.")
             return
 
-        # Define the export file path
+        # Parse and validate in the background, ask on the Tk thread, then write in the background
+        mlt_file = self.config.get("shortcut", None)
         export_file_path = os.path.join(export_folder, "exported_file.mlt")
-        try:
-            with open(export_file_path, "w", encoding="utf-8") as file:
-                file.write(output_content)
-            messagebox.showinfo("Export Successful", f"File successfully exported to:\n{export_file_path}")
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export the file:\n{e}")
-            
-def prettify_xml_with_no_extra_lines(element):
-        """Prettify XML and remove unnecessary blank lines."""
-        rough_string = ET.tostring(element, encoding="utf-8")
-        pretty_string = minidom.parseString(rough_string).toprettyxml(indent="  ")
-        # Remove extra blank lines
-        lines = [line for line in pretty_string.splitlines() if line.strip()]
-        return "\n".join(lines)
 
+        def validate():
+            output_root = ET.fromstring(output_content)
+            base_dir = os.path.dirname(mlt_file) if mlt_file else None
+            return output_root, validate_project(output_root, base_dir)
+
+        def confirm(result):
+            output_root, diagnostics = result
+            if diagnostics:
+                report = format_diagnostics(diagnostics[:20])
+                if not messagebox.askyesno("Export Validation", f"{len(diagnostics)} problem(s) found:\n{report}\n\nExport anyway?"):
+                    return
+            self.scheduler.submit(
+                self.write_export, output_root, output_content, mlt_file, export_file_path,
+                name="Export", priority=HIGH, group="export",
+                on_done=lambda _: messagebox.showinfo("Export Successful", f"File successfully exported to:\n{export_file_path}"),
+                on_error=lambda e: messagebox.showerror("Export Error", f"Failed to export the file:\n{e}"),
+            )
+
+        def validation_failed(error):
+            if isinstance(error, ET.ParseError):
+                messagebox.showerror("Export Error", f"Output content is not valid XML:\n{error}")
+            else:
+                messagebox.showerror("Export Error", f"Failed to validate the output:\n{error}")
+
+        # Validate references, resources and the timeline before writing anything
+        self.scheduler.submit(validate, name="Validate Export", priority=HIGH, on_done=confirm, on_error=validation_failed)
+
+    def write_export(self, output_root, output_content, mlt_file, export_file_path):
+        """Write the export file and add it to the export history. Runs on a worker thread."""
+        # "splice" keeps the original bytes and only inserts the new elements; "full" writes the preview text
+        written = False
+        if self.config.get("export_mode", "splice") == "splice" and mlt_file and os.path.exists(mlt_file):
+            try:
+                spliced = splice_export(mlt_file, output_root, export_file_path)
+                log.info("Spliced %d new elements into the original file.", spliced)
+                written = True
+            except SpliceError as e:
+                log.warning("%s. Writing the full output instead.", e)
+        if not written:
+            atomic_write(export_file_path, [output_content.encode("utf-8")])
+
+        # Every export is kept, deduplicated against the earlier ones; a failure here never fails the export
+        if self.config.get("export_history", True):
+            try:
+                self.export_history.record(export_file_path, source=mlt_file)
+                self.export_history.prune(int(self.config.get("export_history_keep", 100)))
+            except (OSError, ValueError) as e:
+                log.warning("Could not record the export in the history: %s", e)
+
+    def open_export_history(self):
+        """Show the recorded exports of the current project."""
+        from gui.export_history_window import ExportHistoryWindow
+
+        ExportHistoryWindow(self.window, self.export_history, self.scheduler, source=self.config.get("shortcut"))
+            
 if __name__ == "__main__":
     # For testing purposes only
     app = ttk.Window(themename="flatly")
@@ -0,0 +1,52 @@
+import math
+import os
+import tkinter as tk
+from tkinter import ttk
+from PIL import Image, ImageTk
+from Services.decode_pool import composite_tiles
+
+
+class GridPreviewWindow:
+    """
+    Plays several videos side by side.
+
+    Every tile is decoded by the shared DecodePool at its tile size; a single
+    presenter on the Tk thread composites the latest frames into one image per tick.
+    """
+
+    def __init__(self, parent, video_paths, decode_pool, tile_size=(320, 180), tick_fps=15):
+        self.decode_pool = decode_pool
+        self.tile_size = tile_size
+        self.tick_ms = int(1000 / tick_fps)
+        self.columns = max(1, math.ceil(math.sqrt(len(video_paths))))
+        self.streams = [decode_pool.open(path, tile_size, tick_fps) for path in video_paths]
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Grid Preview ({len(video_paths)} videos)")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.canvas_label = ttk.Label(self.window)
+        self.canvas_label.pack(fill="both", expand=True)
+
+        names = "  |  ".join(os.path.basename(path) for path in video_paths)
+        ttk.Label(self.window, text=names, anchor="w").pack(fill="x", padx=5, pady=2)
+
+        self.running = True
+        self.present()
+
+    def present(self):
+        """Composite the newest frame of every tile into one image and schedule the next tick."""
+        if not self.running:
+            return
+        frames = [self.decode_pool.poll(stream) for stream in self.streams]
+        canvas = composite_tiles(frames, self.columns, self.tile_size)
+        photo = ImageTk.PhotoImage(image=Image.fromarray(canvas))
+        self.canvas_label.config(image=photo)
+        self.canvas_label.image = photo
+        self.window.after(self.tick_ms, self.present)
+
+    def close(self):
+        self.running = False
+        for stream in self.streams:
+            self.decode_pool.close(stream)
+        self.window.destroy()
@@ -0,0 +1,147 @@
+import json
+import logging
+import time
+import ttkbootstrap as ttk
+from tkinter import filedialog
+import tkinter as tk
+from Services.app_logging import get_logger
+
+log = get_logger(__name__)
+
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+class LogWindow:
+    """Window showing the newest log messages from the in-memory ring buffer."""
+
+    def __init__(self, parent, logging_setup, max_rows=2000):
+        """
+        Args:
+            parent: Parent window.
+            logging_setup (LoggingSetup): The application's logging pipeline.
+            max_rows (int): Rows kept in the list; older ones are dropped.
+        """
+        self.logging_setup = logging_setup
+        self.ring_buffer = logging_setup.ring_buffer
+        self.max_rows = max_rows
+        self.sequence = 0  # Newest entry shown
+        self.entries = {}  # Tree item -> entry
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Log")
+        self.window.geometry("1000x600")
+
+        filter_frame = ttk.Frame(self.window)
+        filter_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(filter_frame, text="Level").pack(side="left")
+        level = logging_setup.level if isinstance(logging_setup.level, str) else logging.getLevelName(logging_setup.level)
+        self.level_var = tk.StringVar(value=level)
+        level_box = ttk.Combobox(filter_frame, textvariable=self.level_var, values=LEVELS, state="readonly", width=10)
+        level_box.pack(side="left", padx=5)
+        level_box.bind("<<ComboboxSelected>>", self.change_level)
+        ttk.Label(filter_frame, text="Search").pack(side="left", padx=(15, 0))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=40)
+        search_entry.pack(side="left", padx=5)
+        search_entry.bind("<Return>", lambda event: self.reload())
+        self.follow_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filter_frame, text="Follow", variable=self.follow_var).pack(side="left", padx=15)
+
+        self.tree = ttk.Treeview(self.window, columns=("Time", "Level", "Logger", "Message"), show="headings")
+        for name, width in (("Time", 90), ("Level", 70), ("Logger", 200), ("Message", 620)):
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width, anchor="w", stretch=name == "Message")
+        self.tree.tag_configure("WARNING", foreground="#b36b00")
+        self.tree.tag_configure("ERROR", foreground="#c0392b")
+        self.tree.tag_configure("CRITICAL", foreground="#c0392b")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree.bind("<<TreeviewSelect>>", self.show_details)
+
+        # Call site, structured fields and rate-limit count of the selected message
+        self.details_text = tk.Text(self.window, height=5, wrap="word", font=("Courier", 9))
+        self.details_text.pack(fill="x", padx=10, pady=5)
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        ttk.Button(button_frame, text="Save", bootstyle="primary", command=self.save).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Clear", bootstyle="secondary", command=self.clear).pack(side="left", expand=True, padx=5)
+
+        self.refresh()
+
+    def visible(self, entry):
+        if entry["levelno"] < logging.getLevelName(self.level_var.get()):
+            return False
+        search = self.search_var.get().lower()
+        return not search or search in entry["message"].lower() or search in entry["logger"].lower()
+
+    def add_rows(self, entries):
+        for entry in entries:
+            self.sequence = entry["sequence"]
+            if not self.visible(entry):
+                continue
+            message = entry["message"]
+            if entry["suppressed"]:
+                message += f" [{entry['suppressed']} similar messages suppressed]"
+            item = self.tree.insert(
+                "", "end",
+                values=(time.strftime("%H:%M:%S", time.localtime(entry["time"])), entry["level"], entry["logger"], message),
+                tags=(entry["level"],),
+            )
+            self.entries[item] = entry
+        children = self.tree.get_children()
+        if len(children) > self.max_rows:
+            stale = children[:len(children) - self.max_rows]
+            self.tree.delete(*stale)
+            for item in stale:
+                del self.entries[item]
+        if entries and self.follow_var.get() and self.tree.get_children():
+            self.tree.see(self.tree.get_children()[-1])
+
+    def refresh(self):
+        """Append the messages logged since the last look, twice a second while the window is open."""
+        if not self.window.winfo_exists():
+            return
+        self.add_rows(self.ring_buffer.since(self.sequence))
+        self.window.after(500, self.refresh)
+
+    def reload(self):
+        self.tree.delete(*self.tree.get_children())
+        self.entries = {}
+        self.sequence = 0
+        self.add_rows(self.ring_buffer.since(0))
+
+    def change_level(self, event=None):
+        """The chosen level is both recorded from now on and the lowest level shown."""
+        self.logging_setup.set_level(self.level_var.get())
+        self.reload()
+
+    def show_details(self, event=None):
+        selection = self.tree.selection()
+        self.details_text.delete("1.0", "end")
+        if not selection:
+            return
+        entry = self.entries[selection[0]]
+        lines = [f"{entry['logger']} ({entry['site']})", entry["message"]]
+        if entry["fields"]:
+            lines.append(json.dumps(entry["fields"], default=str))
+        if entry["suppressed"]:
+            lines.append(f"{entry['suppressed']} similar messages were suppressed before this one.")
+        self.details_text.insert("1.0", "\n".join(lines))
+
+    def save(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Save Log",
+            defaultextension=".jsonl",
+            filetypes=[("JSON lines", "*.jsonl")],
+            parent=self.window,
+        )
+        if not file_path:
+            return
+        with open(file_path, "w", encoding="utf-8") as file:
+            for entry in self.ring_buffer.since(0):
+                file.write(json.dumps(entry, default=str) + "\n")
+        log.info("Log saved to %s", file_path)
+
+    def clear(self):
+        self.ring_buffer.clear()
+        self.reload()
@@ -1,16 +1,36 @@
 import json
 import os
-import cv2
+import time
 from PIL import Image, ImageTk  # For displaying images
 from tkinter import ttk, filedialog
 import tkinter as tk
-from threading import Thread  # To handle video playback without freezing the GUI
+from Services.app_logging import get_logger, logging_setup
+from Services.asset_index import AssetIndex
 from Services.file_loader import FileLoader
+from Services.file_watcher import FileWatcher, stat_key
+from Services.image_hash import ImageHashIndex
+from Services.lag_watchdog import watchdog
 from Services.media_handler import MediaHandler
-from gui.components import ImageViewer, VideoPlayer
+from Services.startup_profiler import lazy_import
+from Services.decode_pool import DecodePool
+from Services.marker_index import MarkerIndex
+from Services.marker_io import read_markers, write_markers
+from Services.marker_merge import merge_markers
+from Services.project_workspace import ProjectWorkspace
+from Services.proxy_cache import ProxyCache
+from Services.sprite_sheet import SpriteSheetBuilder
+from Services.task_scheduler import HIGH, LOW, QUEUED, RUNNING, TaskScheduler
 from resources.styles import BACKGROUND_COLOR
-from gui.export_manager import ExportManager
-from gui.settings_window import SettingsWindow
+
+log = get_logger(__name__)
+
+MARKER_FILE_TYPES = [
+    ("Marker lists", "*.csv *.jsonl *.edl"),
+    ("CSV", "*.csv"),
+    ("JSON Lines", "*.jsonl"),
+    ("CMX3600 EDL", "*.edl"),
+    ("Shotcut project", "*.mlt"),
+]
 
 
 
@@ -50,11 +70,66 @@ class MainWindow:
         self.file_loader = FileLoader()
         self.media_handler = MediaHandler()
 
+        # Low-resolution preview copies of loaded and marker-assigned videos
+        self.proxy_cache = ProxyCache(
+            cache_dir=self.last_opened_files.get("proxy_folder", "proxies"),
+            max_bytes=int(self.last_opened_files.get("proxy_cache_mb", 2048)) * 1024 * 1024,
+        )
+
+        # Bounded decoder threads shared by all tiles of the grid preview
+        self.decode_pool = DecodePool()
+
+        # Background work of this window and its child windows; results are applied from the Tk loop
+        self.scheduler = TaskScheduler(on_change=self.show_task_status)
+        self.scheduler.attach(self.root)
+
+        # Heartbeat that measures how long the event loop is blocked
+        watchdog.interval_ms = int(self.last_opened_files.get("watchdog_interval_ms", 50))
+        watchdog.stall_ms = int(self.last_opened_files.get("watchdog_stall_ms", 200))
+        watchdog.sample_stacks = bool(self.last_opened_files.get("watchdog_stack_samples", False))
+        watchdog.start(self.root)
+
+        # Log level, rate limit and optional log file; main.py command-line options are applied afterwards
+        logging_setup.configure(
+            level=self.last_opened_files.get("log_level"),
+            log_file=self.last_opened_files.get("log_file"),
+            rate=self.last_opened_files.get("log_rate"),
+            burst=self.last_opened_files.get("log_burst"),
+        )
+
+        # Watches the project and asset folders; changes are applied from the Tk loop
+        self.file_watcher = FileWatcher(debounce=float(self.last_opened_files.get("watch_debounce", 0.5)))
+        self.asset_indexes = {}  # Asset folder -> AssetIndex kept up to date by the watcher
+        self.image_hash_index = None  # Perceptual hashes of asset pictures, loaded on first use
+        self.export_managers = []
+
+        # Recently used projects kept open (markers with assignments, Export Manager documents)
+        self.workspace = ProjectWorkspace(
+            max_bytes=int(self.last_opened_files.get("workspace_cache_mb", 256)) * 1024 * 1024,
+            max_projects=int(self.last_opened_files.get("workspace_projects", 8)),
+        )
+
         # Variables for video playback
-        self.video_thread = None
-        self.stop_video_flag = False
+        self.video_task = None  # Background task decoding the playing video
         self.pause_video_flag = False
+        self.video_size = (1, 1)  # Size of the video panel, read by the decoding task
+        self.latest_video_frame = None  # Newest decoded frame
+        self.video_frame_posted = False  # A call to show it is queued for the Tk thread
         self.current_video_path = None
+        self.playhead_seconds = 0.0  # Last decoded video position, used for marker lookup
+        self.seek_request = None  # Position in seconds the playback loop should jump to
+        self.active_marker = None  # Position in self.markers of the highlighted marker
+
+        # Markers and their time index (filled by auto_load_markers/load_shotcut)
+        self.markers = []
+        self.marker_items = []
+        self.marker_index = MarkerIndex(self.markers)
+
+        # Picture thumbnails for the marker rows, cut from cached sprite sheets
+        self.sprite_builder = SpriteSheetBuilder(cache_dir=self.last_opened_files.get("thumbnail_folder", "thumbnails"))
+        self.thumbnail_atlases = []
+        self.thumbnail_images = {}
+        self.thumbnail_generation = 0
 
         # Create frames
         self.image_frame = ttk.Frame(self.root, style="Blue.TFrame")
@@ -78,6 +153,7 @@ class MainWindow:
         style.configure("Blue.TFrame", background=BACKGROUND_COLOR)
         style.configure("Blue.TLabel", background=BACKGROUND_COLOR)
         style.configure("Blue.TButton", background=BACKGROUND_COLOR)
+        style.configure("Marker.Treeview", rowheight=self.sprite_builder.thumb_size + 4)
 
         # Image controls
         self.image_control_frame = ttk.Frame(self.image_frame, style="Blue.TLabel")
@@ -124,6 +200,10 @@ class MainWindow:
         self.pause_button.pack(side="left", padx=5)
         self.stop_button = ttk.Button(self.video_control_frame, text="Stop", command=self.stop_video_controls, style="Blue.TButton")
         self.stop_button.pack(side="left", padx=5)
+        self.previous_marker_button = ttk.Button(self.video_control_frame, text="Prev Marker", command=self.jump_to_previous_marker, style="Blue.TButton")
+        self.previous_marker_button.pack(side="left", padx=5)
+        self.next_marker_button = ttk.Button(self.video_control_frame, text="Next Marker", command=self.jump_to_next_marker, style="Blue.TButton")
+        self.next_marker_button.pack(side="left", padx=5)
 
         video_file = self.last_opened_files.get("video")
         if video_file and os.path.exists(video_file):
@@ -135,6 +215,7 @@ class MainWindow:
                 style="Blue.TLabel"
             )
             self.current_video_path = video_file  # Ensure current_video_path is set
+            self.root.after(1000, self.proxy_cache.request, video_file)  # Keep OpenCV out of the cold start
         else:
             self.video_label_widget = ttk.Label(
                 self.video_display_frame, 
@@ -145,8 +226,17 @@ class MainWindow:
         self.video_label_widget.pack(fill="both", expand=True)
 
         # Marker tree
-        self.file_label = ttk.Label(self.text_frame, text="File: No file loaded", font=("Arial", 12, "bold"), anchor="w")
-        self.file_label.pack(fill="x", padx=5, pady=5)
+        project_frame = ttk.Frame(self.text_frame)
+        project_frame.pack(fill="x", padx=5, pady=5)
+        self.file_label = ttk.Label(project_frame, text="File: No file loaded", font=("Arial", 12, "bold"), anchor="w")
+        self.file_label.pack(side="left", fill="x", expand=True)
+
+        # Switch between recently used projects
+        self.project_var = tk.StringVar()
+        self.project_switcher = ttk.Combobox(project_frame, textvariable=self.project_var, state="readonly", width=40)
+        self.project_switcher.pack(side="right")
+        self.project_switcher.bind("<<ComboboxSelected>>", self.switch_project)
+        self.update_project_switcher()
 
         grid_frame = ttk.Frame(self.text_frame)
         grid_frame.pack(fill="both", expand=True)
@@ -157,10 +247,13 @@ class MainWindow:
         self.marker_tree = ttk.Treeview(
             grid_frame,
             columns=("Number", "Name", "Time", "Picture", "Video"),
-            show="headings",
+            show="tree headings",  # The tree column holds the picture thumbnail
             selectmode="browse",
+            style="Marker.Treeview",
             yscrollcommand=self.scrollbar.set
         )
+        self.marker_tree.heading("#0", text="")
+        self.marker_tree.column("#0", width=self.sprite_builder.thumb_size + 16, stretch=False)
         self.marker_tree.heading("Number", text="Nr.")
         self.marker_tree.heading("Name", text="Name")
         self.marker_tree.heading("Time", text="Time")
@@ -203,17 +296,92 @@ class MainWindow:
 
         self.auto_images_button.pack(pady=5)
         self.auto_videos_button.pack(pady=5)
+
+        self.grid_preview_button = ttk.Button(self.controls_frame, text="Grid Preview", command=self.open_grid_preview)
+        self.grid_preview_button.pack(pady=5)
+
+        self.duplicates_button = ttk.Button(self.controls_frame, text="Find Duplicates", command=self.find_duplicate_images)
+        self.duplicates_button.pack(pady=5)
+
+        self.diagnostics_button = ttk.Button(self.controls_frame, text="Diagnostics", command=self.open_diagnostics)
+        self.diagnostics_button.pack(pady=5)
+
+        self.log_button = ttk.Button(self.controls_frame, text="Log", command=self.open_log)
+        self.log_button.pack(pady=5)
+
+        # Name and progress of the running background tasks
+        self.task_status_label = ttk.Label(self.controls_frame, text="", style="Blue.TLabel")
+        self.task_status_label.pack(pady=5)
+
+        self.import_markers_button = ttk.Button(self.controls_frame, text="Import Markers", command=self.import_markers)
+        self.export_markers_button = ttk.Button(self.controls_frame, text="Export Markers", command=self.export_markers)
+
+        self.import_markers_button.pack(pady=5)
+        self.export_markers_button.pack(pady=5)
+
+        # Reload the project and asset indexes when they change on disk
+        self.start_file_watcher()
         
     def on_close(self):
+            watchdog.stop()
+            lag_report = self.last_opened_files.get("lag_report")
+            if lag_report:
+                watchdog.write(lag_report)
+            self.scheduler.shutdown()
+            self.file_watcher.stop()
+            self.proxy_cache.shutdown()
+            self.sprite_builder.shutdown()
+            self.decode_pool.shutdown()
+            # Export Managers see the stopped scheduler and hand their document back directly
             for window in self.child_windows:
                 if window.winfo_exists():  # Check if the window is still open
                     window.destroy()
             self.root.destroy()
 
+    def open_diagnostics(self):
+        """
+        Show event-loop lag statistics and the recent stalls.
+        """
+        from gui.diagnostics_window import DiagnosticsWindow
+        diagnostics_window = DiagnosticsWindow(self.root, watchdog)
+        self.child_windows.append(diagnostics_window.window)
+
+    def open_log(self):
+        """
+        Show the recent log messages.
+        """
+        from gui.log_window import LogWindow
+        log_window = LogWindow(self.root, logging_setup)
+        self.child_windows.append(log_window.window)
+
+    def open_grid_preview(self):
+        """
+        Play the videos assigned to markers side by side, using proxies where available.
+        """
+        from gui.grid_preview import GridPreviewWindow
+
+        max_tiles = int(self.last_opened_files.get("grid_preview_max", 9))
+        video_paths = []
+        for marker in self.markers:
+            video = marker.get("Video")
+            if video and video not in video_paths and os.path.exists(video):
+                video_paths.append(video)
+            if len(video_paths) >= max_tiles:
+                break
+
+        if not video_paths:
+            log.info("No marker videos assigned to preview.")
+            return
+
+        sources = [self.proxy_cache.proxy_path(path) or path for path in video_paths]
+        grid_window = GridPreviewWindow(self.root, sources, self.decode_pool)
+        self.child_windows.append(grid_window.window)
+
     def start_export_manager(self):
         from gui.export_manager import ExportManager
-        export_window = ExportManager(self.root, self.markers)
+        export_window = ExportManager(self.root, self.markers, self.scheduler, self.workspace)
         self.child_windows.append(export_window.window)
+        self.export_managers.append(export_window)
 
     def auto_assign_images(self):
         """
@@ -230,7 +398,7 @@ class MainWindow:
         """
         Wrapper for auto-assigning videos to markers by searching recursively in a folder.
         """
-        print("Starting Auto Videos Debugging...")
+        log.debug("Starting Auto Videos Debugging...")
         self.auto_assign_files(
             file_types=[".mp4", ".avi", ".mkv", ".mov"],
             column_index=4,  # Video column index
@@ -255,10 +423,10 @@ class MainWindow:
                 self.image_label_widget.config(image=photo, text="")
                 self.image_label_widget.image = photo
             else:
-                print(f"Image file not found: {file_path}")
+                log.warning("Image file not found: %s", file_path)
                 self.image_label_widget.config(image="", text="No image loaded")
         else:
-            print("No image loaded to show.")
+            log.info("No image loaded to show.")
             self.image_label_widget.config(image="", text="No image loaded")
 
     def hide_image(self):
@@ -297,8 +465,9 @@ class MainWindow:
                 # Update the corresponding entry in self.markers
                 selected_index = self.marker_tree.index(selected_item)
                 self.markers[selected_index]["Picture"] = full_image_path  # Store the full path
+                self.refresh_marker_thumbnails()
             else:
-                print("No image loaded to add.")
+                log.info("No image loaded to add.")
 
 
     def add_video_to_marker(self):
@@ -321,10 +490,12 @@ class MainWindow:
                 # Update the corresponding entry in self.markers
                 selected_index = self.marker_tree.index(selected_item)
                 self.markers[selected_index]["Video"] = full_video_path  # Store the full path
+                self.proxy_cache.request(full_video_path)
             else:
-                print("No video loaded to add.")
+                log.info("No video loaded to add.")
 
     
+    @watchdog.track()
     def auto_assign_files(self, file_types, column_index, file_key, dialog_title):
         """
         Generalized function to assign files (images/videos) to markers by searching recursively in a folder.
@@ -335,50 +506,125 @@ class MainWindow:
         - file_key (str): Key in `self.markers` to update (e.g., "Picture" or "Video").
         - dialog_title (str): Title for the file dialog (e.g., "Select Folder Containing Images").
         """
-        print(f"Starting recursive auto-assign for {file_key}...")
+        log.info("Starting recursive auto-assign for %s...", file_key)
         folder = filedialog.askdirectory(title=dialog_title)
         if not folder:
-            print(f"No folder selected. Exiting auto-assign for {file_key}.")
+            log.info("No folder selected. Exiting auto-assign for %s.", file_key)
             return
 
-        print(f"Selected folder: {folder}")
+        log.debug("Selected folder: %s", folder)
+        markers = self.markers
+
+        def matched(matches):
+            if file_key == "Picture" and self.last_opened_files.get("prefer_canonical_images", False):
+                # Re-saved copies of one picture all resolve to the same file, so they share a producer
+                self.with_image_hashes(
+                    folder,
+                    lambda index: {position: index.canonical_for(path, self.duplicate_distance(), within=folder) for position, path in matches.items()},
+                    name="Auto-assign Picture",
+                    on_done=lambda canonical: self.apply_file_matches(markers, canonical, column_index, file_key),
+                )
+            else:
+                self.apply_file_matches(markers, matches, column_index, file_key)
+
+        self.with_asset_index(folder, lambda index: index.match_markers(markers, file_types), name=f"Auto-assign {file_key}", on_done=matched)
+
+    @watchdog.track()
+    def apply_file_matches(self, markers, matches, column_index, file_key):
+        """
+        Store the files found by auto_assign_files in the markers and the grid. Runs on the Tk thread.
+        """
+        if markers is not self.markers:
+            log.info("Markers were reloaded; discarding auto-assign results for %s.", file_key)
+            return
+        tree_items = self.marker_tree.get_children()
         for index, marker in enumerate(self.markers):
             marker_name = marker.get("Name", None)
             if not marker_name:
-                print(f"Marker at index {index} is missing a 'Name' field. Skipping...")
+                log.warning("Marker at index %d is missing a 'Name' field. Skipping...", index)
                 continue
 
-            print(f"Checking marker {index} with name '{marker_name}' for matching files...")
-            found = False
-            for root, _, files in os.walk(folder):  # Recursively walk through the folder and subfolders
-                for ext in file_types:
-                    file_name = f"{marker_name.strip()}{ext}"  # Ensure no extra spaces in the file name
-                    for file in files:
-                        if file.lower() == file_name.lower():  # Case-insensitive match
-                            full_file_path = os.path.join(root, file)  # Full path to the file
-
-                            # Update the marker with the full path
-                            marker[file_key] = full_file_path
-
-                            # Update the grid column with the file name only
-                            selected_item = self.marker_tree.get_children()[index]
-                            current_values = list(self.marker_tree.item(selected_item, "values"))
-                            current_values[column_index] = os.path.basename(full_file_path)  # Display only file name
-                            self.marker_tree.item(selected_item, values=current_values)
-
-                            found = True
-                            break
-                    if found:
-                        break
-                if found:
-                    break
+            full_file_path = matches.get(index)
+            if not full_file_path:
+                log.debug("No matching file found for marker '%s'.", marker_name, extra={"marker": marker_name})
+                continue
+
+            # Update the marker with the full path
+            marker[file_key] = full_file_path
+            if file_key == "Video":
+                self.proxy_cache.request(full_file_path)
+
+            # Update the grid column with the file name only
+            selected_item = tree_items[index]
+            current_values = list(self.marker_tree.item(selected_item, "values"))
+            current_values[column_index] = os.path.basename(full_file_path)  # Display only file name
+            self.marker_tree.item(selected_item, values=current_values)
 
-            if not found:
-                print(f"No matching file found for marker '{marker_name}'.")
+        log.info("Completed recursive auto-assign for %s: %d of %d markers matched.", file_key, len(matches), len(self.markers))
+        if file_key == "Picture":
+            self.refresh_marker_thumbnails()
 
-        print(f"Completed recursive auto-assign for {file_key}.")
 
 
+    def duplicate_distance(self):
+        """Largest Hamming distance between picture hashes that counts as a duplicate (config duplicate_distance)."""
+        return int(self.last_opened_files.get("duplicate_distance", 4))
+
+    def with_image_hashes(self, folder, function, name, on_done=None):
+        """
+        Hash the pictures of a folder in the background (cached by path and mtime), then run
+        function(index) in the same task. Tasks share one group, so the index is never used concurrently.
+        """
+        def run(task):
+            if self.image_hash_index is None:
+                self.image_hash_index = ImageHashIndex(cache_file=self.last_opened_files.get("image_hash_cache", "image_hashes.json"))
+            self.image_hash_index.add_folder(folder, progress=lambda done, total: task.report(100.0 * done / total, name))
+            return function(self.image_hash_index)
+
+        return self.scheduler.submit(run, name=name, group="image-hashes", pass_task=True, on_done=on_done)
+
+    def find_duplicate_images(self):
+        """
+        Find re-saved copies of the same picture in a folder and show them grouped.
+        """
+        folder = filedialog.askdirectory(
+            title="Select Folder to Search for Duplicate Pictures",
+            initialdir=self.last_opened_files.get("image_folder") or os.getcwd(),
+        )
+        if not folder:
+            return
+        from gui.duplicates_window import DuplicatesWindow
+
+        def show(groups):
+            if not groups:
+                log.info("No duplicate pictures found in %s.", folder)
+                return
+            window = DuplicatesWindow(self.root, folder, groups, on_use_canonical=self.use_canonical_pictures)
+            self.child_windows.append(window.window)
+
+        self.with_image_hashes(
+            folder,
+            lambda index: index.duplicate_groups(self.duplicate_distance(), within=folder),
+            name="Find duplicates", on_done=show,
+        )
+
+    @watchdog.track()
+    def use_canonical_pictures(self, replacements):
+        """
+        Point markers whose picture is a duplicate at the canonical copy.
+
+        Args:
+            replacements (dict): Duplicate path -> canonical path.
+        """
+        replaced = 0
+        for marker in self.markers:
+            canonical = replacements.get(os.path.abspath(marker.get("Picture") or ""))
+            if canonical:
+                marker["Picture"] = canonical
+                replaced += 1
+        log.info("Replaced %d duplicate pictures with their canonical copy.", replaced)
+        if replaced:
+            self.display_markers()
 
     def load_image(self):
         file_path = self.file_loader.load_image(initialdir=self.last_opened_files.get("image_folder", os.getcwd()))
@@ -400,7 +646,7 @@ class MainWindow:
             self.background_label.config(image=photo)
             self.background_label.image = photo
         except Exception as e:
-            print(f"Error loading image: {e}")
+            log.error("Error loading image: %s", e)
             self.background_image = None
             self.background_label.config(image="", text="Background load failed")
     
@@ -418,6 +664,7 @@ class MainWindow:
         self.last_opened_files["video_folder"] = os.path.dirname(file_path)
         self.save_last_opened_files()
         self.current_video_path = file_path
+        self.proxy_cache.request(file_path)
 
         video_name = os.path.basename(file_path)
         self.video_label_widget.config(text=f"Video loaded, ready to play\n{video_name}")
@@ -437,9 +684,9 @@ class MainWindow:
         """
         Stop the currently playing video and update the label to display 'Video stopped' with the file name.
         """
-        self.stop_video_flag = True
-        if self.video_thread and self.video_thread.is_alive():
-            self.root.after(100, self.check_video_thread)
+        if self.video_task is not None:
+            self.video_task.cancel()
+            self.video_task = None
 
         # Get the video file name if available
         if self.current_video_path:
@@ -448,58 +695,324 @@ class MainWindow:
         else:
             self.video_label_widget.config(image="", text="No video loaded")
 
-    def check_video_thread(self):
-        if self.video_thread and self.video_thread.is_alive():
-            self.root.after(100, self.check_video_thread)  # Keep checking every 100ms
-        else:
-            self.video_thread = None  # Reset the thread once it has stopped
+    def video_playing(self):
+        return self.video_task is not None and self.video_task.status in (QUEUED, RUNNING)
 
     def play_video(self, file_path):
-        if self.video_thread and self.video_thread.is_alive():
-            self.stop_video_flag = True
-            self.video_thread.join()
+        if self.video_task is not None:
+            self.video_task.cancel()
+
+        self.seek_request = None
+        self.video_size = (max(1, self.video_frame.winfo_width()), max(1, self.video_frame.winfo_height()))
+        self.video_frame.bind("<Configure>", self.on_video_frame_resized)
+
+        # Play the low-resolution proxy when one has been generated
+        source_path = self.proxy_cache.proxy_path(file_path) or file_path
+        self.video_task = self.scheduler.submit(self.decode_video, source_path, name="Play video", priority=HIGH, pass_task=True)
+
+    def on_video_frame_resized(self, event):
+        self.video_size = (max(1, event.width), max(1, event.height))
+
+    def decode_video(self, source_path, task):
+        """
+        Decode a video at its frame rate and hand the frames to the Tk thread.
 
-        self.stop_video_flag = False
+        Runs on a scheduler thread and never touches Tk: frames are resized and
+        converted here, and only the newest one is shown, so a slow UI drops
+        frames instead of queueing them.
+        """
+        cv2 = lazy_import("cv2")  # OpenCV is only loaded once something is played
+        cap = cv2.VideoCapture(source_path)
+        frame_time = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25)
+        next_frame = time.perf_counter()
+        try:
+            while cap.isOpened() and not task.cancelled:
+                if self.seek_request is not None:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, self.seek_request * 1000)
+                    self.seek_request = None
 
-        def video_loop():
-            cap = cv2.VideoCapture(file_path)
-            while cap.isOpened() and not self.stop_video_flag:
                 if self.pause_video_flag:
+                    time.sleep(0.05)
+                    next_frame = time.perf_counter()
                     continue
 
                 ret, frame = cap.read()
                 if not ret:
                     break
 
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame = cv2.resize(frame, (self.video_frame.winfo_width(), self.video_frame.winfo_height()))
-                photo = ImageTk.PhotoImage(image=Image.fromarray(frame))
-                self.video_label_widget.config(image=photo, text="")
-                self.video_label_widget.image = photo
-                self.root.update()
+                # Look up the marker under the playhead (O(log n)) and only touch the tree when it changes
+                self.playhead_seconds = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                active = self.marker_index.current(self.playhead_seconds)
+                if active != self.active_marker:
+                    self.active_marker = active
+                    self.scheduler.post(self.highlight_marker, active)
 
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                frame = cv2.resize(frame, self.video_size)
+                self.latest_video_frame = Image.fromarray(frame)
+                if not self.video_frame_posted:
+                    self.video_frame_posted = True
+                    self.scheduler.post(self.show_video_frame, task)
+
+                next_frame += frame_time
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
             cap.release()
 
-        self.video_thread = Thread(target=video_loop)
-        self.video_thread.start()
+    def show_video_frame(self, task):
+        """Show the newest decoded frame. Runs on the Tk thread."""
+        self.video_frame_posted = False
+        image = self.latest_video_frame
+        if image is None or task is not self.video_task or task.cancelled:
+            return
+        photo = ImageTk.PhotoImage(image=image)
+        self.video_label_widget.config(image=photo, text="")
+        self.video_label_widget.image = photo
+
+    def show_task_status(self, task):
+        """
+        Show the running background tasks and their progress under the controls. Runs on the Tk thread.
+        """
+        parts = []
+        for pending in self.scheduler.pending():
+            if pending.status == RUNNING and pending.name != "Play video":
+                progress = f" {pending.progress:.0f}%" if pending.progress is not None else ""
+                parts.append(f"{pending.name}{progress}")
+        self.task_status_label.config(text=", ".join(parts[:3]) + (" ..." if len(parts) > 3 else ""))
+
+    def highlight_marker(self, position):
+        """
+        Select and scroll to the marker row at the given position in self.markers.
+        """
+        if position is None or position >= len(self.marker_items):
+            return
+        item = self.marker_items[position]
+        self.marker_tree.selection_set(item)
+        self.marker_tree.see(item)
+
+    def jump_to_marker(self, position):
+        """
+        Move the playhead to the start of the marker at the given position and highlight it.
+        """
+        if position is None:
+            return
+        start = self.marker_index.start_of(position)
+        self.playhead_seconds = start
+        if self.video_playing():
+            self.seek_request = start  # Picked up by the playback loop
+        self.active_marker = position
+        self.highlight_marker(position)
+
+    def jump_to_next_marker(self):
+        self.jump_to_marker(self.marker_index.next_after(self.playhead_seconds))
+
+    def jump_to_previous_marker(self):
+        self.jump_to_marker(self.marker_index.previous_before(self.playhead_seconds))
 
     def load_shotcut(self):
         file_path = self.file_loader.load_shortcut(initialdir=self.last_opened_files.get("shortcut_folder", os.getcwd()))
         if not file_path:
             return
+        self.open_project(file_path)
+
+    def open_project(self, file_path):
+        """
+        Make a project the current one, restoring it from the workspace if it is still open there.
+        """
         self.last_opened_files["shortcut"] = file_path
         self.last_opened_files["shortcut_folder"] = os.path.dirname(file_path)
+        recent = [path for path in self.last_opened_files.get("recent_projects", []) if path != file_path]
+        self.last_opened_files["recent_projects"] = [file_path] + recent[:9]
         self.save_last_opened_files()
         self.file_label.config(text=f"File: {os.path.basename(file_path)}")
-        self.markers = self.media_handler.extract_markers_from_file(file_path) or []
+        self.load_markers_from_project(file_path)
+        self.file_watcher.watch_file(file_path)
+        self.update_project_switcher()
+
+    def switch_project(self, event=None):
+        file_path = self.project_var.get()
+        if file_path and file_path != self.last_opened_files.get("shortcut"):
+            if os.path.exists(file_path):
+                self.open_project(file_path)
+            else:
+                log.warning("Project not found: %s", file_path)
+                self.update_project_switcher()
+
+    def update_project_switcher(self):
+        """List the recently used projects, the current one selected."""
+        current = self.last_opened_files.get("shortcut") or ""
+        self.project_switcher.config(values=self.last_opened_files.get("recent_projects") or [current])
+        self.project_var.set(current)
+
+    def load_markers_from_project(self, file_path):
+        """
+        Show the markers of a Shotcut project: instantly if the workspace still has it open
+        and the file is unchanged, otherwise extracted in the background, keeping the
+        assignments the workspace remembers for it.
+        """
+        state = self.workspace.get(file_path)
+        if state is not None and state.markers is not None:
+            self.show_project_markers(state.markers)
+            return
+
+        stamp = stat_key(file_path)  # Taken before reading, so a change while reading is noticed next time
+
+        def show(markers):
+            markers = markers or []
+            previous = self.workspace.markers_of(file_path)
+            if previous:
+                markers = merge_markers(previous, markers)
+            self.workspace.put(file_path, markers, stamp)
+            if os.path.abspath(file_path) == os.path.abspath(self.last_opened_files.get("shortcut") or ""):
+                self.show_project_markers(markers)
+
+        self.scheduler.submit(
+            self.media_handler.extract_markers_from_file, file_path,
+            name="Load markers", priority=HIGH, group="markers", on_done=show,
+        )
+
+    def show_project_markers(self, markers):
+        """Show the markers of the current project and point open Export Managers at it."""
+        self.markers = markers
         self.display_markers()
+        self.export_managers = [manager for manager in self.export_managers if manager.window.winfo_exists()]
+        for manager in self.export_managers:
+            manager.switch_project(self.last_opened_files.get("shortcut"), self.markers)
+
+    def import_markers(self):
+        """
+        Replace the marker list, including assignments, with markers from a CSV, JSON Lines, EDL or .mlt file.
+        """
+        file_path = filedialog.askopenfilename(
+            title="Import Markers",
+            initialdir=self.last_opened_files.get("markers_folder", os.getcwd()),
+            filetypes=MARKER_FILE_TYPES
+        )
+        if not file_path:
+            return
+        self.last_opened_files["markers_folder"] = os.path.dirname(file_path)
+        self.save_last_opened_files()
+
+        def show(markers):
+            self.markers = markers
+            log.info("Imported %d markers from %s", len(self.markers), file_path)
+            project = self.last_opened_files.get("shortcut")
+            if project and os.path.exists(project):
+                self.workspace.put(project, self.markers)
+            self.display_markers()
+
+        self.scheduler.submit(
+            lambda: list(read_markers(file_path)),
+            name="Import markers", priority=HIGH, group="markers", on_done=show,
+            on_error=lambda e: log.error("Error importing markers from %s: %s", file_path, e),
+        )
+
+    def export_markers(self):
+        """
+        Save the marker list with its assignments. Choosing an .mlt file replaces its markers block.
+        """
+        if not self.markers:
+            log.info("No markers to export.")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Export Markers",
+            initialdir=self.last_opened_files.get("markers_folder", os.getcwd()),
+            defaultextension=".csv",
+            filetypes=MARKER_FILE_TYPES
+        )
+        if not file_path:
+            return
+        self.last_opened_files["markers_folder"] = os.path.dirname(file_path)
+        self.save_last_opened_files()
+        self.scheduler.submit(
+            write_markers, [dict(marker) for marker in self.markers], file_path,
+            name="Export markers",
+            on_done=lambda count: log.info("Exported %d markers to %s", count, file_path),
+            on_error=lambda e: log.error("Error exporting markers to %s: %s", file_path, e),
+        )
+
+    def start_file_watcher(self):
+        """
+        Watch the loaded project and the asset folders used by auto-assign, then poll for changes.
+        """
+        shortcut_file = self.last_opened_files.get("shortcut")
+        if shortcut_file and os.path.exists(shortcut_file):
+            self.file_watcher.watch_file(shortcut_file)
+        for folder in self.last_opened_files.get("asset_folders", []):
+            if os.path.isdir(folder):
+                self.with_asset_index(folder, None, name="Index assets", priority=LOW, remember=False)
+        self.file_watcher.start()
+        self.root.after(500, self.poll_file_watcher)
+
+    def with_asset_index(self, folder, function, name, on_done=None, priority=HIGH, remember=True):
+        """
+        Run function(index) on the watched index of an asset folder in the background,
+        scanning and watching the folder the first time.
+
+        Every task of one folder runs in the same scheduler group, so scans, watcher
+        updates and lookups of an index never overlap.
+        """
+        folder = os.path.abspath(folder)
+        if remember and folder not in self.last_opened_files.get("asset_folders", []):
+            self.last_opened_files.setdefault("asset_folders", []).append(folder)
+            self.save_last_opened_files()
+
+        def run():
+            index = self.asset_indexes.get(folder)
+            if index is None:
+                index = AssetIndex(folder)
+                self.file_watcher.watch_tree(folder)
+                self.asset_indexes[folder] = index
+            return function(index) if function is not None else None
+
+        return self.scheduler.submit(run, name=name, priority=priority, group=("assets", folder), on_done=on_done)
+
+    def poll_file_watcher(self):
+        """
+        Apply settled file changes: reload the markers of a changed project and update asset indexes.
+        """
+        changed = self.file_watcher.poll()
+        if changed:
+            shortcut_file = self.last_opened_files.get("shortcut")
+            if shortcut_file and os.path.abspath(shortcut_file) in changed:
+                self.reload_markers(shortcut_file)
+            for folder in list(self.asset_indexes):
+                self.with_asset_index(folder, lambda index: index.update(changed), name="Update asset index", priority=LOW, remember=False)
+        self.root.after(500, self.poll_file_watcher)
+
+    def reload_markers(self, file_path):
+        """
+        Re-read only the markers block of the project and merge it into the marker list,
+        keeping Picture and Video assignments.
+        """
+        stamp = stat_key(file_path)
+        self.scheduler.submit(
+            lambda: list(read_markers(file_path, "mlt")),
+            name="Reload markers", priority=HIGH, group="markers",
+            on_done=lambda reloaded: self.apply_reloaded_markers(file_path, reloaded, stamp),
+            on_error=lambda e: log.error("Could not reload markers from %s: %s", file_path, e),
+        )
+
+    @watchdog.track()
+    def apply_reloaded_markers(self, file_path, reloaded, stamp=None):
+        self.markers = merge_markers(self.markers, reloaded)
+        self.workspace.put(file_path, self.markers, stamp)
+        log.info("Reloaded %d markers from %s.", len(self.markers), os.path.basename(file_path))
+        self.display_markers()
+
+        # Keep open Export Managers on the same markers and the new file contents
+        self.export_managers = [manager for manager in self.export_managers if manager.window.winfo_exists()]
+        for manager in self.export_managers:
+            manager.markers = self.markers
+            manager.load_current_mlt()
 
     def auto_load_markers(self):
         shortcut_file = self.last_opened_files.get("shortcut")
         if shortcut_file and os.path.exists(shortcut_file):
             self.file_label.config(text=f"File: {os.path.basename(shortcut_file)}")
-            self.markers = self.media_handler.extract_markers_from_file(shortcut_file) or []
-            self.display_markers()
+            self.load_markers_from_project(shortcut_file)
 
     def process_and_export(self):
         """
@@ -507,7 +1020,7 @@ class MainWindow:
         """
         input_file_path = self.last_opened_files.get("shortcut")  # Path to the loaded .mlt file
         if not input_file_path:
-            print("No .mlt file loaded.")
+            log.info("No .mlt file loaded.")
             return
 
         # Get the export folder from settings
@@ -515,7 +1028,7 @@ class MainWindow:
         settings = SettingsWindow(self.root, None, None)
         output_folder = settings.export_folder
         if not output_folder:
-            print("No export folder selected.")
+            log.info("No export folder selected.")
             return
 
         # Modifications to apply (example)
@@ -526,7 +1039,7 @@ class MainWindow:
         # Process and export the file
         exported_file = self.media_handler.process_and_export_mlt(input_file_path, output_folder, modifications)
         if exported_file:
-            print(f"File exported successfully to: {exported_file}")
+            log.info("File exported successfully to: %s", exported_file)
 
     def get_export_folder(self):
         """Retrieve the export folder from settings."""
@@ -537,6 +1050,7 @@ class MainWindow:
             return config.get("export_folder", "")
         return ""
 
+    @watchdog.track()
     def display_markers(self):
         """
         Display markers in the Treeview with rows colored based on their marker color.
@@ -544,6 +1058,11 @@ class MainWindow:
         # Clear the current contents of the marker tree
         for item in self.marker_tree.get_children():
             self.marker_tree.delete(item)
+        self.marker_items = []
+
+        # Rebuild the time index used for playback highlighting and marker jumps
+        self.marker_index = MarkerIndex(self.markers)
+        self.active_marker = None
 
         # Keep track of tags we've configured
         configured_tags = set()
@@ -563,7 +1082,7 @@ class MainWindow:
             video_filename = os.path.basename(marker.get("Video", "")) if marker.get("Video") else ""
 
             # Insert the marker with the tag
-            self.marker_tree.insert(
+            item = self.marker_tree.insert(
                 "",
                 "end",
                 values=(
@@ -575,6 +1094,55 @@ class MainWindow:
                 ),
                 tags=(tag_name,)
             )
+            self.marker_items.append(item)
+
+        self.refresh_marker_thumbnails()
+
+    def refresh_marker_thumbnails(self):
+        """
+        Build the sprite sheet of the markers' pictures in the background and show it when ready.
+        """
+        self.thumbnail_generation += 1
+        generation = self.thumbnail_generation
+        pictures = [marker.get("Picture") for marker in self.markers if marker.get("Picture")]
+        if not pictures:
+            return
+
+        def show(sheet):
+            if generation == self.thumbnail_generation:  # Otherwise a newer refresh replaced this one
+                self.apply_marker_thumbnails(sheet)
+
+        self.scheduler.cancel_all("Build thumbnails")
+        self.scheduler.submit(
+            self.sprite_builder.build, pictures,
+            name="Build thumbnails", priority=LOW, group="thumbnails", on_done=show,
+            on_error=lambda e: log.error("Error building thumbnails: %s", e),
+        )
+
+    @watchdog.track()
+    def apply_marker_thumbnails(self, sheet):
+        """
+        Show a thumbnail in every marker row that has a picture. Runs on the Tk thread.
+
+        Each atlas becomes one Tk image; rows get small images copied out of it by Tk,
+        and markers sharing a picture share one image.
+        """
+        self.thumbnail_atlases = [ImageTk.PhotoImage(atlas) for atlas in sheet.atlases]
+        self.thumbnail_images = {}
+        size = sheet.thumb_size
+        for position, marker in enumerate(self.markers):
+            picture = marker.get("Picture")
+            image = self.thumbnail_images.get(picture)
+            if image is None:
+                cell = sheet.cell(picture) if picture else None
+                if cell is None:
+                    continue
+                atlas_number, x, y = cell
+                image = tk.PhotoImage(width=size, height=size)
+                image.tk.call(str(image), "copy", str(self.thumbnail_atlases[atlas_number]), "-from", x, y, x + size, y + size)
+                self.thumbnail_images[picture] = image
+            if position < len(self.marker_items):
+                self.marker_tree.item(self.marker_items[position], image=image)
 
 
 
@@ -587,7 +1155,7 @@ class MainWindow:
                 self.set_background_image(selected_image)  # Update the background immediately
 
         from gui.settings_window import SettingsWindow
-        settings_window = SettingsWindow(self.root, save_background_image)
+        settings_window = SettingsWindow(self.root, save_background_image, self.scheduler)
         self.child_windows.append(settings_window.window) 
 
 
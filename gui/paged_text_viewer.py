@@ -0,0 +1,201 @@
+import tkinter as tk
+from tkinter import ttk
+from Services.app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class PagedTextViewer:
+    """
+    Text panel that only holds the visible lines of a LineDocument.
+
+    The Tk text widget contains a window of lines around the top visible line
+    (plus `margin` lines on each side). Scrolling inside the window just moves the
+    view; scrolling past it reloads the window from the document's line index,
+    so the widget stays small no matter how large the document is.
+
+    An editable panel writes changes made in the widget back into its document
+    before the window is reloaded and whenever current_document() is asked for.
+    """
+
+    def __init__(self, parent, margin=200, height=30, width=100, editable=False):
+        self.margin = margin
+        self.editable = editable
+        self.document = None
+        self.top = 0  # First visible line of the document
+        self.window_start = 0  # Document line shown on the first line of the widget
+        self.window_end = 0
+        self.line_tags = {}  # Tag name -> set of document lines
+
+        self.frame = ttk.Frame(parent)
+
+        jump_frame = ttk.Frame(self.frame)
+        jump_frame.pack(fill="x")
+        ttk.Label(jump_frame, text="Line or id:").pack(side="left")
+        self.jump_entry = ttk.Entry(jump_frame, width=20)
+        self.jump_entry.pack(side="left", padx=5)
+        self.jump_entry.bind("<Return>", lambda event: self.jump())
+        ttk.Button(jump_frame, text="Go", command=self.jump).pack(side="left")
+        self.position_label = ttk.Label(jump_frame, text="")
+        self.position_label.pack(side="right")
+
+        text_frame = ttk.Frame(self.frame)
+        text_frame.pack(fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(text_frame, height=height, width=width, wrap="none", state="normal" if editable else "disabled", undo=False)
+        self.text.pack(side="left", fill="both", expand=True)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self.on_mouse_wheel)
+        for sequence, amount in (("<Prior>", -1), ("<Next>", 1)):
+            self.text.bind(sequence, lambda event, amount=amount: self.scroll_pages(amount))
+        self.text.bind("<Configure>", lambda event: self.render())
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def tag_configure(self, tag, **kwargs):
+        self.text.tag_configure(tag, **kwargs)
+
+    def visible_count(self):
+        """Number of lines that fit in the widget."""
+        line_height = self.text.dlineinfo("1.0")
+        height = self.text.winfo_height()
+        if line_height and height > 1:
+            return max(1, height // line_height[3])
+        return int(self.text.cget("height"))
+
+    def visible_range(self):
+        """Returns the (first, last) document lines on screen, last exclusive."""
+        if self.document is None:
+            return 0, 0
+        return self.top, min(len(self.document), self.top + self.visible_count())
+
+    def load_document(self, document, keep_position=False):
+        """
+        Shows a LineDocument.
+
+        Args:
+            document (LineDocument): The document to show.
+            keep_position (bool): Stay at the current line instead of returning to the top.
+        """
+        if self.document is not None and self.document is not document:
+            self.document.close()
+        self.document = document
+        self.line_tags = {}
+        if not keep_position:
+            self.top = 0
+        self.window_end = 0  # Force a reload
+        self.render()
+
+    def current_document(self):
+        """Returns the document including the edits made in the widget."""
+        self.commit_edits()
+        return self.document
+
+    def commit_edits(self):
+        """Replaces the window's lines in the document with the widget's text if it was edited."""
+        if not self.editable or self.document is None or self.window_end <= self.window_start:
+            return
+        text = self.text.get("1.0", "end-1c")
+        if text != "\n".join(self.document.lines(self.window_start, self.window_end)):
+            edited = self.document.replace_lines(self.window_start, self.window_end, text)
+            self.document.close()
+            self.document = edited
+            self.window_end = self.window_start + text.count("\n") + 1
+
+    def set_line_tags(self, tag, lines):
+        """Applies a tag to whole document lines; lines outside the window are tagged as they load."""
+        self.commit_edits()
+        self.line_tags[tag] = set(lines)
+        self.window_end = 0
+        self.render()
+
+    def clear_line_tags(self, tag):
+        self.line_tags.pop(tag, None)
+        self.text.tag_remove(tag, "1.0", "end")
+
+    def render(self):
+        """Moves the view to self.top, reloading the window of lines when it is outside it."""
+        if self.document is None:
+            return
+        total = len(self.document)
+        visible = self.visible_count()
+        self.top = max(0, min(self.top, max(0, total - visible)))
+
+        if self.top < self.window_start or self.top + visible > self.window_end:
+            self.commit_edits()
+            total = len(self.document)
+            self.window_start = max(0, self.top - self.margin)
+            self.window_end = min(total, self.top + visible + self.margin)
+            self.text.config(state="normal")
+            self.text.delete("1.0", "end")
+            self.text.insert("1.0", "\n".join(self.document.lines(self.window_start, self.window_end)))
+            for tag, lines in self.line_tags.items():
+                for line in lines:
+                    if self.window_start <= line < self.window_end:
+                        widget_line = line - self.window_start + 1
+                        self.text.tag_add(tag, f"{widget_line}.0", f"{widget_line}.end")
+            if not self.editable:
+                self.text.config(state="disabled")
+            self.on_window_loaded()
+
+        self.text.yview(f"{self.top - self.window_start + 1}.0")
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        self.position_label.config(text=f"Line {self.top + 1} of {total}")
+        self.on_view_changed()
+
+    def on_window_loaded(self):
+        """Called after the window of lines in the widget is replaced."""
+
+    def on_view_changed(self):
+        """Called after every scroll or jump."""
+
+    def scroll_to(self, line):
+        self.top = line
+        self.render()
+
+    def scroll_pages(self, pages):
+        self.scroll_to(self.top + pages * self.visible_count())
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if self.document is None:
+            return
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.document)))
+        elif unit == "pages":
+            self.scroll_pages(int(amount))
+        else:
+            self.scroll_to(self.top + int(amount))
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def jump_to_line(self, line):
+        """Shows a 1-based line at the top of the panel."""
+        self.scroll_to(line - 1)
+
+    def jump_to_id(self, element_id):
+        """Shows the element with the given id at the top of the panel; returns False if there is none."""
+        if self.document is None:
+            return False
+        line = self.document.find_id(element_id)
+        if line is None:
+            return False
+        self.scroll_to(line)
+        return True
+
+    def jump(self):
+        target = self.jump_entry.get().strip()
+        if not target:
+            return
+        if target.isdigit():
+            self.jump_to_line(int(target))
+        elif not self.jump_to_id(target):
+            log.info("No element with id '%s'.", target)
@@ -0,0 +1,70 @@
+import ttkbootstrap as ttk
+import os
+
+
+class RenderQueueWindow:
+    """Window listing render jobs with cancel and retry controls."""
+
+    def __init__(self, parent, render_queue):
+        self.render_queue = render_queue
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Render Queue")
+        self.window.geometry("800x300")
+
+        self.job_tree = ttk.Treeview(
+            self.window,
+            columns=("ID", "Project", "Output", "Status", "Progress", "Attempts"),
+            show="headings",
+            selectmode="browse",
+        )
+        for column, width in (("ID", 40), ("Project", 200), ("Output", 200), ("Status", 80), ("Progress", 70), ("Attempts", 70)):
+            self.job_tree.heading(column, text=column)
+            self.job_tree.column(column, width=width, anchor="w" if column in ("Project", "Output") else "center")
+        self.job_tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        ttk.Button(button_frame, text="Cancel", bootstyle="danger", command=self.cancel_selected).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Retry", bootstyle="warning", command=self.retry_selected).pack(side="left", expand=True, padx=5)
+        ttk.Button(button_frame, text="Clear Finished", bootstyle="secondary", command=self.render_queue.clear_finished).pack(side="left", expand=True, padx=5)
+
+        # Jobs change on worker threads; poll from the Tk thread instead of touching widgets there
+        self.refresh()
+
+    def selected_job_id(self):
+        selected_item = self.job_tree.focus()
+        if not selected_item:
+            return None
+        return int(self.job_tree.item(selected_item, "values")[0])
+
+    def cancel_selected(self):
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.render_queue.cancel(job_id)
+
+    def retry_selected(self):
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.render_queue.retry(job_id)
+            self.render_queue.start()
+
+    def refresh(self):
+        """Redraw the job list every half second while the window is open."""
+        if not self.window.winfo_exists():
+            return
+
+        selected = self.selected_job_id()
+        for item in self.job_tree.get_children():
+            self.job_tree.delete(item)
+        for job in list(self.render_queue.jobs):
+            item = self.job_tree.insert(
+                "",
+                "end",
+                values=(job.job_id, os.path.basename(job.project), os.path.basename(job.output), job.status, f"{job.progress}%", job.attempts),
+            )
+            if job.job_id == selected:
+                self.job_tree.focus(item)
+                self.job_tree.selection_set(item)
+
+        self.window.after(500, self.refresh)
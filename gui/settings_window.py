@@ -1,11 +1,16 @@
 from tkinter import ttk, filedialog
 import tkinter as tk
 import os
+import logging
 import json  # To handle configuration file reading and writing
 from resources.styles import IMAGES_PATH
+from Services.app_logging import get_logger
+from Services.task_scheduler import HIGH, TaskScheduler
+
+log = get_logger(__name__)
 
 class SettingsWindow:
-    def __init__(self, parent, save_callback):
+    def __init__(self, parent, save_callback, scheduler=None):
         self.parent = parent
         self.save_callback = save_callback
         self.window = tk.Toplevel(parent)
@@ -13,12 +18,19 @@ class SettingsWindow:
         self.window.geometry("500x400")
         self.config_file = "config.json"
 
+        # Folder listing and saving run in the background
+        self.scheduler = scheduler
+        if self.scheduler is None:
+            self.scheduler = TaskScheduler(thread_workers=1)
+            self.scheduler.attach(self.window)
+            self.window.bind("<Destroy>", self.on_destroy, add="+")
+
          # Fetch current settings from config.json
         self.config = self.load_config()
         self.current_background_image = self.config.get("background_image", "Not Set")
         self.current_export_folder = self.config.get("export_folder", "Not Set")
-        print(f"BACKGROUND IMAGE: {self.current_background_image}")  # Using f-string
-        print(f"EXPORT FOLDER: {self.current_export_folder}")
+        log.debug("Background image: %s", self.current_background_image)
+        log.debug("Export folder: %s", self.current_export_folder)
 
         # Build the settings UI (background image, export folder, etc.)
         self.build_ui()
@@ -39,8 +51,9 @@ class SettingsWindow:
         # Background Image
         ttk.Label(self.grid, text="Background Image:").grid(row=1, column=0, sticky="w", pady=5)
         self.image_var = tk.StringVar(value=os.path.basename(self.current_background_image) if self.current_background_image else "Not Set")
-        self.image_dropdown = ttk.Combobox(self.grid, textvariable=self.image_var, values=self.get_available_images(), state="readonly")
+        self.image_dropdown = ttk.Combobox(self.grid, textvariable=self.image_var, values=[], state="readonly")
         self.image_dropdown.grid(row=1, column=1, sticky="ew", pady=5)
+        self.scheduler.submit(self.get_available_images, name="List Background Images", priority=HIGH, on_done=self.show_available_images)
         ttk.Label(self.grid, textvariable=self.image_var).grid(row=1, column=2, sticky="w", pady=5)
 
         # Export Folder
@@ -56,6 +69,10 @@ class SettingsWindow:
         self.save_button = ttk.Button(self.window, text="Save", command=self.save_settings)
         self.save_button.pack(side="bottom", pady=10)
 
+    def on_destroy(self, event):
+        if event.widget is self.window:
+            self.scheduler.shutdown()
+
     def load_config(self):
         """Load the configuration from config.json."""
         if os.path.exists(self.config_file):
@@ -69,6 +86,10 @@ class SettingsWindow:
             return [f for f in os.listdir(IMAGES_PATH) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
         return []
 
+    def show_available_images(self, images):
+        if self.window.winfo_exists():
+            self.image_dropdown.configure(values=images)
+
     def get_export_folder(self):
         """Retrieve the export folder from settings."""
         config_file = "config.json"
@@ -85,49 +106,68 @@ class SettingsWindow:
             self.export_folder_var.set(folder)
 
     def save_settings(self):
-        """Save changes to settings and update config.json."""
-        print("Debug: Save button pressed.")  # Debug
+        """Save changes to settings in the background; the window closes once config.json is written."""
+        log.debug("Save button pressed.")
+        self.save_button.configure(state="disabled")
+        selected_image = self.image_var.get()
+        export_folder = self.export_folder_var.get()
+
+        def saved(background_image_path):
+            # Call save_callback with the updated background image
+            log.debug("Calling save_callback with: %s", background_image_path)
+            self.save_callback(background_image_path)
+
+            # Close the settings window
+            log.debug("Closing the settings window.")
+            self.window.destroy()
+
+        def failed(error):
+            log.error("Failed to save settings: %s", error)
+            if self.window.winfo_exists():
+                self.save_button.configure(state="normal")
+
+        self.scheduler.submit(self.write_settings, selected_image, export_folder, name="Save Settings", priority=HIGH, on_done=saved, on_error=failed)
+
+    def write_settings(self, selected_image, export_folder):
+        """
+        Update config.json with the chosen settings. Runs on a worker thread.
+
+        Returns:
+            str: Full path of the selected background image.
+        """
         # Load the existing configuration
         config_file = self.config_file
         config = {}
         
-        print(f"Debug: Reading configuration from {config_file}")  # Debug
+        log.debug("Reading configuration from %s", config_file)
         if os.path.exists(config_file):
             with open(config_file, "r") as file:
                 try:
                     config = json.load(file)
-                    print(f"Debug: Loaded configuration: {config}")  # Debug
+                    log.debug("Loaded configuration: %s", config)
                 except json.JSONDecodeError as e:
-                    print(f"Debug: Error decoding JSON. Using empty config. Error: {e}")
+                    log.warning("Error decoding JSON. Using empty config. Error: %s", e)
 
         # Update config with new values
-        selected_image = self.image_var.get()
-        print(f"Debug: Selected background image: {selected_image}")  # Debug
+        log.debug("Selected background image: %s", selected_image)
         background_image_path = os.path.join(IMAGES_PATH, selected_image)
-        print(f"Debug: Full path for background image: {background_image_path}")  # Debug
+        log.debug("Full path for background image: %s", background_image_path)
 
-        export_folder = self.export_folder_var.get()
-        print(f"Debug: Selected export folder: {export_folder}")  # Debug
+        log.debug("Selected export folder: %s", export_folder)
 
         config["background_image"] = background_image_path  # Save the selected background image
         config["export_folder"] = export_folder  # Save the selected export folder
 
         # Save the updated configuration
-        print("Debug: Saving updated configuration to file.")  # Debug
+        log.debug("Saving updated configuration to file.")
         with open(config_file, "w") as file:
             json.dump(config, file, indent=4)
-            print(f"Debug: Configuration saved successfully: {config}")  # Debug
+            log.debug("Configuration saved successfully: %s", config)
             
-        # Read the file back to verify
-        with open(config_file, "r") as file:
-            saved_config = json.load(file)
-            print(f"Debug: Configuration file content after saving: {saved_config}")
-
-        # Call save_callback with the updated background image
-        print(f"Debug: Calling save_callback with: {background_image_path}")  # Debug
-        self.save_callback(background_image_path)
-
-        # Close the settings window
-        print("Debug: Closing the settings window.")  # Debug
-        self.window.destroy()
+        # Read the file back to verify (only worth the extra read when debugging)
+        if log.isEnabledFor(logging.DEBUG):
+            with open(config_file, "r") as file:
+                saved_config = json.load(file)
+                log.debug("Configuration file content after saving: %s", saved_config)
+        return background_image_path
 
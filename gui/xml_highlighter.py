@@ -0,0 +1,106 @@
+from Services.xml_tokenizer import TokenCache
+
+# Tag colors for the token classes of Services.xml_tokenizer
+TOKEN_STYLES = {
+    "xml_tag": {"foreground": "#1f5fa8"},
+    "xml_producer": {"foreground": "#b3261e"},
+    "xml_playlist": {"foreground": "#2e7d32"},
+    "xml_track": {"foreground": "#6a1b9a"},
+    "xml_transition": {"foreground": "#ef6c00"},
+    "xml_attribute": {"foreground": "#8a6d00"},
+    "xml_value": {"foreground": "#00796b"},
+    "xml_comment": {"foreground": "#808080"},
+    "xml_declaration": {"foreground": "#808080"},
+}
+
+
+class XmlHighlighter:
+    """
+    Highlights the lines of a PagedTextViewer in idle callbacks.
+
+    Only lines in the viewer's window are tokenized, visible lines first, and at
+    most `batch_size` lines are tagged per callback so scrolling stays responsive.
+    Spans come from a TokenCache, so unchanged lines are never re-tokenized. In an
+    editable viewer the lines changed by typing, pasting or deleting are tagged again.
+    """
+
+    def __init__(self, viewer, batch_size=40, cache=None):
+        self.viewer = viewer
+        self.text = viewer.text
+        self.batch_size = batch_size
+        self.cache = cache or TokenCache()
+        self.done = set()  # Widget lines already tagged in the current window
+        self.line_count = 0  # Widget lines when `done` was last updated
+        self.job = None
+
+        for tag, style in TOKEN_STYLES.items():
+            self.text.tag_configure(tag, **style)
+
+        viewer.on_window_loaded = self.reset
+        viewer.on_view_changed = self.schedule
+        if viewer.editable:
+            self.text.bind("<<Modified>>", self.on_modified, add="+")
+
+    def reset(self):
+        """The window of lines was replaced: every line needs tagging again."""
+        self.done = set()
+        self.line_count = self.widget_lines()
+
+    def widget_lines(self):
+        return int(self.text.index("end-1c").split(".")[0])
+
+    def on_modified(self, event=None):
+        """
+        Text was typed, pasted or deleted: forget the edited lines and renumber the tagged lines after them.
+
+        Edits end at the insert cursor, so the lines from the cursor back over the lines
+        added are re-tagged; Tk moves the tags of the other lines along with their text.
+        """
+        if not self.text.edit_modified():
+            return  # Clearing the flag below fires <<Modified>> as well
+        self.text.edit_modified(False)
+        count = self.widget_lines()
+        delta = count - self.line_count
+        self.line_count = count
+        first = int(self.text.index("insert").split(".")[0]) - max(delta, 0)
+        last = first + max(-delta, 0)  # Last line the edit touched, numbered as before it
+        self.done = {line for line in self.done if line < first} | {line + delta for line in self.done if line > last}
+        self.schedule()
+
+    def schedule(self):
+        if self.job is None:
+            self.job = self.text.after_idle(self.highlight_batch)
+
+    def pending_lines(self):
+        """Widget lines still to tag: the visible ones, then the rest of the window outward."""
+        first, last = self.viewer.visible_range()
+        start = self.viewer.window_start
+        window_lines = self.widget_lines()  # Differs from the window while edits are uncommitted
+        visible = range(first - start + 1, last - start + 1)
+        for line in visible:
+            if line not in self.done:
+                yield line
+        for distance in range(1, window_lines):
+            for line in (visible.start - distance, visible.stop - 1 + distance):
+                if 1 <= line <= window_lines and line not in self.done:
+                    yield line
+
+    def highlight_batch(self):
+        self.job = None
+        if self.viewer.document is None:
+            return
+        count = 0
+        for line in self.pending_lines():
+            self.highlight_line(line)
+            count += 1
+            if count >= self.batch_size:
+                self.job = self.text.after(1, self.highlight_batch)  # Let Tk handle input in between
+                return
+
+    def highlight_line(self, line):
+        content = self.text.get(f"{line}.0", f"{line}.end")
+        for tag in TOKEN_STYLES:
+            self.text.tag_remove(tag, f"{line}.0", f"{line}.end")
+        for tag, start, end in self.cache.get(content):
+            self.text.tag_add(tag, f"{line}.{start}", f"{line}.{end}")
+        self.done.add(line)
@@ -1,11 +1,179 @@
-from gui.main_window import MainWindow
-import ttkbootstrap as ttk
-from ttkbootstrap.constants import *
+from Services.startup_profiler import profiler  # First, so the startup clock covers every import
+import argparse
+import os
+import sys
+from Services.app_logging import logging_setup
+
+
+def run_gui(args):
+    with profiler.phase("import ttkbootstrap"):
+        import ttkbootstrap as ttk
+    with profiler.phase("import gui.main_window"):
+        from gui.main_window import MainWindow
+
+    with profiler.phase("create root window"):
+        app = ttk.Window(themename="flatly")  # Set the theme here
+    with profiler.phase("build main window"):
+        MainWindow(app)  # Initialize your main window
+
+    def first_paint():
+        profiler.mark_first_paint()
+        if args.profile_startup:
+            print(profiler.format_report())
+        if args.profile_output:
+            profiler.write(args.profile_output)
+        if args.quit_after_startup:
+            app.destroy()
+
+    # Idle callbacks run once the event loop has drawn the window
+    app.after(0, lambda: app.after_idle(first_paint))
+    if args.log_level or args.log_file:
+        logging_setup.configure(level=args.log_level, log_file=args.log_file)  # Over the config's settings
 
-def main():
-    app = ttk.Window(themename="flatly")  # Set the theme here
-    MainWindow(app)  # Initialize your main window
     app.mainloop()
+    if args.lag_report:
+        from Services.lag_watchdog import watchdog
+        watchdog.write(args.lag_report)
+    return 0
+
+
+def run_validate(args):
+    from Services.project_validator import format_diagnostics, validate_file
+
+    exit_code = 0
+    for file_path in args.files:
+        diagnostics = validate_file(file_path, max_workers=args.workers)
+        if diagnostics:
+            print(f"{file_path}:\n{format_diagnostics(diagnostics)}")
+        else:
+            print(f"{file_path}: OK")
+        if any(diagnostic.severity == "error" for diagnostic in diagnostics):
+            exit_code = 1
+    return exit_code
+
+
+def run_render(args):
+    from Services.render_queue import CANCELLED, DONE, RenderQueue
+
+    def report(job):
+        print(f"[job {job.job_id}] {job.status} {job.progress}% {job.project}")
+
+    render_queue = RenderQueue(args.state_file, melt_path=args.melt, max_concurrent=args.jobs, on_update=report)
+    if args.list:
+        for job in render_queue.jobs:
+            print(f"{job.job_id}\t{job.status}\t{job.progress}%\t{job.project} -> {job.output}")
+        return 0
+    for job_id in args.cancel:
+        render_queue.cancel(job_id)
+    # The exit code reports on the jobs of this run, not on failures left in the state file
+    jobs = [render_queue.get(job_id) for job_id in args.retry if render_queue.retry(job_id)]
+    for file_path in args.files:
+        output = os.path.join(args.output_dir, os.path.splitext(os.path.basename(file_path))[0] + ".mp4") if args.output_dir else None
+        jobs.append(render_queue.add(os.path.abspath(file_path), output))
+
+    render_queue.start()
+    try:
+        render_queue.wait()
+    except KeyboardInterrupt:
+        render_queue.stop()
+        return 130
+    render_queue.stop(terminate=False)
+    return 0 if all(job.status == DONE for job in jobs if job.status != CANCELLED) else 1
+
+
+def run_markers(args):
+    from Services.marker_io import read_markers, write_markers
+
+    try:
+        count = write_markers(read_markers(args.source), args.destination)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error converting markers: {e}")
+        return 1
+    print(f"Wrote {count} markers to {args.destination}")
+    return 0
+
+
+def run_history(args):
+    from Services.export_history import ExportHistory
+
+    history = ExportHistory(args.folder)
+    try:
+        if args.action == "list":
+            for version in history.versions(args.source):
+                print(f"{version.version_id}\t{version.created}\t{version.size}\t{len(version.chunks)} chunks\t{version.source or ''}")
+            stats = history.stats()
+            print(f"{stats['versions']} exports, {stats['exported_bytes']} bytes exported, {stats['stored_bytes']} bytes stored")
+        elif args.action == "record":
+            for file_path in args.versions:
+                history.record(file_path, source=args.source)
+        elif args.action == "restore":
+            for version_id in args.versions:
+                print(f"Restored {history.restore(version_id, args.output)}")
+        elif args.action == "diff":
+            if len(args.versions) != 2:
+                print("Error: diff needs two version ids.")
+                return 1
+            print("\n".join(history.diff(*args.versions)))
+        elif args.action == "prune":
+            print(f"Removed {history.prune(args.keep)} exports.")
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Shotcut marker tools. Starts the GUI when no command is given.")
+    parser.add_argument("--profile-startup", action="store_true", help="Print import times and time to first paint")
+    parser.add_argument("--profile-output", metavar="FILE", help="Write the startup timings as JSON")
+    parser.add_argument("--quit-after-startup", action="store_true", help="Close the window after the first paint")
+    parser.add_argument("--lag-report", metavar="FILE", help="Write event-loop lag statistics as JSON on exit")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper, help="Lowest level logged (default INFO)")
+    parser.add_argument("--log-file", metavar="FILE", help="Also write the log to a rotating JSON-lines file")
+    commands = parser.add_subparsers(dest="command")
+
+    validate = commands.add_parser("validate", help="Check .mlt projects for missing resources and broken timelines")
+    validate.add_argument("files", nargs="+", help=".mlt files to validate")
+    validate.add_argument("--workers", type=int, default=32, help="Threads used to check resource files")
+    validate.set_defaults(handler=run_validate)
+
+    render = commands.add_parser("render", help="Queue exported projects and render them with melt")
+    render.add_argument("files", nargs="*", help=".mlt files to add to the queue")
+    render.add_argument("--output-dir", help="Folder for rendered files (default: next to each project)")
+    render.add_argument("--jobs", type=int, default=2, help="Number of renders running at once")
+    render.add_argument("--melt", default="melt", help="melt executable")
+    render.add_argument("--state-file", default="render_queue.json", help="File the queue is persisted to")
+    render.add_argument("--cancel", type=int, action="append", default=[], metavar="ID", help="Cancel a queued job")
+    render.add_argument("--retry", type=int, action="append", default=[], metavar="ID", help="Requeue a failed or cancelled job")
+    render.add_argument("--list", action="store_true", help="Show the queue and exit")
+    render.set_defaults(handler=run_render)
+
+    markers = commands.add_parser("markers", help="Convert markers and assignments between .csv, .jsonl, .edl and .mlt files")
+    markers.add_argument("source", help="File to read markers from")
+    markers.add_argument("destination", help="File to write; an existing .mlt gets its markers block replaced")
+    markers.set_defaults(handler=run_markers)
+
+    history = commands.add_parser("history", help="List, restore and compare recorded exports")
+    history.add_argument("action", choices=["list", "record", "restore", "diff", "prune"])
+    history.add_argument("versions", nargs="*", help="Version ids (or unique prefixes); files for record")
+    history.add_argument("--folder", default="export_history", help="Export history folder")
+    history.add_argument("--source", help="Project the exports belong to")
+    history.add_argument("--output", help="File to restore to (default: the original export path)")
+    history.add_argument("--keep", type=int, default=100, help="Exports kept per project by prune")
+    history.set_defaults(handler=run_history)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging_setup.configure(level=args.log_level, log_file=args.log_file)
+    try:
+        if args.command is None:
+            return run_gui(args)
+        return args.handler(args)
+    finally:
+        logging_setup.stop()  # Writes out what is still queued
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
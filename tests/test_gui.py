@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 from tkinter import Tk
 from gui.main_window import MainWindow
@@ -13,5 +16,60 @@ class TestMainWindow(unittest.TestCase):
     def test_window_title(self):
         self.assertEqual(self.root.title(), "Media Display App")
 
+class TestCloseWithExportManager(unittest.TestCase):
+    def test_document_is_stored_on_close(self):
+        import xml.etree.ElementTree as ET
+        from Services.file_watcher import stat_key
+
+        mlt_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "LTD211.mlt")
+        root = Tk()
+        app = MainWindow(root)
+        app.start_export_manager()
+        manager = app.export_managers[-1]
+        manager.config["shortcut"] = mlt_file
+        manager.document_stamp = stat_key(mlt_file)
+        manager.output_root = ET.parse(mlt_file).getroot()
+
+        app.on_close()  # Stops the scheduler before the Export Manager is destroyed
+
+        self.assertIs(app.workspace.take_document(mlt_file)[0], manager.output_root)
+
+class TestEditableHighlighting(unittest.TestCase):
+    def test_edited_lines_are_tagged_again(self):
+        from Services.line_document import LineDocument
+        from gui.paged_text_viewer import PagedTextViewer
+        from gui.xml_highlighter import XmlHighlighter
+
+        root = Tk()
+        try:
+            viewer = PagedTextViewer(root, editable=True)
+            viewer.pack()
+            highlighter = XmlHighlighter(viewer)
+            viewer.load_document(LineDocument.from_text("<mlt>\n  text\n</mlt>"))
+            root.update()
+
+            viewer.text.mark_set("insert", "2.2")
+            viewer.text.insert("insert", '<producer id="p"/>\n  ')
+            root.update()
+
+            self.assertEqual(highlighter.widget_lines(), 4)
+            self.assertIn("xml_producer", viewer.text.tag_names("2.3"))
+            self.assertEqual(viewer.text.tag_names("3.3"), ())
+            self.assertIn("xml_tag", viewer.text.tag_names("4.1"))
+        finally:
+            root.destroy()
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_heavy_modules_load_lazily(self):
+        code = (
+            "import sys, gui.main_window; "
+            "print(sorted(name for name in ('cv2', 'xml.dom.minidom', 'gui.export_manager', 'gui.settings_window') if name in sys.modules))"
+        )
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", code], cwd=repo_root, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,137 @@
+"""
+Performance regression gate.
+
+Skipped by default. Run with PERF_CHECK=1 to time fixed-size workloads and compare
+each median against tests/perf_baseline.json; a workload fails when it is more than
+PERF_TOLERANCE (default 2.0) times slower than its baseline. Run with
+PERF_UPDATE_BASELINE=1 to re-record the baseline after an intended change.
+"""
+import copy
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from Services.media_handler import MediaHandler
+from Services.mlt_builder import add_marker_playlists, add_marker_producers, add_missing_transitions, prettify_xml_with_no_extra_lines
+from Services.timecode import format_timecode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(REPO_ROOT, "tests", "perf_baseline.json")
+PERF_CHECK = os.environ.get("PERF_CHECK") == "1"
+UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", "2.0"))
+NOISE_FLOOR = 0.005  # Seconds of jitter tolerated on very fast workloads
+REPEATS = 5
+
+MARKER_COUNT = 5000
+PICTURE_COUNT = 500
+EXTRA_TRACKS = 50
+ASSET_FOLDERS = 50
+
+
+def measure(setup, run, repeats=REPEATS):
+    """Returns the median wall time of run(setup()) in seconds; setup is not timed."""
+    timings = []
+    for _ in range(repeats):
+        state = setup()
+        began = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - began)
+    return statistics.median(timings)
+
+
+@unittest.skipUnless(PERF_CHECK or UPDATE_BASELINE, "set PERF_CHECK=1 to run the performance regression gate")
+class TestPerformanceRegression(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+
+        # LTD211.mlt with its markers block scaled up to MARKER_COUNT markers
+        cls.base_root = ET.parse(os.path.join(REPO_ROOT, "resources", "LTD211.mlt")).getroot()
+        markers_element = cls.base_root.find(".//properties[@name='shotcut:markers']")
+        template = markers_element.find("properties")
+        for child in list(markers_element):
+            markers_element.remove(child)
+        for index in range(MARKER_COUNT):
+            marker = copy.deepcopy(template)
+            marker.set("name", str(index))
+            marker.find("property[@name='text']").text = f"unit{index % PICTURE_COUNT}"
+            marker.find("property[@name='start']").text = format_timecode(index)
+            marker.find("property[@name='end']").text = format_timecode(index)
+            markers_element.append(marker)
+        cls.scaled_file = os.path.join(cls.folder, "scaled.mlt")
+        ET.ElementTree(cls.base_root).write(cls.scaled_file, encoding="utf-8", xml_declaration=True)
+
+        cls.markers = MediaHandler().extract_markers_from_file(cls.scaled_file)
+        for marker in cls.markers:
+            marker["Picture"] = f"C:/assets/{marker['Name']}.png"
+
+        # Fake asset tree: PICTURE_COUNT pictures spread over ASSET_FOLDERS folders, plus noise
+        cls.asset_folder = os.path.join(cls.folder, "assets")
+        for index in range(PICTURE_COUNT):
+            folder = os.path.join(cls.asset_folder, f"group{index % ASSET_FOLDERS}")
+            os.makedirs(folder, exist_ok=True)
+            open(os.path.join(folder, f"unit{index}.png"), "w").close()
+            open(os.path.join(folder, f"other{index}.txt"), "w").close()
+
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder, ignore_errors=True)
+
+    def project_with_producers(self):
+        root = copy.deepcopy(self.base_root)
+        add_marker_producers(root, self.markers)
+        return root
+
+    def test_hot_paths_against_baseline(self):
+        tractor_setup = lambda: self.with_extra_tracks(copy.deepcopy(self.base_root))
+        workloads = {
+            "extract_markers": measure(lambda: self.scaled_file, MediaHandler().extract_markers_from_file),
+            "build_producers": measure(lambda: copy.deepcopy(self.base_root), lambda root: add_marker_producers(root, self.markers)),
+            "build_playlists": measure(self.project_with_producers, lambda root: add_marker_playlists(root, self.markers)),
+            "build_transitions": measure(tractor_setup, add_missing_transitions),
+            "serialize": measure(self.project_with_producers, prettify_xml_with_no_extra_lines, repeats=3),
+            "auto_assign": measure(lambda: self.asset_folder, lambda folder: MediaHandler().find_matching_files(self.markers, folder, [".png", ".jpg"])),
+        }
+
+        if UPDATE_BASELINE:
+            with open(BASELINE_FILE, "w", encoding="utf-8") as file:
+                json.dump({name: round(seconds, 5) for name, seconds in workloads.items()}, file, indent=4)
+                file.write("\n")
+            return
+
+        with open(BASELINE_FILE, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        lines = [f"{'workload':<20}{'baseline':>12}{'median':>12}{'ratio':>8}  status"]
+        regressions = []
+        for name, seconds in workloads.items():
+            expected = baseline.get(name)
+            if expected is None:
+                lines.append(f"{name:<20}{'-':>12}{seconds * 1000:>10.1f}ms{'-':>8}  no baseline")
+                continue
+            allowed = max(expected * TOLERANCE, expected + NOISE_FLOOR)
+            status = "REGRESSED" if seconds > allowed else "ok"
+            if seconds > allowed:
+                regressions.append(name)
+            lines.append(f"{name:<20}{expected * 1000:>10.1f}ms{seconds * 1000:>10.1f}ms{seconds / expected:>7.2f}x  {status}")
+        report = "\n".join(lines)
+        print(f"\n{report}")
+        self.assertFalse(regressions, f"Hot paths slower than {TOLERANCE}x baseline: {', '.join(regressions)}\n{report}")
+
+    def with_extra_tracks(self, root):
+        tractor = root.find(".//tractor")
+        first_transition = list(tractor).index(tractor.find("transition"))
+        for offset in range(EXTRA_TRACKS):
+            tractor.insert(first_transition + offset, ET.Element("track", producer="playlist0"))
+        return root
+
+
+if __name__ == "__main__":
+    unittest.main()
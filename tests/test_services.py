@@ -0,0 +1,1215 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from Services.app_logging import LoggingSetup, RateLimitFilter, get_logger
+from Services.asset_index import AssetIndex
+from Services.decode_pool import DecodePool, composite_tiles
+from Services.edit_history import EditHistory
+from Services.export_history import ExportHistory, split_chunks
+from Services.file_watcher import FileWatcher
+from Services.id_allocator import IdAllocator
+from Services.image_hash import ImageHashIndex, dhash
+from Services.lag_watchdog import LagWatchdog
+from Services.line_document import LineDocument, changed_lines
+from Services.marker_index import MarkerIndex
+from Services.marker_io import read_markers, write_markers
+from Services.marker_merge import merge_markers
+from Services.mlt_builder import add_marker_playlists, add_marker_producers, add_missing_transitions, prettify_xml_with_no_extra_lines
+from Services.mlt_splice import SpliceError, fingerprint, parse_with_offsets, splice_export
+from Services.media_handler import MediaHandler
+from Services.producer_registry import ProducerRegistry
+from Services.producer_templates import ProducerTemplate, get_template
+from Services.project_validator import check_timeline, frame_duration, layout_playlist, validate_project
+from Services.project_workspace import ProjectWorkspace
+from Services.proxy_cache import ProxyCache
+from Services.sprite_sheet import SpriteSheetBuilder
+from Services.track_packer import pack_intervals
+from Services.startup_profiler import StartupProfiler
+from Services.task_scheduler import CANCELLED, DONE, FAILED, HIGH, LOW, PROCESS, TaskScheduler
+from Services.render_queue import DONE, FAILED, QUEUED, RenderQueue
+from Services.tractor_graph import TractorGraph
+from Services.xml_tokenizer import TokenCache, tokenize_line
+from Services.timecode import format_timecode, parse_timecode
+
+RESOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+
+def make_marker(name, start, end=""):
+    return {"Name": name, "StartTime": start, "EndTime": end, "Color": "#FFFFFF", "Picture": "", "Video": ""}
+
+
+class TestFindMatchingFiles(unittest.TestCase):
+    def test_matches_by_name_case_insensitively(self):
+        with tempfile.TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, "sub"))
+            for name in ("Tuskar.JPG", "Tuskar.png", os.path.join("sub", "gnoll.png")):
+                open(os.path.join(folder, name), "w").close()
+            markers = [make_marker("tuskar", "00:00:01.000"), make_marker(" gnoll ", "00:00:02.000"), make_marker("ogre", "00:00:03.000")]
+            matches = MediaHandler().find_matching_files(markers, folder, [".png", ".jpg"])
+        self.assertEqual(matches, {0: os.path.join(folder, "Tuskar.png"), 1: os.path.join(folder, "sub", "gnoll.png")})
+
+
+class TestXmlTokenizer(unittest.TestCase):
+    def test_tokenize_line(self):
+        line = '  <producer id="producer0" in="00:00:00.000"/> <!-- note -->'
+        spans = [(kind, line[start:end]) for kind, start, end in tokenize_line(line)]
+        self.assertEqual(spans, [
+            ("xml_tag", "<"), ("xml_producer", "producer"),
+            ("xml_attribute", "id"), ("xml_value", '"producer0"'),
+            ("xml_attribute", "in"), ("xml_value", '"00:00:00.000"'),
+            ("xml_tag", "/>"), ("xml_comment", "<!-- note -->"),
+        ])
+        self.assertEqual([kind for kind, _, _ in tokenize_line("    <property name=\"length\">04:00:00.000</property>")],
+                         ["xml_tag", "xml_tag", "xml_attribute", "xml_value", "xml_tag", "xml_tag", "xml_tag", "xml_tag"])
+
+    def test_cache_is_bounded_and_keyed_by_text(self):
+        cache = TokenCache(max_lines=2)
+        first = cache.get("<track/>")
+        self.assertIs(cache.get("<track/>"), first)
+        cache.get("<a/>")
+        cache.get("<b/>")
+        self.assertEqual(list(cache.spans), ["<a/>", "<b/>"])
+
+
+class TestAssetIndex(unittest.TestCase):
+    def test_incremental_updates(self):
+        with tempfile.TemporaryDirectory() as folder:
+            open(os.path.join(folder, "ogre.png"), "w").close()
+            index = AssetIndex(folder)
+            markers = [make_marker("ogre", "00:00:01.000"), make_marker("gnoll", "00:00:02.000")]
+            self.assertEqual(index.match_markers(markers, [".png"]), {0: os.path.join(folder, "ogre.png")})
+
+            os.makedirs(os.path.join(folder, "new"))
+            open(os.path.join(folder, "new", "gnoll.png"), "w").close()
+            os.remove(os.path.join(folder, "ogre.png"))
+            index.update({os.path.join(folder, "new"), os.path.join(folder, "ogre.png"), "/elsewhere/ogre.png"})
+            self.assertEqual(index.match_markers(markers, [".png"]), {1: os.path.join(folder, "new", "gnoll.png")})
+
+
+class TestMergeMarkers(unittest.TestCase):
+    def test_assignments_follow_markers(self):
+        current = [make_marker("a", "00:00:01.000"), make_marker("b", "00:00:02.000"), make_marker("b", "00:00:03.000")]
+        current[0]["Picture"] = "a.png"
+        current[1]["Video"] = "b1.mp4"
+        current[2]["Video"] = "b2.mp4"
+        # "a" moved, the first "b" was deleted, a marker was added
+        reloaded = [make_marker("new", "00:00:00.500"), make_marker("a", "00:00:01.500"), make_marker("b", "00:00:03.000")]
+        merged = merge_markers(current, reloaded)
+        self.assertEqual([(marker["Picture"], marker["Video"]) for marker in merged], [("", ""), ("a.png", ""), ("", "b2.mp4")])
+
+
+class TestFileWatcher(unittest.TestCase):
+    def check_backend(self, use_inotify):
+        with tempfile.TemporaryDirectory() as folder:
+            project = os.path.join(folder, "project.mlt")
+            assets = os.path.join(folder, "assets")
+            os.makedirs(assets)
+            open(project, "w").close()
+            watcher = FileWatcher(debounce=0.2, poll_interval=0.05, use_inotify=use_inotify)
+            watcher.watch_file(project)
+            watcher.watch_tree(assets)
+            watcher.start()
+            try:
+                time.sleep(0.1)
+                for attempt in range(5):  # A burst of writes is reported once
+                    with open(project, "a") as file:
+                        file.write(f"{attempt}\n")
+                open(os.path.join(assets, "ogre.png"), "w").close()
+                open(os.path.join(folder, "unrelated.txt"), "w").close()
+
+                batch = set()
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline and len(batch) < 2:
+                    batch |= watcher.poll()
+                    time.sleep(0.05)
+            finally:
+                watcher.stop()
+        self.assertEqual(batch, {project, os.path.join(assets, "ogre.png")})
+        return watcher
+
+    def test_polling(self):
+        self.assertEqual(self.check_backend(use_inotify=False).backend, "polling")
+
+    def test_inotify(self):
+        watcher = FileWatcher(use_inotify=True)
+        if watcher.backend != "inotify":
+            self.skipTest("inotify is not available")
+        watcher.stop()
+        self.check_backend(use_inotify=True)
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def setUp(self):
+        self.changes = []
+        self.scheduler = TaskScheduler(thread_workers=1, process_workers=1, on_change=self.changes.append)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def wait_for(self, *tasks):
+        deadline = time.monotonic() + 30
+        while any(task.status not in (DONE, FAILED, CANCELLED) for task in tasks) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.scheduler.drain(budget=5)
+
+    def test_priorities_groups_and_callbacks(self):
+        gate = threading.Event()
+        order = []
+        results = []
+        self.scheduler.submit(gate.wait, 5)  # Occupies the only worker
+        low = self.scheduler.submit(order.append, "low", priority=LOW)
+        first = self.scheduler.submit(order.append, "group 1", priority=LOW, group="doc")
+        second = self.scheduler.submit(order.append, "group 2", priority=HIGH, group="doc")
+        high = self.scheduler.submit(lambda: order.append("high") or 42, priority=HIGH, on_done=results.append)
+        failing = self.scheduler.submit(lambda: 1 / 0, on_error=results.append)
+        gate.set()
+        self.wait_for(low, first, second, high, failing)
+
+        # HIGH first, LOW by submission order; group 2 waits for group 1 despite its priority
+        self.assertEqual(order, ["high", "low", "group 1", "group 2"])
+        self.assertEqual(results[0], 42)
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertIn(high, self.changes)
+        self.assertEqual(self.scheduler.pending(), [])
+
+    def test_cancellation_and_progress(self):
+        gate = threading.Event()
+        progress = []
+
+        def count(task):
+            for step in range(1000):
+                task.report(step / 10, f"step {step}")
+                gate.set()
+                time.sleep(0.005)
+            return "finished"
+
+        running = self.scheduler.submit(count, pass_task=True, on_progress=lambda task: progress.append(task.progress))
+        queued = self.scheduler.submit(progress.append, "never")
+        self.assertTrue(gate.wait(5))
+        time.sleep(0.05)
+        self.scheduler.drain()
+        queued.cancel()
+        running.cancel()
+        self.wait_for(running, queued)
+
+        self.assertEqual((running.status, queued.status), (CANCELLED, CANCELLED))
+        self.assertIsNone(running.result)
+        self.assertTrue(progress)
+        self.assertNotIn("never", progress)
+        self.assertLess(len(progress), 20)  # Reports are coalesced until the Tk thread drains them
+
+    def test_process_lane(self):
+        lines = ["<a>", "  <b/>", "</a>"]
+        results = []
+        task = self.scheduler.submit(changed_lines, lines, ["<a>", "<c/>", "</a>"], lane=PROCESS, on_done=results.append)
+        self.wait_for(task)
+        self.assertEqual(task.status, DONE)
+        self.assertEqual(results, [({1}, {1})])
+
+
+class TestExportHistory(unittest.TestCase):
+    def make_project(self, count, renamed=()):
+        lines = ['<?xml version="1.0" encoding="utf-8"?>', "<mlt>"]
+        for number in range(count):
+            resource = f"renamed{number}.png" if number in renamed else f"image{number}.png"
+            lines.append(f'  <producer id="producer{number}">\n    <property name="resource">{resource}</property>\n  </producer>')
+        lines.append("</mlt>")
+        return "\n".join(lines).encode("utf-8")
+
+    def test_chunks_are_content_defined(self):
+        data = self.make_project(5000)
+        chunks = split_chunks(data)
+        self.assertEqual(b"".join(chunks), data)
+        self.assertTrue(all(chunk.endswith(b"\n") for chunk in chunks[:-1]))
+
+        # An insertion near the start leaves the later chunks unchanged
+        edited = data.replace(b"<mlt>\n", b"<mlt>\n  <playlist id=\"playlist0\"/>\n", 1)
+        unchanged = set(split_chunks(edited)) & set(chunks)
+        self.assertGreater(len(unchanged), len(chunks) - 3)
+
+    def test_record_restore_diff_and_prune(self):
+        with tempfile.TemporaryDirectory() as folder:
+            history = ExportHistory(os.path.join(folder, "history"))
+            export_path = os.path.join(folder, "exported_file.mlt")
+            versions = []
+            for edit in range(10):
+                with open(export_path, "wb") as file:
+                    file.write(self.make_project(5000, renamed={edit * 400}))
+                versions.append(history.record(export_path, source="project.mlt"))
+
+            stats = history.stats()
+            self.assertEqual(stats["versions"], 10)
+            self.assertLess(stats["stored_bytes"], stats["exported_bytes"] / 20)
+
+            history.restore(versions[3].version_id[:24])
+            with open(export_path, "rb") as file:
+                self.assertEqual(file.read(), self.make_project(5000, renamed={1200}))
+
+            diff = history.diff(versions[0], versions[1])
+            self.assertIn('-    <property name="resource">renamed0.png</property>', diff)
+            self.assertIn('+    <property name="resource">renamed400.png</property>', diff)
+
+            self.assertEqual(history.prune(keep=2), 8)
+            self.assertEqual([version.version_id for version in history.versions()], [versions[8].version_id, versions[9].version_id])
+            self.assertEqual(history.read(versions[9]), self.make_project(5000, renamed={3600}))
+            self.assertLess(history.stats()["stored_bytes"], stats["stored_bytes"])
+
+    def test_unreadable_manifest_stops_garbage_collection(self):
+        with tempfile.TemporaryDirectory() as folder:
+            history = ExportHistory(os.path.join(folder, "history"))
+            export_path = os.path.join(folder, "exported_file.mlt")
+            with open(export_path, "wb") as file:
+                file.write(self.make_project(500))
+            version = history.record(export_path)
+            manifest = os.path.join(history.manifests_folder, f"{version.version_id}.json")
+            with open(manifest, "r+b") as file:
+                file.truncate(20)  # Partially written
+
+            self.assertEqual(history.collect_garbage(), 0)
+            with open(manifest, "wb") as file:
+                file.write(json.dumps(version._asdict()).encode("utf-8"))
+            self.assertEqual(history.read(version.version_id), self.make_project(500))
+            self.assertIs(ExportHistory(os.path.join(folder, "history", ".")).lock, history.lock)
+
+
+class TestImageHashIndex(unittest.TestCase):
+    def test_duplicate_groups_and_canonical(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, "UNITSnew"))
+            fractal = Image.effect_mandelbrot((400, 300), (-2, -1.5, 1, 1.5), 100).convert("RGB")
+            original = os.path.join(folder, "ogre.png")
+            fractal.save(original)
+            fractal.save(os.path.join(folder, "UNITSnew", "ogre_copy.jpg"), quality=70)
+            fractal.resize((200, 150)).save(os.path.join(folder, "UNITSnew", "ogre_small.png"))
+            Image.effect_noise((400, 300), 60).convert("RGB").save(os.path.join(folder, "noise.png"))
+            os.utime(original, (1_000_000, 1_000_000))  # The original is the oldest file
+
+            cache_file = os.path.join(folder, "hashes.json")
+            index = ImageHashIndex(cache_file=cache_file, max_workers=2)
+            self.assertEqual(index.add_folder(folder), 4)
+            groups = index.duplicate_groups()
+            self.assertEqual(len(groups), 1)
+            self.assertEqual(groups[0][0], original)
+            self.assertEqual(len(groups[0]), 3)
+            self.assertEqual(index.canonical_for(os.path.join(folder, "UNITSnew", "ogre_copy.jpg")), original)
+            self.assertEqual(index.canonical_for(os.path.join(folder, "noise.png")), os.path.join(folder, "noise.png"))
+            self.assertIn((0, original), index.near(dhash(original), 0))
+
+            # Hashes are reused from the cache until a file changes
+            cached = ImageHashIndex(cache_file=cache_file)
+            self.assertEqual(cached.add_folder(folder), 0)
+            fractal.rotate(90).save(original)
+            self.assertEqual(cached.add_folder(folder), 1)
+            self.assertEqual(len(cached.duplicate_groups()[0]), 2)
+
+    def test_deleted_pictures_are_forgotten(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as folder:
+            fractal = Image.effect_mandelbrot((400, 300), (-2, -1.5, 1, 1.5), 100).convert("RGB")
+            older = os.path.join(folder, "a.png")
+            newer = os.path.join(folder, "b.png")
+            fractal.save(older)
+            fractal.save(newer)
+            os.utime(older, (1_000_000, 1_000_000))
+
+            cache_file = os.path.join(folder, "hashes.json")
+            index = ImageHashIndex(cache_file=cache_file)
+            index.add_folder(folder)
+            self.assertEqual(index.canonical_for(newer), older)
+
+            os.remove(older)
+            self.assertEqual(index.canonical_for(newer), newer)  # Skipped before the folder is rescanned
+            self.assertEqual(index.duplicate_groups(), [])
+            index.add_folder(folder)
+            self.assertNotIn(older, index.entries)
+            self.assertNotIn(older, ImageHashIndex(cache_file=cache_file).entries)
+
+
+class TestLagWatchdog(unittest.TestCase):
+    class FakeRoot:
+        """Runs after() callbacks when the test calls run(), like a busy Tk loop would."""
+
+        def __init__(self):
+            self.callbacks = []
+
+        def after(self, delay, callback):
+            self.callbacks.append(callback)
+            return len(self.callbacks)
+
+        def after_cancel(self, job):
+            pass
+
+        def run(self):
+            callbacks, self.callbacks = self.callbacks, []
+            for callback in callbacks:
+                callback()
+
+    def test_stalls_are_attributed_and_sampled(self):
+        watchdog = LagWatchdog(interval_ms=10, stall_ms=100, sample_stacks=True)
+        root = self.FakeRoot()
+        watchdog.start(root)
+        time.sleep(0.02)
+        root.run()  # A beat on time
+
+        @watchdog.track("display_markers")
+        def slow_operation():
+            time.sleep(0.3)
+
+        slow_operation()
+        root.run()
+        watchdog.stop()
+
+        report = watchdog.report()
+        self.assertEqual(report["beats"], 2)
+        self.assertEqual(report["stall_count"], 1)
+        self.assertEqual(sum(report["histogram"].values()), 2)
+        self.assertEqual(report["histogram"]["<=500"], 1)  # The 300 ms stall
+        self.assertEqual(list(report["operations"]), ["display_markers"])
+        stall = report["stalls"][0]
+        self.assertEqual(stall["operations"], ["display_markers"])
+        self.assertTrue(any("slow_operation" in line for line in stall["stack"]))
+
+        with tempfile.TemporaryDirectory() as folder:
+            watchdog.write(os.path.join(folder, "lag.json"))
+            with open(os.path.join(folder, "lag.json"), encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["stall_count"], 1)
+
+    def test_bucket_bounds_are_inclusive(self):
+        watchdog = LagWatchdog()
+        for lag_ms in (16, 16.5, 5000, 5001):
+            watchdog.record(lag_ms)
+        histogram = watchdog.report()["histogram"]
+        self.assertEqual((histogram["<=16"], histogram["<=33"], histogram["<=5000"], histogram[">5000"]), (1, 1, 1, 1))
+
+
+class TestAppLogging(unittest.TestCase):
+    class Counted:
+        """Counts how often it is formatted into a message."""
+
+        def __init__(self):
+            self.formatted = 0
+
+        def __str__(self):
+            self.formatted += 1
+            return "value"
+
+    def test_rate_limit_per_call_site(self):
+        limit = RateLimitFilter(rate=0.0, burst=3)
+        log = get_logger("tests.rate_limit")
+        log.addFilter(limit)
+        log.propagate = False
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        log.addHandler(handler)
+        value = self.Counted()
+
+        def storm():
+            log.warning("Storm %s", value)
+
+        try:
+            for _ in range(10):
+                storm()
+            log.warning("Other call site")
+            self.assertEqual(len(records), 4)
+            self.assertEqual(value.formatted, 0)  # Nothing formatted yet, dropped records never will be
+
+            limit.rate = 1000.0  # Refill the bucket
+            time.sleep(0.01)
+            storm()
+        finally:
+            log.removeHandler(handler)
+            log.removeFilter(limit)
+        self.assertEqual(records[4].suppressed, 7)
+        self.assertEqual(records[4].getMessage(), "Storm value")
+
+    def test_pipeline_writes_ring_buffer_and_file(self):
+        setup = LoggingSetup()
+        log = get_logger("tests.pipeline")
+        with tempfile.TemporaryDirectory() as folder:
+            log_file = os.path.join(folder, "app.log")
+            setup.configure(level="INFO", console=False, log_file=log_file, burst=5, rate=0.0)
+            try:
+                log.debug("Hidden %s", "detail")
+                for index in range(8):
+                    log.info("Loaded marker %d", index, extra={"marker": index})
+                log.error("Failed to save: %s", "disk full")
+            finally:
+                setup.stop()
+
+            entries = setup.ring_buffer.since(0)
+            self.assertEqual([entry["message"] for entry in entries][-2:], ["Loaded marker 4", "Failed to save: disk full"])
+            self.assertEqual(len(entries), 6)
+            self.assertEqual(entries[0]["fields"], {"marker": 0})
+            self.assertEqual(setup.ring_buffer.since(entries[-2]["sequence"]), entries[-1:])
+
+            with open(log_file, encoding="utf-8") as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[-1]["level"], "ERROR")
+        self.assertEqual(lines[-1]["logger"], "app.tests.pipeline")
+        self.assertEqual(lines[2]["fields"], {"marker": 2})
+
+
+    def test_records_are_formatted_on_the_listener_thread(self):
+        formatted_on = []
+
+        class Traced(str):
+            def __str__(self):
+                formatted_on.append(threading.current_thread())
+                return "traced"
+
+        setup = LoggingSetup()
+        setup.configure(level="INFO", console=False)
+        app_logger = logging.getLogger("app")
+        others = [handler for handler in app_logger.handlers if handler is not setup.queue_handler]  # e.g. pytest's capture
+        for handler in others:
+            app_logger.removeHandler(handler)
+        try:
+            get_logger("tests.deferred").info("Value %s", Traced("x"))
+            get_logger("tests.deferred").info("Items %s", [1, 2])
+        finally:
+            setup.stop()
+            for handler in others:
+                app_logger.addHandler(handler)
+        self.assertTrue(formatted_on)
+        self.assertNotIn(threading.current_thread(), formatted_on)
+        self.assertEqual([entry["message"] for entry in setup.ring_buffer.since(0)], ["Value traced", "Items [1, 2]"])
+
+
+class TestProjectWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.projects = []
+        for name in ("LTD211.mlt", "LTD211_PNG.mlt", "LTD212.mlt"):
+            path = os.path.join(self.folder, name)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("<mlt><producer id='p0'/></mlt>")
+            self.projects.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_cached_until_file_changes(self):
+        workspace = ProjectWorkspace()
+        markers = [{"Name": "Intro", "StartTime": "00:00:01.000", "Picture": "intro.png"}]
+        workspace.put(self.projects[0], markers)
+        self.assertIs(workspace.get(self.projects[0]).markers, markers)
+        self.assertIsNone(workspace.get(self.projects[1]))
+
+        document = ET.fromstring("<mlt><producer id='p0'/></mlt>")
+        history = EditHistory(document)
+        workspace.set_document(self.projects[0], document, history)
+        self.assertEqual(workspace.take_document(self.projects[0])[:2], (document, history))
+        self.assertIsNone(workspace.take_document(self.projects[0]))  # Checked out
+        workspace.set_document(self.projects[0], document, history)
+
+        with open(self.projects[0], "a", encoding="utf-8") as file:
+            file.write("\n<!-- edited in Shotcut -->")
+        self.assertIsNone(workspace.get(self.projects[0]))
+        self.assertIsNone(workspace.take_document(self.projects[0]))
+        self.assertIs(workspace.markers_of(self.projects[0]), markers)  # Assignments survive for merging
+        self.assertEqual(workspace.stats()["hits"], 1)
+
+    def test_least_recently_used_projects_are_evicted(self):
+        workspace = ProjectWorkspace(max_projects=2)
+        for path in self.projects[:2]:
+            workspace.put(path, [{"Name": "Intro"}])
+        workspace.get(self.projects[0])
+        workspace.put(self.projects[2], [{"Name": "Intro"}])
+        self.assertEqual(workspace.paths(), [os.path.abspath(self.projects[2]), os.path.abspath(self.projects[0])])
+
+        workspace = ProjectWorkspace(max_bytes=1)  # Over budget: only the most recent project stays
+        for path in self.projects:
+            workspace.put(path, [{"Name": "Intro"}])
+        self.assertEqual(workspace.paths(), [os.path.abspath(self.projects[2])])
+        self.assertEqual(workspace.stats()["evictions"], 2)
+
+
+class TestTimecode(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertAlmostEqual(parse_timecode("01:02:03.456"), 3723.456)
+        self.assertEqual(format_timecode(3723.456), "01:02:03.456")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_timecode("")
+
+
+class TestLineDocument(unittest.TestCase):
+    def test_lines_and_ids(self):
+        document = LineDocument.from_file(os.path.join(RESOURCES, "LTD211.mlt"))
+        with open(os.path.join(RESOURCES, "LTD211.mlt"), "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(document), len(lines))
+        self.assertEqual(document.lines(100, 105), lines[100:105])
+        self.assertEqual(document.lines(len(lines) - 1, len(lines) + 10), lines[-1:])
+        self.assertIn('<playlist id="background">', document.line(document.find_id("background")))
+        self.assertIsNone(document.find_id("producer99"))
+        document.close()
+
+    def test_rendered_text(self):
+        document = LineDocument.from_text("<a>\r\n  <b id='x'/>\n</a>\n")
+        self.assertEqual(list(document.iter_lines()), ["<a>", "  <b id='x'/>", "</a>"])
+        self.assertEqual(document.find_id("x"), 1)
+        self.assertEqual(len(LineDocument.from_text("")), 1)
+
+    def test_snapshot_survives_truncation(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "project.mlt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("<mlt>\n" + "  <producer/>\n" * 5000 + "</mlt>\n")
+            document = LineDocument.from_file(path, snapshot=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("")  # Truncated in place, as an editor saving the project may do
+            self.assertEqual(document.line(4000), "  <producer/>")
+            self.assertEqual(len(document), 5002)
+            document.close()
+
+    def test_replace_lines(self):
+        document = LineDocument.from_text("<a>\n  <b/>\n  <c/>\n</a>\n")
+        edited = document.replace_lines(1, 3, "  <b id='x'/>\n  <c/>\n  <d/>")
+        self.assertEqual(list(edited.iter_lines()), ["<a>", "  <b id='x'/>", "  <c/>", "  <d/>", "</a>"])
+        self.assertEqual(edited.replace_lines(3, 5, "</a>").text(), "<a>\n  <b id='x'/>\n  <c/>\n</a>\n")
+
+
+class TestMarkerIndex(unittest.TestCase):
+    def setUp(self):
+        self.markers = [
+            make_marker("b", "00:00:04.117", "00:00:04.117"),
+            make_marker("a", "00:00:00.717", "00:00:02.000"),
+            make_marker("c", "00:00:07.883"),
+            make_marker("long", "00:00:01.000", "00:00:09.000"),
+        ]
+        self.index = MarkerIndex(self.markers)
+
+    def test_current(self):
+        self.assertIsNone(self.index.current(0.5))
+        self.assertEqual(self.index.current(0.717), 1)
+        self.assertEqual(self.index.current(5.0), 0)
+        self.assertEqual(self.index.current(100.0), 2)
+
+    def test_containing_and_between(self):
+        self.assertEqual(self.index.containing(1.5), [1, 3])
+        self.assertEqual(self.index.containing(8.0), [3])
+        self.assertEqual(self.index.between(3.0, 8.0), [3, 0, 2])
+
+    def test_containing_matches_a_scan(self):
+        import random
+
+        generator = random.Random(7)
+        markers = []
+        for _ in range(300):
+            start = generator.randrange(0, 6000) / 100
+            end = start + generator.choice((0, generator.randrange(0, 3000) / 100))
+            markers.append(make_marker("m", format_timecode(start), format_timecode(end)))
+        index = MarkerIndex(markers)
+        for seconds in [generator.randrange(-100, 9100) / 100 for _ in range(200)] + index.starts[:50] + index.ends[:50]:
+            expected = sorted((index.starts[slot], slot) for slot in range(len(index)) if index.starts[slot] <= seconds <= index.ends[slot])
+            self.assertEqual(index.containing(seconds), [index.positions[slot] for _, slot in expected])
+
+    def test_next_and_previous(self):
+        self.assertEqual(self.index.next_after(0.717), 3)
+        self.assertEqual(self.index.next_after(7.883), None)
+        self.assertEqual(self.index.previous_before(7.883), 0)
+        self.assertIsNone(self.index.previous_before(0.9))
+
+
+class TestProducerRegistry(unittest.TestCase):
+    def test_existing_producers_are_reused(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211_PNG.mlt")).getroot()
+        registry = ProducerRegistry(root)
+        self.assertEqual(registry.lookup("C:\\YouTube\\LTD\\assets\\UNITSnew\\Arctic\\1Tuskar\\Tuskar.png"), "producer0")
+        self.assertEqual(registry.lookup("intro.mp4"), "chain0")
+        self.assertIsNone(registry.lookup("C:/missing.png"))
+
+    def test_register(self):
+        registry = ProducerRegistry(ET.fromstring("<mlt/>"))
+        registry.register("C:\\a.png", "producer7")
+        self.assertIn("C:/a.png", registry)
+        self.assertEqual(len(registry), 1)
+
+
+class TestProducerTemplates(unittest.TestCase):
+    def test_builtin_templates(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()
+        markers = [make_marker("a", "00:00:01.000"), make_marker("b", "00:00:02.000"), make_marker("c", "00:00:03.000")]
+        markers[0]["Picture"] = markers[1]["Picture"] = "C:\\assets\\a.png"
+        markers[2]["Video"] = "clips/c.mp4"
+
+        self.assertEqual(add_marker_producers(root, markers), ["producer0"])
+        producer = root.find("producer[@id='producer0']")
+        self.assertEqual(producer.find("property[@name='resource']").text, "C:/assets/a.png")
+        self.assertEqual(producer.find("property[@name='shotcut:caption']").text, "a.png")
+        self.assertEqual(len(producer), 14)
+        self.assertIsNone(producer.get("template"))
+
+        self.assertEqual(add_marker_producers(root, markers, get_template("avformat")), ["chain6"])
+        self.assertEqual(root.find("chain[@id='chain6']/property[@name='mlt_service']").text, "avformat-novalidate")
+
+    def test_user_template_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, "templates.xml")
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write('''<templates>
+  <producer template="card" source="Picture" id="{id}">
+    <property name="resource">{resource}</property>
+    <property name="mlt_service">qimage</property>
+    <property name="shotcut:comment">{Name} at {StartTime} {{unit}}</property>
+  </producer>
+</templates>''')
+            template = get_template("card", file_path)
+        producer = template.stamp({"id": "producer9", "resource": "a.png", "Name": "Tuskar", "StartTime": "00:00:01.000"})
+        self.assertEqual(producer.get("id"), "producer9")
+        self.assertEqual(producer.find("property[@name='shotcut:comment']").text, "Tuskar at 00:00:01.000 {unit}")
+        self.assertIsNot(template.stamp({"id": "x", "resource": "", "Name": "", "StartTime": ""})[0], producer[0])
+        with self.assertRaises(ValueError):
+            get_template("missing")
+
+    def test_unknown_slots_are_rejected(self):
+        for template in ('<producer template="bad" id="{id}" title="{Nmae}"/>', '<producer template="bad" id="{id"/>'):
+            with self.assertRaises(ValueError):
+                ProducerTemplate.from_string(template)
+
+
+class TestTractorGraph(unittest.TestCase):
+    def setUp(self):
+        self.root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()
+        self.tractor = self.root.find(".//tractor")
+
+    def test_complete_project_has_no_missing_transitions(self):
+        self.assertEqual(TractorGraph(self.tractor).missing_transitions(), [])
+        png_root = ET.parse(os.path.join(RESOURCES, "LTD211_PNG.mlt")).getroot()
+        self.assertEqual(TractorGraph(png_root.find(".//tractor")).missing_transitions(), [])
+
+    def test_new_tracks_get_mix_and_blend(self):
+        tracks = self.tractor.findall("track")
+        for offset in range(2):
+            self.tractor.insert(list(self.tractor).index(tracks[-1]) + 1 + offset, ET.Element("track", producer=f"playlist{3 + offset}"))
+        graph = TractorGraph(self.tractor)
+        missing = [(t["a_track"], t["b_track"], t["mlt_service"]) for t in graph.missing_transitions()]
+        self.assertEqual(missing, [
+            ("0", "4", "mix"), ("1", "4", "frei0r.cairoblend"),
+            ("0", "5", "mix"), ("1", "5", "frei0r.cairoblend"),
+        ])
+        graph.add_transition("transition2", graph.missing_transitions()[0])
+        self.assertTrue(graph.has_transition(0, 4, "mix"))
+        self.assertEqual(len(graph.missing_transitions()), 3)
+
+
+class TestTrackPacking(unittest.TestCase):
+    def test_uses_fewest_lanes(self):
+        lanes = pack_intervals([(0, 2, "a"), (1, 3, "b"), (2, 4, "c"), (3.5, 5, "d"), (0.5, 1, "e")])
+        self.assertEqual([[item for _, _, item in lane] for lane in lanes], [["a", "d"], ["e", "c"], ["b"]])  # a, b and c all hold t=2
+        self.assertEqual(pack_intervals([]), [])
+
+    def test_overlapping_markers_get_extra_tracks(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()
+        markers = [make_marker("a", "00:00:01.000"), make_marker("b", "00:00:01.200", "00:00:03.000"), make_marker("c", "00:00:02.000")]
+        for marker in markers:
+            marker["Picture"] = f"C:/assets/{marker['Name']}.png"
+        add_marker_producers(root, markers)
+        tracks_before = len(root.findall(".//tractor/track"))
+
+        playlist_ids = add_marker_playlists(root, markers)
+
+        self.assertEqual(len(playlist_ids), 2)
+        tracks = [track.get("producer") for track in root.findall(".//tractor/track")]
+        self.assertEqual(tracks[tracks_before:], playlist_ids)
+        bottom, top = (root.find(f"playlist[@id='{playlist_id}']") for playlist_id in playlist_ids)
+        self.assertEqual([(child.tag, child.get("length") or child.get("out")) for child in bottom], [
+            ("property", None), ("property", None),
+            ("blank", "00:00:01.000"), ("entry", "00:00:00.466"),  # Out is the last frame at 60 fps
+            ("blank", "00:00:00.517"), ("entry", "00:00:00.466"),
+        ])
+        self.assertEqual([child.get("out") for child in top.findall("entry")], ["00:00:01.783"])
+
+    def test_adjacent_markers_stay_on_time(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()  # 60 fps
+        markers = [make_marker(str(index), format_timecode(index), format_timecode(index + 1)) for index in range(200)]
+        for marker in markers:
+            marker["Picture"] = "C:/assets/a.png"
+        add_marker_producers(root, markers)
+
+        playlist_ids = add_marker_playlists(root, markers)
+
+        self.assertEqual(len(playlist_ids), 1)  # Back-to-back markers share a track
+        self.assertEqual(check_timeline(root), [])
+        placed = layout_playlist(root.find(f"playlist[@id='{playlist_ids[0]}']"), frame_duration(root))
+        for index, (start, end, _) in enumerate(placed):
+            self.assertAlmostEqual(start, index, delta=0.001)
+            self.assertAlmostEqual(end, index + 1, delta=0.001)
+
+    def test_no_playlist_without_producers(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()
+        before = ET.tostring(root)
+
+        self.assertEqual(add_marker_playlists(root, [make_marker("a", "00:00:01.000")]), [])
+        self.assertEqual(ET.tostring(root), before)
+
+
+class TestIdAllocator(unittest.TestCase):
+    def test_allocates_after_highest_id(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211_PNG.mlt")).getroot()
+        allocator = IdAllocator(root)
+        self.assertEqual(allocator.allocate("producer"), "producer6")
+        self.assertEqual(allocator.allocate("producer"), "producer7")
+        self.assertEqual(allocator.allocate("playlist"), "playlist4")
+        self.assertEqual(allocator.allocate("transition"), "transition6")
+        self.assertEqual(allocator.allocate("clip"), "clip0")
+        self.assertEqual(allocator.dangling_references(), [])
+
+    def test_dangling_references(self):
+        root = ET.fromstring(
+            '<mlt><playlist id="playlist0"><entry producer="producer3"/></playlist>'
+            '<tractor id="tractor0"><track producer="playlist0"/><track producer="playlist9"/></tractor></mlt>'
+        )
+        self.assertEqual(IdAllocator(root).dangling_references(), [("entry", "producer3"), ("track", "playlist9")])
+
+
+class TestProjectValidator(unittest.TestCase):
+    def test_reports_structured_diagnostics(self):
+        with tempfile.TemporaryDirectory() as folder:
+            open(os.path.join(folder, "present.png"), "w").close()
+            root = ET.fromstring(
+                '<mlt>'
+                '<producer id="producer0"><property name="resource">present.png</property></producer>'
+                '<producer id="producer1"><property name="resource">missing.png</property></producer>'
+                '<producer id="black"><property name="resource">0</property><property name="mlt_service">color</property></producer>'
+                '<playlist id="playlist0">'
+                '<entry producer="producer0" in="00:00:00.000" out="00:00:02.000"/>'
+                '<blank length="-00:00:01.000"/>'
+                '<entry producer="producer1" in="00:00:00.000" out="00:00:01.000"/>'
+                '</playlist>'
+                '<tractor id="tractor0"><track producer="playlist0"/><track producer="playlist7"/></tractor>'
+                '</mlt>'
+            )
+            diagnostics = validate_project(root, folder)
+        codes = sorted((diagnostic.code, diagnostic.element) for diagnostic in diagnostics)
+        self.assertEqual(codes, [
+            ("dangling-reference", "playlist7"),
+            ("missing-resource", "producer1"),
+            ("negative-blank", "playlist0"),
+        ])
+
+    def test_entry_out_is_inclusive(self):
+        root = ET.fromstring(
+            '<mlt>'
+            '<profile frame_rate_num="25" frame_rate_den="1"/>'
+            '<producer id="producer0"><property name="resource">0</property><property name="mlt_service">color</property></producer>'
+            '<playlist id="playlist0">'
+            '<entry producer="producer0" in="00:00:00.000" out="00:00:00.960"/>'
+            '<entry producer="producer0" in="00:00:00.000" out="00:00:00.960"/>'
+            '</playlist>'
+            '</mlt>'
+        )
+        self.assertAlmostEqual(frame_duration(root), 0.04)
+        self.assertAlmostEqual(frame_duration(ET.fromstring("<mlt/>")), 1 / 30)
+        self.assertEqual(validate_project(root), [])
+        starts = [start for start, _, _ in layout_playlist(root.find("playlist"), frame_duration(root))]
+        self.assertEqual([round(start, 3) for start in starts], [0.0, 1.0])
+
+
+class TestEditHistory(unittest.TestCase):
+    def test_undo_and_redo_builder_steps(self):
+        root = ET.parse(os.path.join(RESOURCES, "LTD211.mlt")).getroot()
+        markers = [make_marker("a", "00:00:01.000"), make_marker("b", "00:00:02.000")]
+        for marker in markers:
+            marker["Picture"] = f"C:/assets/{marker['Name']}.png"
+        history = EditHistory(root)
+        states = [fingerprint(root)]
+        history.record("Add Producer", add_marker_producers, markers)
+        states.append(fingerprint(root))
+        history.record("Add Playlists", add_marker_playlists, markers)
+        states.append(fingerprint(root))
+        history.record("Add Transitions", add_missing_transitions)
+        states.append(fingerprint(root))
+
+        # Patches hold only the new elements, not copies of the document
+        self.assertEqual([len(patch.changes) for patch in history.undo_stack], [2, 2, 2])
+        self.assertEqual(history.undo(), "Add Transitions")
+        self.assertEqual(history.undo(), "Add Playlists")
+        self.assertEqual(fingerprint(root), states[1])
+        self.assertEqual(history.redo(), "Add Playlists")
+        self.assertEqual(fingerprint(root), states[2])
+        history.undo()
+        history.undo()
+        self.assertEqual(fingerprint(root), states[0])
+        self.assertIsNone(history.undo())
+        history.redo()
+        history.redo()
+        history.redo()
+        self.assertEqual(fingerprint(root), states[3])
+
+    def test_removals_and_new_edits_clear_redo(self):
+        root = ET.fromstring("<mlt><a/><b/><c/></mlt>")
+        history = EditHistory(root)
+        history.record("Remove", lambda element: element.remove(element[1]))
+        self.assertEqual([child.tag for child in root], ["a", "c"])
+        history.undo()
+        self.assertEqual([child.tag for child in root], ["a", "b", "c"])
+        history.record("Append", lambda element: ET.SubElement(element, "d"))
+        self.assertFalse(history.can_redo())
+        history.record("Nothing", lambda element: None)
+        self.assertEqual(len(history.undo_stack), 1)
+
+    def test_failed_operation_is_rolled_back(self):
+        root = ET.fromstring("<mlt><a/><b/></mlt>")
+        history = EditHistory(root)
+
+        def partial(element):
+            element.remove(element[0])
+            ET.SubElement(element, "c")
+            raise RuntimeError("halfway")
+
+        with self.assertRaises(RuntimeError):
+            history.record("Partial", partial)
+        self.assertEqual([child.tag for child in root], ["a", "b"])
+        self.assertFalse(history.can_undo())
+
+
+FAKE_MELT = """
+import sys
+for percentage in (10, 50, 90):
+    print(f"Current Frame: {percentage}, percentage: {percentage}", end="\\r", flush=True)
+sys.exit(1 if "broken" in sys.argv[1] else 0)
+"""
+
+
+class TestRenderQueue(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.melt = os.path.join(self.folder.name, "fake_melt.py")
+        with open(self.melt, "w") as file:
+            file.write(FAKE_MELT)
+        self.state_file = os.path.join(self.folder.name, "queue.json")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def make_queue(self):
+        return RenderQueue(self.state_file, melt_path=[sys.executable, self.melt], max_concurrent=2)
+
+    def test_renders_and_retries(self):
+        render_queue = self.make_queue()
+        good = render_queue.add("good.mlt")
+        broken = render_queue.add("broken.mlt")
+        render_queue.start()
+        self.assertTrue(render_queue.wait(timeout=30))
+        self.assertEqual((good.status, good.progress), (DONE, 100))
+        self.assertEqual(broken.status, FAILED)
+
+        self.assertTrue(render_queue.retry(broken.job_id))
+        self.assertTrue(render_queue.wait(timeout=30))
+        self.assertEqual((broken.status, broken.attempts), (FAILED, 2))
+        render_queue.stop()
+
+    def test_state_survives_restart(self):
+        render_queue = self.make_queue()
+        job = render_queue.add("good.mlt", "out.mp4")
+        self.assertTrue(render_queue.cancel(render_queue.add("other.mlt").job_id))
+
+        restored = self.make_queue()
+        self.assertEqual([(j.project, j.status) for j in restored.jobs], [("good.mlt", QUEUED), ("other.mlt", "cancelled")])
+        self.assertEqual(restored.get(job.job_id).output, "out.mp4")
+
+    def test_cli_exit_code_covers_only_its_jobs(self):
+        import contextlib
+        import io
+        from main import build_parser
+
+        with open(self.melt, "w") as file:
+            file.write(f"#!{sys.executable}\n{FAKE_MELT}")
+        os.chmod(self.melt, 0o755)
+        render_queue = self.make_queue()
+        render_queue.add("broken.mlt")
+        render_queue.start()
+        render_queue.wait(timeout=30)
+        render_queue.stop()
+
+        def run(*arguments):
+            args = build_parser().parse_args(["render", "--melt", self.melt, "--state-file", self.state_file, *arguments])
+            with contextlib.redirect_stdout(io.StringIO()):
+                return args.handler(args)
+
+        self.assertEqual(run(os.path.join(self.folder.name, "good.mlt")), 0)  # The earlier failure is not this run's
+        self.assertEqual(run("--retry", "1"), 1)
+
+
+def write_test_video(file_path, width=320, height=240, fps=60, frames=20):
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(file_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for index in range(frames):
+        writer.write(np.full((height, width, 3), index * 10 % 255, dtype=np.uint8))
+    writer.release()
+
+
+class TestSpliceExport(unittest.TestCase):
+    def setUp(self):
+        self.original = os.path.join(RESOURCES, "LTD211.mlt")
+        root = ET.parse(self.original).getroot()
+        markers = MediaHandler().extract_markers_from_file(self.original)
+        for marker in markers:
+            marker["Picture"] = f"C:/assets/{marker['Name']}.png"
+        add_marker_producers(root, markers)
+        add_marker_playlists(root, markers)
+        add_missing_transitions(root)
+        # The preview text is fully reformatted; splicing must still find only the additions
+        self.output_root = ET.fromstring(prettify_xml_with_no_extra_lines(root))
+
+    def test_only_new_elements_are_spliced_in(self):
+        with tempfile.TemporaryDirectory() as folder:
+            export_path = os.path.join(folder, "exported_file.mlt")
+            spliced = splice_export(self.original, self.output_root, export_path)
+            with open(self.original, "r", encoding="utf-8") as file:
+                original_lines = file.read().splitlines()
+            with open(export_path, "r", encoding="utf-8") as file:
+                exported_lines = file.read().splitlines()
+            exported_root = ET.parse(export_path).getroot()
+            self.assertEqual(os.listdir(folder), ["exported_file.mlt"])
+
+        self.assertEqual(spliced, 14)  # 10 producers, a playlist, a track and two transitions
+        self.assertEqual(fingerprint(exported_root), fingerprint(self.output_root))
+        # Every original line survives byte for byte, in order
+        remaining = iter(exported_lines)
+        self.assertTrue(all(line in remaining for line in original_lines))
+        self.assertIn('    <track producer="playlist2" hide="video"/>', exported_lines)
+
+    def test_modified_original_is_refused(self):
+        self.output_root.find(".//tractor").set("out", "00:00:01.000")
+        with tempfile.TemporaryDirectory() as folder:
+            with self.assertRaises(SpliceError):
+                splice_export(self.original, self.output_root, os.path.join(folder, "exported_file.mlt"))
+            self.assertEqual(os.listdir(folder), [])
+
+
+class TestProxyCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.folder.name, "proxies")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_generates_small_proxy(self):
+        import cv2
+
+        source = os.path.join(self.folder.name, "source.mp4")
+        write_test_video(source)
+        cache = ProxyCache(self.cache_dir, height=120, max_fps=30)
+        self.assertIsNone(cache.proxy_path(source))
+        cache.request(source).result(timeout=30)
+
+        proxy = cache.proxy_path(source)
+        capture = cv2.VideoCapture(proxy)
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        self.assertEqual(size, (160, 120))
+        self.assertEqual(frames, 10)
+        self.assertIsNone(cache.request(source))  # Already cached
+        cache.shutdown()
+
+    def test_writer_failure_raises(self):
+        source = os.path.join(self.folder.name, "source.mp4")
+        write_test_video(source)
+        cache = ProxyCache(self.cache_dir)
+        path = os.path.join(self.cache_dir, "missing", "proxy.mp4")  # Folder the writer cannot create
+        with self.assertRaises(RuntimeError):
+            cache.generate(source, path)
+        self.assertFalse(os.path.exists(f"{path}.part.mp4"))
+        cache.shutdown()
+
+    def test_evicts_least_recently_used(self):
+        os.makedirs(self.cache_dir)
+        for index, name in enumerate(("old.mp4", "new.mp4")):
+            file_path = os.path.join(self.cache_dir, name)
+            with open(file_path, "wb") as file:
+                file.write(b"x" * 100)
+            os.utime(file_path, (index, index))
+        ProxyCache(self.cache_dir, max_bytes=150).evict()
+        self.assertEqual(os.listdir(self.cache_dir), ["new.mp4"])
+
+
+class TestDecodePool(unittest.TestCase):
+    def test_decodes_at_tile_size_and_composites(self):
+        import time
+
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "source.mp4")
+            write_test_video(source, width=640, height=360)
+            pool = DecodePool(max_workers=2)
+            streams = [pool.open(source, (64, 36), tick_fps=30) for _ in range(3)]
+            deadline = time.time() + 30
+            frames = [None] * 3
+            while any(frame is None for frame in frames) and time.time() < deadline:
+                frames = [pool.poll(stream) for stream in streams]
+                time.sleep(0.01)
+            for stream in streams:
+                pool.close(stream)
+            pool.shutdown()
+
+        self.assertEqual([frame.shape for frame in frames], [(36, 64, 3)] * 3)
+        canvas = composite_tiles(frames + [None], 2, (64, 36))
+        self.assertEqual(canvas.shape, (72, 128, 3))
+        self.assertEqual(int(canvas[40:, 64:].max()), 0)  # Empty tile stays black
+
+
+class TestSpriteSheet(unittest.TestCase):
+    def test_packs_and_caches_thumbnails(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for index, color in enumerate(("red", "green", "blue", "white", "black")):
+                path = os.path.join(folder, f"{index}.png")
+                Image.new("RGB", (64, 32), color).save(path)
+                paths.append(path)
+            cache_dir = os.path.join(folder, "cache")
+            builder = SpriteSheetBuilder(cache_dir, thumb_size=16, columns=2, rows=2)
+
+            sheet = builder.build_async(paths + [paths[0], os.path.join(folder, "missing.png")]).result(timeout=30)
+            self.assertEqual(len(sheet.atlases), 2)
+            self.assertEqual(len(sheet.index), 5)
+            thumbnail = sheet.crop(paths[1])
+            self.assertEqual(thumbnail.size, (16, 16))
+            self.assertEqual(thumbnail.getpixel((8, 8))[:3], (0, 128, 0))
+
+            self.assertEqual(len(os.listdir(cache_dir)), 5)  # One tile per readable picture
+            self.assertEqual(builder.build(list(reversed(paths))).index, sheet.index)
+            builder.shutdown()
+
+    def test_only_changed_pictures_are_decoded(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for index in range(3):
+                path = os.path.join(folder, f"{index}.png")
+                Image.new("RGB", (32, 32), "red").save(path)
+                paths.append(path)
+            builder = SpriteSheetBuilder(os.path.join(folder, "cache"), thumb_size=16)
+            builder.build(paths)
+
+            decoded = []
+            make_thumbnail = builder.make_thumbnail
+            builder.make_thumbnail = lambda path: decoded.append(path) or make_thumbnail(path)
+            Image.new("RGB", (32, 32), "blue").save(paths[1])
+            os.utime(paths[1], ns=(os.stat(paths[1]).st_mtime_ns + 10**9,) * 2)
+            sheet = builder.build(paths)
+            self.assertEqual(decoded, [paths[1]])
+            self.assertEqual(sheet.crop(paths[1]).getpixel((8, 8))[:3], (0, 0, 255))
+            builder.shutdown()
+
+    def test_prune_caps_size_and_age(self):
+        with tempfile.TemporaryDirectory() as folder:
+            builder = SpriteSheetBuilder(folder, max_bytes=250, max_age=3600)
+            now = time.time()
+            for index, age in enumerate((7200, 300, 200, 100)):
+                path = os.path.join(folder, f"{index}.png")
+                with open(path, "wb") as file:
+                    file.write(b"x" * 100)
+                os.utime(path, (now - age, now - age))
+
+            self.assertEqual(builder.prune(), 2)  # Too old, then least recently used until 250 bytes fit
+            self.assertEqual(sorted(os.listdir(folder)), ["2.png", "3.png"])
+            builder.shutdown()
+
+
+class TestMarkerIO(unittest.TestCase):
+    def markers(self, count):
+        for index in range(count):
+            marker = make_marker(f"unit, \"{index}\"", format_timecode(index * 1.017), format_timecode(index * 1.017 + 0.5))
+            marker["Number"] = index
+            marker["Picture"] = f"C:/assets/unit{index}.png" if index % 2 else ""
+            marker["Video"] = f"/videos/unit{index}.mp4"
+            yield marker
+
+    def test_round_trip_every_format(self):
+        expected = list(self.markers(50))
+        with tempfile.TemporaryDirectory() as folder:
+            for extension in (".csv", ".jsonl", ".edl"):
+                file_path = os.path.join(folder, f"markers{extension}")
+                self.assertEqual(write_markers(self.markers(50), file_path), 50)
+                self.assertEqual(list(read_markers(file_path)), expected, extension)
+
+    def test_write_back_into_mlt(self):
+        with tempfile.TemporaryDirectory() as folder:
+            project = os.path.join(folder, "project.mlt")
+            shutil.copy(os.path.join(RESOURCES, "LTD211.mlt"), project)
+            expected = list(self.markers(5))
+            self.assertEqual(write_markers(expected, project), 5)
+            self.assertEqual(list(read_markers(project)), expected)
+            loaded = MediaHandler().extract_markers_from_file(project)
+            self.assertEqual([marker["Video"] for marker in loaded], [marker["Video"] for marker in expected])
+            self.assertEqual(loaded[1]["Picture"], "C:/assets/unit1.png")
+            self.assertIsNotNone(ET.parse(project).getroot().find(".//tractor/track"))
+
+            # Everything outside the markers block is left byte for byte
+            with open(os.path.join(RESOURCES, "LTD211.mlt"), "rb") as file:
+                original = file.read()
+            with open(project, "rb") as file:
+                written = file.read()
+            root, offsets = parse_with_offsets(original)
+            start, _, _, end = offsets[root.find(".//properties[@name='shotcut:markers']")]
+            self.assertTrue(written.startswith(original[:start]))
+            self.assertTrue(written.endswith(original[end:]))
+
+    def test_mlt_write_back_streams_markers(self):
+        import tracemalloc
+
+        with tempfile.TemporaryDirectory() as folder:
+            project = os.path.join(folder, "project.mlt")
+            shutil.copy(os.path.join(RESOURCES, "LTD211.mlt"), project)
+            tracemalloc.start()
+            try:
+                self.assertEqual(write_markers(self.markers(5000), project), 5000)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, 4 * 1024 * 1024)  # Building the block as a tree takes about 12 MB
+            self.assertEqual(sum(1 for _ in read_markers(project)), 5000)
+
+    def test_markers_block_added_to_mlt(self):
+        with tempfile.TemporaryDirectory() as folder:
+            project = os.path.join(folder, "project.mlt")
+            data = b'<?xml version="1.0"?>\n<!-- keep -->\n<mlt>\n  <tractor id="tractor0">\n    <track producer="main_bin"/>\n  </tractor>\n</mlt>\n'
+            with open(project, "wb") as file:
+                file.write(data)
+            expected = list(self.markers(2))
+            self.assertEqual(write_markers(expected, project), 2)
+            self.assertEqual(list(read_markers(project)), expected)
+            with open(project, "rb") as file:
+                written = file.read()
+            self.assertTrue(written.startswith(data[:data.index(b"<track")]))
+            self.assertIn(b"</properties>\n    <track producer=\"main_bin\"/>\n  </tractor>", written)
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_report(self):
+        profiler = StartupProfiler()
+        with profiler.phase("work"):
+            pass
+        self.assertIs(profiler.import_module("json"), sys.modules["json"])  # Already loaded: not recorded
+        profiler.mark_first_paint()
+        report = profiler.report()
+        self.assertEqual(list(report["phases"]), ["work"])
+        self.assertEqual(report["lazy_imports"], {})
+        self.assertGreater(report["first_paint"], 0)
+        self.assertIn("time to first paint", profiler.format_report())
+
+
+if __name__ == "__main__":
+    unittest.main()